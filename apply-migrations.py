@@ -0,0 +1,767 @@
+#!/usr/bin/env python3
+"""
+Applique supabase/schema.sql puis supabase/migrations/*.sql en parallèle, dans l'ordre des dépendances.
+
+Chaque fichier est découpé en instructions (commentaires, chaînes et corps
+$$...$$ compris), puis on relève les objets qu'il écrit (CREATE, ALTER, DROP,
+COMMENT, GRANT, INSERT/UPDATE/DELETE, blocs DO, SELECT de backfill) et ceux
+qu'il lit (références dans les vues, politiques, corps de fonctions...). Deux
+migrations qui touchent un même objet, dont au moins une en écriture, gardent
+l'ordre des noms de fichier (arête du DAG) ; les autres s'exécutent en même
+temps sur un pool de --jobs connexions, le chemin critique en premier. L'ordre
+des noms n'est jamais modifié : un fichier qui semble utiliser ce que crée un
+fichier plus récent est seulement signalé, et un fichier à SQL dynamique
+(EXECUTE) est une barrière, ses objets n'étant pas visibles.
+
+Chaque fichier est appliqué dans sa propre transaction avec l'enregistrement
+de son checksum dans migrations.applied : un fichier déjà appliqué avec le
+même checksum est sauté, un fichier modifié depuis est signalé. Les deadlocks
+et timeouts de verrou entre migrations concurrentes sont rejoués.
+
+    python apply-migrations.py --plan                                   # DAG, sans connexion
+    python apply-migrations.py --db-url postgresql://localhost/test --local-stubs
+    python apply-migrations.py --db-url $SUPABASE_DB_URL --dry-run
+    python apply-migrations.py --db-url $SUPABASE_DB_URL --include 'APPLY_*.sql'
+
+Connexion : psycopg ou psycopg2 (cf. setup-storage.py). Avec --local-stubs,
+un Postgres vide reçoit le minimum de Supabase (rôles, auth.users, auth.uid,
+auth.jwt, storage.buckets/objects) avant les migrations.
+"""
+
+import argparse
+import fnmatch
+import glob
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from scriptutil import load_script
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASE = 'supabase/schema.sql'
+MIGRATIONS = 'supabase/migrations/*.sql'
+
+TRACKING_SQL = """
+CREATE SCHEMA IF NOT EXISTS migrations;
+CREATE TABLE IF NOT EXISTS migrations.applied (
+  name text PRIMARY KEY,
+  checksum text NOT NULL,
+  applied_at timestamptz NOT NULL DEFAULT now(),
+  duration_ms integer NOT NULL
+);
+"""
+
+RECORD_SQL = """
+INSERT INTO migrations.applied (name, checksum, duration_ms) VALUES (%s, %s, %s)
+ON CONFLICT (name) DO UPDATE
+SET checksum = excluded.checksum, applied_at = now(), duration_ms = excluded.duration_ms
+"""
+
+SUPABASE_STUBS_SQL = """
+DO $$ BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+    CREATE ROLE anon NOLOGIN;
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+    CREATE ROLE service_role NOLOGIN BYPASSRLS;
+  END IF;
+END $$;
+CREATE TABLE IF NOT EXISTS auth.users (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  email text,
+  raw_user_meta_data jsonb DEFAULT '{}'::jsonb,
+  raw_app_meta_data jsonb DEFAULT '{}'::jsonb,
+  created_at timestamptz DEFAULT now(),
+  updated_at timestamptz DEFAULT now()
+);
+CREATE OR REPLACE FUNCTION auth.jwt() RETURNS jsonb
+  LANGUAGE sql STABLE AS $$ SELECT coalesce(nullif(current_setting('request.jwt.claims', true), ''), '{}')::jsonb $$;
+CREATE OR REPLACE FUNCTION auth.role() RETURNS text
+  LANGUAGE sql STABLE AS $$ SELECT auth.jwt() ->> 'role' $$;
+CREATE OR REPLACE FUNCTION auth.email() RETURNS text
+  LANGUAGE sql STABLE AS $$ SELECT auth.jwt() ->> 'email' $$;
+CREATE TABLE IF NOT EXISTS storage.buckets (
+  id text PRIMARY KEY, name text NOT NULL, owner uuid, public boolean DEFAULT false,
+  file_size_limit bigint, allowed_mime_types text[], created_at timestamptz DEFAULT now()
+);
+ALTER TABLE storage.objects ADD COLUMN IF NOT EXISTS owner uuid;
+ALTER TABLE storage.objects ADD COLUMN IF NOT EXISTS owner_id text;
+GRANT USAGE ON SCHEMA public TO anon, authenticated, service_role;
+"""
+
+# SQLSTATE rejouables : sérialisation, deadlock, timeout de verrou
+RETRY_SQLSTATES = {'40001', '40P01', '55P03'}
+
+# Fonctions fournies par une extension : lire ces noms dépend des CREATE EXTENSION
+EXTENSION_FUNCTIONS = {'crypt', 'gen_salt', 'digest', 'hmac', 'gen_random_bytes',
+                       'pgp_sym_encrypt', 'pgp_sym_decrypt', 'uuid_generate_v4'}
+EXTENSIONS_KEY = 'extensions.*'
+
+# Mots-clés qui suivent CREATE avant le type d'objet, et types d'objets
+_CREATE_MODIFIERS = {'or', 'replace', 'unique', 'temp', 'temporary', 'unlogged', 'materialized',
+                     'constraint', 'recursive', 'global', 'local'}
+_SKIP = {'if', 'not', 'exists', 'only', 'concurrently'}
+_TABLE_CONSTRAINTS = {'constraint', 'primary', 'foreign', 'unique', 'check', 'exclude', 'like'}
+_BARRIERS = [
+    re.compile(r'\bon\s+all\s+(tables|functions|sequences|routines)\s+in\s+schema\b'),
+    re.compile(r'\balter\s+default\s+privileges\b'),
+    re.compile(r'\bdrop\s+(schema|owned)\b'),
+    re.compile(r'\breassign\s+owned\b'),
+]
+_TRANSACTION_CONTROL = [['begin'], ['begin', 'transaction'], ['start', 'transaction'],
+                        ['commit'], ['commit', 'transaction'], ['end']]
+_AUTOCOMMIT = re.compile(r'\b(concurrently|vacuum)\b|\balter type (\w+ )+add value\b')
+_VERSION = re.compile(r'^(\d{4})-?(\d{2})-?(\d{2})(?:[-_]?(\d+))?_')
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<dollar>\$(?:[A-Za-z_]\w*)?\$)
+  | (?P<string>[eE]?'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")*")
+  | (?P<word>[A-Za-z_][\w$]*)
+  | (?P<semi>;)
+  | (?P<other>.)
+""", re.S | re.X)
+
+
+# --- Analyse ------------------------------------------------------------------
+
+def scan(sql):
+    """
+    Instructions de sql : [(tokens, début, fin)] avec tokens [(type, valeur)] :
+    word (minuscules), quoted (sans guillemets), body (corps $$...$$), symbol.
+    Les ';' des corps et des chaînes ne coupent pas ; fin inclut le ';'.
+    """
+    statements, current = [], []
+    pos = start = 0
+    while pos < len(sql):
+        match = _TOKEN.match(sql, pos)
+        kind, value = match.lastgroup, match.group()
+        pos = match.end()
+        if not current and kind in ('space', 'comment'):
+            start = pos
+        if kind == 'dollar':
+            end = sql.find(value, pos)
+            end = len(sql) if end < 0 else end
+            current.append(('body', sql[pos:end]))
+            pos = end + len(value)
+        elif kind == 'word':
+            current.append(('word', value.lower()))
+        elif kind == 'quoted':
+            current.append(('quoted', value[1:-1].replace('""', '"')))
+        elif kind == 'semi':
+            if current:
+                statements.append((current, start, pos))
+            current = []
+            start = pos
+        elif kind in ('other', 'string'):
+            current.append(('symbol', value if kind == 'other' else "''"))
+    if current:
+        statements.append((current, start, len(sql)))
+    return statements
+
+
+def tokenize(sql):
+    return [tokens for tokens, _, _ in scan(sql)]
+
+
+def _names(tokens):
+    """Noms (qualifiés ou non) de tokens, normalisés en schema.nom, avec leur position"""
+    names = []
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if kind in ('word', 'quoted'):
+            if i + 2 < len(tokens) and tokens[i + 1] == ('symbol', '.') and tokens[i + 2][0] in ('word', 'quoted'):
+                names.append((i, f'{value}.{tokens[i + 2][1]}'))
+                i += 3
+                continue
+            names.append((i, f'public.{value}'))
+        i += 1
+    return names
+
+
+def _name_at(tokens, i):
+    """Nom qualifié qui commence au token i (None si ce n'est pas un identifiant)"""
+    for position, name in _names(tokens[i:i + 3]):
+        if position == 0:
+            return name
+    return None
+
+
+def _target(tokens, start):
+    """Premier nom après start, en sautant IF [NOT] EXISTS / ONLY / CONCURRENTLY"""
+    i = start
+    while i < len(tokens) and tokens[i][0] == 'word' and tokens[i][1] in _SKIP:
+        i += 1
+    return (_name_at(tokens, i), i) if i < len(tokens) else (None, i)
+
+
+def _dotted(tokens, i):
+    """Parties de a.b.c à partir du token i"""
+    parts = []
+    while i < len(tokens) and tokens[i][0] in ('word', 'quoted'):
+        parts.append(tokens[i][1])
+        if i + 1 < len(tokens) and tokens[i + 1] == ('symbol', '.'):
+            i += 2
+        else:
+            break
+    return parts
+
+
+def _after(tokens, keyword, start=0):
+    for i in range(start, len(tokens)):
+        if tokens[i] == ('word', keyword):
+            return i + 1
+    return None
+
+
+def classify(tokens):
+    """
+    (écrits, lus, barrière, tout_écrit, créé) d'une instruction ; lus inclut
+    tout nom cité, tout_écrit indique un bloc DO / SELECT qui peut modifier
+    tout ce qu'il cite, créé est l'objet d'un CREATE (pas la table de ON).
+    """
+    words = [value for kind, value in tokens if kind == 'word']
+    writes = set()
+    created = None
+    reads = {name for _, name in _names(tokens)}
+    for kind, value in tokens:
+        if kind == 'body':
+            for body in tokenize(value):
+                reads |= {name for _, name in _names(body)}
+    head = words[0] if words else ''
+    text = ' '.join(words)
+    barrier = any(pattern.search(text) for pattern in _BARRIERS)
+
+    if head in ('create', 'drop', 'alter'):
+        i = 1
+        while i < len(tokens) and tokens[i][0] == 'word' and tokens[i][1] in _CREATE_MODIFIERS:
+            i += 1
+        kind = tokens[i][1] if i < len(tokens) else ''
+        name, at = _target(tokens, i + 1)
+        if head == 'create':
+            created = EXTENSIONS_KEY if kind == 'extension' else name
+        if kind == 'extension':
+            writes.add(EXTENSIONS_KEY)
+        elif kind in ('index', 'trigger', 'policy', 'rule'):
+            # L'objet appartient à la table de ON ... (index anonyme : CREATE INDEX ON t)
+            on = _after(tokens, 'on', i + 1)
+            table = _target(tokens, on)[0] if on is not None else None
+            writes.update(n for n in (name, table) if n)
+        elif name:
+            writes.add(name)
+        if kind == 'table' and head == 'create':
+            # Les clés étrangères verrouillent les tables référencées
+            for j, (token_kind, value) in enumerate(tokens):
+                if (token_kind, value) == ('word', 'references'):
+                    reads.update(n for n in [_target(tokens, j + 1)[0]] if n)
+    elif head == 'comment':
+        on = _after(tokens, 'on')
+        name = None
+        if on is not None and on + 1 < len(tokens):
+            kind = tokens[on][1]
+            if kind in ('policy', 'trigger', 'rule'):
+                at = _after(tokens, 'on', on + 1)
+                name = _target(tokens, at)[0] if at is not None else None
+            elif kind == 'column':
+                # COMMENT ON COLUMN [schema.]table.colonne : la table
+                parts = _dotted(tokens, on + 1)
+                name = '.'.join((['public'] + parts[:-1])[-2:]) if len(parts) >= 2 else None
+            else:
+                name = _target(tokens, on + 1)[0]
+        if name:
+            writes.add(name)
+    elif head in ('grant', 'revoke'):
+        on = _after(tokens, 'on')
+        if on is not None:
+            name, _ = _target(tokens, on)
+            if name in ('public.table', 'public.function', 'public.sequence', 'public.schema'):
+                name, _ = _target(tokens, on + 1)
+            if name:
+                writes.add(name)
+    elif head in ('insert', 'update', 'delete'):
+        at = _after(tokens, 'into') if head == 'insert' else _after(tokens, 'from') if head == 'delete' else 1
+        name = _target(tokens, at)[0] if at is not None else None
+        if name:
+            writes.add(name)
+    if reads & {f'public.{name}' for name in EXTENSION_FUNCTIONS}:
+        reads.add(EXTENSIONS_KEY)
+    # Blocs anonymes et fonctions de backfill : tout ce qui est cité peut être modifié
+    return writes, reads, barrier, head in ('do', 'select', 'perform', 'call'), created
+
+
+def defined_columns(tokens):
+    """Colonnes (table, colonne) définies par CREATE TABLE (...) ou ALTER TABLE ... ADD [COLUMN]"""
+    words = [value for kind, value in tokens[:2] if kind == 'word']
+    if words != ['create', 'table'] and words != ['alter', 'table']:
+        return set()
+    table, at = _target(tokens, 2)
+    if table is None:
+        return set()
+    columns = set()
+    if words[0] == 'create':
+        depth, expect = 0, False
+        for kind, value in tokens[at:]:
+            if (kind, value) == ('symbol', '('):
+                depth += 1
+                expect = depth == 1
+            elif (kind, value) == ('symbol', ')'):
+                depth -= 1
+            elif depth == 1 and (kind, value) == ('symbol', ','):
+                expect = True
+            elif expect:
+                if kind in ('word', 'quoted') and value not in _TABLE_CONSTRAINTS:
+                    columns.add((table, value))
+                expect = False
+        return columns
+    for i, (kind, value) in enumerate(tokens):
+        if (kind, value) == ('word', 'add'):
+            j = i + 1 + (tokens[i + 1:i + 2] == [('word', 'column')])
+            while j < len(tokens) and tokens[j][0] == 'word' and tokens[j][1] in _SKIP:
+                j += 1
+            if j < len(tokens) and tokens[j][0] in ('word', 'quoted') and tokens[j][1] not in _TABLE_CONSTRAINTS:
+                columns.add((table, tokens[j][1]))
+    return columns
+
+
+def _uses(tokens):
+    """(noms, mots) cités par une instruction, corps $$...$$ compris"""
+    names = {name for _, name in _names(tokens)}
+    words = {value for kind, value in tokens if kind in ('word', 'quoted')}
+    for kind, value in tokens:
+        if kind == 'body':
+            for body in tokenize(value):
+                names |= {name for _, name in _names(body)}
+                words |= {v for k, v in body if k in ('word', 'quoted')}
+    return names, words
+
+
+def _executes(tokens):
+    """Vrai si l'instruction exécute du SQL dynamique (EXECUTE hors EXECUTE FUNCTION/PROCEDURE)"""
+    if tokens[:1] == [('word', 'execute')]:
+        return True
+    for kind, value in tokens:
+        if kind != 'body':
+            continue
+        for body in tokenize(value):
+            for i, token in enumerate(body):
+                if token == ('word', 'execute') and body[i + 1:i + 2] not in (
+                        [('word', 'function')], [('word', 'procedure')]):
+                    return True
+    return False
+
+
+class Migration:
+    """Un fichier SQL, ses objets écrits/lus et sa place dans le DAG"""
+
+    def __init__(self, path, sql, order):
+        self.path = path
+        self.name = os.path.relpath(path, ROOT)
+        self.sql = sql
+        self.order = order
+        self.checksum = hashlib.sha256(sql.encode('utf-8')).hexdigest()
+        self.writes, self.reads, self.wild, self.barrier = set(), set(), set(), False
+        self.creates, self.columns, self.uses = set(), set(), []
+        self.statements = scan(sql)
+        self.dynamic, self.opaque = set(), False
+        for tokens, _, _ in self.statements:
+            writes, reads, barrier, wild, created = classify(tokens)
+            if _executes(tokens):
+                if tokens[0] == ('word', 'do') or tokens[0] == ('word', 'execute'):
+                    self.opaque = True
+                elif created:
+                    self.dynamic.add(created)
+            if created:
+                self.creates.add(created)
+            self.columns |= defined_columns(tokens)
+            self.uses.append(_uses(tokens))
+            self.writes |= writes
+            self.reads |= reads
+            if wild:
+                self.wild |= reads
+            self.barrier = self.barrier or barrier
+        words = ' '.join(value for tokens, _, _ in self.statements for kind, value in tokens if kind == 'word')
+        self.autocommit = bool(_AUTOCOMMIT.search(words))
+        self.deps = set()
+        self.dependents = set()
+        self.warnings = []
+        self.weight = max(1, len(sql)) / 1000  # ms estimées, remplacées par la durée connue
+
+    def executable_sql(self):
+        """Le SQL sans BEGIN/COMMIT de premier niveau (le fichier a déjà sa transaction)"""
+        if self.autocommit:
+            return self.sql
+        pieces, pos = [], 0
+        for tokens, start, end in self.statements:
+            if [value for _, value in tokens] in _TRANSACTION_CONTROL:
+                pieces.append(self.sql[pos:start])
+                pos = end
+        pieces.append(self.sql[pos:])
+        return ''.join(pieces)
+
+
+def version_key(path):
+    """Ordre des fichiers : datés (2025-11-06_, 20251130145402_, 20250125_) puis les autres"""
+    name = os.path.basename(path)
+    match = _VERSION.match(name)
+    if match:
+        year, month, day, sequence = match.groups()
+        return (0, f'{year}{month}{day}', int(sequence or 0), name)
+    return (1, '', 0, name)
+
+
+def discover(bases=(BASE,), pattern=MIGRATIONS, include=(), exclude=()):
+    paths = [os.path.join(ROOT, base) for base in bases if os.path.exists(os.path.join(ROOT, base))]
+    paths += sorted(glob.glob(os.path.join(ROOT, pattern)), key=version_key)
+    for extra in include:
+        paths += sorted(glob.glob(os.path.join(ROOT, extra)))
+    # Un fichier passé en --base n'est pas ré-appliqué avec les migrations
+    paths = list(dict.fromkeys(os.path.normpath(path) for path in paths))
+    paths = [path for path in paths
+             if not any(fnmatch.fnmatch(os.path.relpath(path, ROOT), pattern) for pattern in exclude)]
+    migrations = []
+    for order, path in enumerate(paths):
+        with open(path, 'r', encoding='utf-8') as f:
+            migrations.append(Migration(path, f.read(), order))
+    return migrations
+
+
+def ordering_warnings(migrations):
+    """
+    Fichiers qui utilisent un objet créé, ou une colonne ajoutée, par un
+    fichier plus récent (20250125_create_client_messages.sql cite
+    clients.user_id, ajoutée en 2026) : {migration: [fichiers plus récents]}.
+    Une colonne est utilisée quand une instruction cite sa table et son nom ;
+    l'heuristique a des faux positifs, d'où un simple avertissement : l'ordre
+    des noms de fichier reste celui de la production et n'est jamais modifié.
+    """
+    definer, column_definer = {}, {}
+    for m in migrations:
+        for key in m.creates:
+            definer.setdefault(key, m)
+        for table, column in m.columns:
+            column_definer.setdefault(table, {}).setdefault(column, m)
+    warnings = {}
+    for m in migrations:
+        needed = {definer[key] for key in (m.reads | m.writes) - m.creates
+                  if key in definer and definer[key] is not m}
+        for names, words in m.uses:
+            for table in names & column_definer.keys():
+                needed.update(adder for column, adder in column_definer[table].items()
+                              if column in words and adder is not m and (table, column) not in m.columns)
+        later = sorted((r for r in needed if r.order > m.order), key=lambda r: r.order)
+        if later:
+            warnings[m] = later
+    return warnings
+
+
+def build_dag(migrations):
+    """
+    Arête i -> j (i avant j dans l'ordre des noms) si i et j touchent un même
+    objet et que l'un l'écrit : un fichier ne tourne en même temps qu'un fichier
+    plus ancien que s'il ne touche visiblement rien de ce qu'il touche.
+    """
+    # Objets connus : ceux qu'une instruction DDL/DML désigne explicitement
+    known = set().union(*(m.writes for m in migrations)) if migrations else set()
+    for m in migrations:
+        m.reads &= known
+        m.writes |= m.wild & known
+    # SQL dynamique (EXECUTE dans un DO, fonction à EXECUTE appelée) : objets invisibles
+    dynamic = set().union(*(m.dynamic for m in migrations)) if migrations else set()
+    for m in migrations:
+        m.opaque = m.opaque or bool(m.wild & dynamic)
+        m.barrier = m.barrier or m.opaque
+    for m, later in ordering_warnings(migrations).items():
+        m.warnings = later
+    for j, later in enumerate(migrations):
+        for earlier in migrations[:j]:
+            if (earlier.barrier or later.barrier
+                    or earlier.writes & (later.writes | later.reads)
+                    or earlier.reads & later.writes):
+                later.deps.add(earlier)
+                earlier.dependents.add(later)
+    return migrations
+
+
+def critical_paths(migrations):
+    """Longueur (poids) du plus long chemin de chaque migration jusqu'à la fin du DAG"""
+    rank = {}
+    for m in reversed(migrations):
+        rank[m] = m.weight + max((rank[d] for d in m.dependents if d in rank), default=0)
+    return rank
+
+
+def waves(migrations):
+    """Niveaux du DAG : chaque vague ne dépend que des précédentes (déjà appliquées ignorées)"""
+    level = {}
+    for m in migrations:
+        level[m] = 1 + max((level[d] for d in m.deps if d in level), default=-1)
+    grouped = {}
+    for m, n in level.items():
+        grouped.setdefault(n, []).append(m)
+    return [grouped[n] for n in sorted(grouped)]
+
+
+# --- Exécution ----------------------------------------------------------------
+
+def _sqlstate(exc):
+    return getattr(exc, 'sqlstate', None) or getattr(exc, 'pgcode', None)
+
+
+def _retryable(exc):
+    return _sqlstate(exc) in RETRY_SQLSTATES or 'tuple concurrently updated' in str(exc)
+
+
+class ConnectionPool:
+    """Une connexion par thread du pool, ouverte à la première migration"""
+
+    def __init__(self, connect, url):
+        self.connect = connect
+        self.url = url
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def get(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = self.connect(self.url)
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def close(self):
+        for conn in self.connections:
+            conn.close()
+
+
+def apply_one(pool, migration, lock_timeout, attempts):
+    """
+    Applique migration + son checksum en une transaction ; retourne (ms, tentatives).
+    Un fichier autocommit est exécuté instruction par instruction, puis son
+    checksum est enregistré une fois la dernière passée. Chaque instruction y
+    est validée aussitôt : une nouvelle tentative reprend à celle qui a échoué.
+    """
+    conn = pool.get()
+    sql = migration.executable_sql()
+    committed = 0  # instructions autocommit déjà validées
+    for attempt in range(attempts):
+        started = time.perf_counter()
+        try:
+            cur = conn.cursor()
+            if migration.autocommit:
+                # Une requête multi-instructions serait une transaction implicite :
+                # CREATE INDEX CONCURRENTLY, VACUUM... partent donc un par un
+                conn.autocommit = True
+                cur.execute(f"SET lock_timeout = '{lock_timeout}'")
+                for _, start, end in migration.statements[committed:]:
+                    cur.execute(sql[start:end])
+                    committed += 1
+                conn.autocommit = False
+            else:
+                cur.execute(f"SET LOCAL lock_timeout = '{lock_timeout}'")
+                cur.execute(sql)
+            duration = round((time.perf_counter() - started) * 1000)
+            cur.execute(RECORD_SQL, (migration.name, migration.checksum, duration))
+            conn.commit()
+            # Un SET de session dans un fichier ne doit pas suivre la connexion (pas de
+            # DISCARD ALL : il supprimerait les requêtes préparées par le driver)
+            conn.autocommit = True
+            cur.execute("RESET ALL")
+            conn.autocommit = False
+            return duration, attempt + 1
+        except Exception as exc:
+            if not conn.autocommit:
+                conn.rollback()
+            else:
+                cur.execute("RESET ALL")
+            conn.autocommit = False
+            if not _retryable(exc) or attempt + 1 == attempts:
+                raise
+            time.sleep(0.05 * 2 ** attempt * (1 + random.random()))
+
+
+def read_applied(conn):
+    cur = conn.cursor()
+    cur.execute(TRACKING_SQL)
+    cur.execute("SELECT name, checksum, duration_ms FROM migrations.applied")
+    applied = {name: (checksum, duration) for name, checksum, duration in cur.fetchall()}
+    conn.commit()
+    return applied
+
+
+def select(migrations, applied, reapply_changed=False):
+    """(à appliquer, déjà appliquées, modifiées depuis) ; les durées connues servent de poids"""
+    todo, done, changed = [], [], []
+    for m in migrations:
+        if m.name in applied:
+            checksum, duration = applied[m.name]
+            m.weight = max(duration, 1)
+            if checksum == m.checksum:
+                done.append(m)
+                continue
+            changed.append(m)
+            if not reapply_changed:
+                continue
+        todo.append(m)
+    return todo, done, changed
+
+
+def run(pool, migrations, jobs, lock_timeout, attempts, keep_going=False):
+    """
+    Exécute le DAG restreint à migrations, chemin critique d'abord ; retourne
+    (ok, échecs). Au premier échec, plus rien n'est lancé, sauf keep_going :
+    seules les migrations qui en dépendent sont alors abandonnées.
+    """
+    pending = set(migrations)
+    rank = critical_paths(migrations)
+    waiting = {m: len(m.deps & pending) for m in migrations}
+    ready = [m for m in migrations if waiting[m] == 0]
+    results, failures = {}, {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        running = {}
+        while ready or running:
+            ready.sort(key=lambda m: (-rank[m], m.order))
+            while ready and len(running) < jobs and (keep_going or not failures):
+                m = ready.pop(0)
+                running[executor.submit(apply_one, pool, m, lock_timeout, attempts)] = m
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                m = running.pop(future)
+                try:
+                    duration, tries = future.result()
+                except Exception as exc:
+                    failures[m] = exc
+                    print(f"  ❌ {m.name} : {str(exc).strip().splitlines()[0]}")
+                    continue
+                results[m] = duration
+                retry = f", {tries} tentatives" if tries > 1 else ''
+                print(f"  ✅ {m.name} ({duration} ms{retry})")
+                for dependent in m.dependents:
+                    if dependent in waiting:
+                        waiting[dependent] -= 1
+                        if waiting[dependent] == 0:
+                            ready.append(dependent)
+    return results, failures
+
+
+# --- CLI ----------------------------------------------------------------------
+
+def print_plan(migrations):
+    levels = waves(migrations)
+    rank = critical_paths(migrations)
+    barriers = [m for m in migrations if m.barrier]
+    print(f"🧭 {len(migrations)} migration(s), {len(levels)} vague(s), "
+          f"jusqu'à {max(len(level) for level in levels)} en parallèle")
+    for n, level in enumerate(levels, 1):
+        print(f"\n  vague {n} ({len(level)})")
+        for m in sorted(level, key=lambda m: m.order):
+            flags = ' [SQL dynamique]' if m.opaque else ' [barrière]' if m.barrier else ''
+            flags += ' [autocommit]' if m.autocommit else ''
+            flags += ' [⚠️  ordre suspect]' if m.warnings else ''
+            print(f"    {m.name}{flags}")
+    longest = max(rank.values())
+    print(f"\n⛓️  Chemin critique estimé : {longest:.0f} ms sur {sum(m.weight for m in migrations):.0f} ms cumulés")
+    if barriers:
+        print(f"🚧 {len(barriers)} barrière(s) (GRANT ... ON ALL, DEFAULT PRIVILEGES, DROP SCHEMA,"
+              f" SQL dynamique) : ordre total autour")
+    print_warnings(migrations)
+
+
+def print_warnings(migrations):
+    suspects = [m for m in migrations if m.warnings]
+    if not suspects:
+        return
+    print(f"\n⚠️  {len(suspects)} fichier(s) semblent utiliser ce que crée un fichier plus récent"
+          f" (ordre des noms conservé) :")
+    for m in suspects:
+        print(f"    {m.name} → {', '.join(r.name for r in m.warnings)}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db-url', default=os.environ.get('SUPABASE_DB_URL'),
+                        help="connexion Postgres directe (défaut: $SUPABASE_DB_URL)")
+    parser.add_argument('--base', action='append',
+                        help=f"SQL de base appliqué avant les migrations (défaut: {BASE}, répétable)")
+    parser.add_argument('--migrations', default=MIGRATIONS, help=f"glob des migrations (défaut: {MIGRATIONS})")
+    parser.add_argument('--include', action='append', default=[],
+                        help="fichiers SQL en plus, après les migrations (ex. 'APPLY_*.sql', répétable)")
+    parser.add_argument('--exclude', action='append', default=[],
+                        help="fichiers à ignorer (glob sur le chemin relatif, répétable)")
+    parser.add_argument('--jobs', type=int, default=8, help="connexions / migrations en parallèle (défaut: 8)")
+    parser.add_argument('--lock-timeout', default='10s', help="lock_timeout par migration (défaut: 10s)")
+    parser.add_argument('--attempts', type=int, default=5,
+                        help="tentatives par migration sur deadlock / timeout de verrou (défaut: 5)")
+    parser.add_argument('--plan', action='store_true', help="afficher le DAG sans se connecter")
+    parser.add_argument('--dry-run', action='store_true', help="lister ce qui serait appliqué")
+    parser.add_argument('--reapply-changed', action='store_true',
+                        help="ré-appliquer les fichiers modifiés depuis leur application")
+    parser.add_argument('--keep-going', action='store_true',
+                        help="après un échec, continuer les migrations qui n'en dépendent pas")
+    parser.add_argument('--local-stubs', action='store_true',
+                        help="créer d'abord les schémas/rôles Supabase minimaux (Postgres local vide)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    migrations = build_dag(discover(args.base or [BASE], args.migrations, args.include, args.exclude))
+    if not migrations:
+        raise SystemExit(f"❌ Aucune migration trouvée ({args.migrations})")
+    if args.plan:
+        print_plan(migrations)
+        return
+    if not args.db_url:
+        raise SystemExit("❌ --db-url ou $SUPABASE_DB_URL requis (--plan pour le DAG seul)")
+
+    setup = load_script('setup-storage.py')
+    conn = setup._connect(args.db_url)
+    try:
+        if args.local_stubs:
+            cur = conn.cursor()
+            cur.execute(setup.LOCAL_STUBS_SQL)
+            cur.execute(SUPABASE_STUBS_SQL)
+            conn.commit()
+        applied = read_applied(conn)
+    finally:
+        conn.close()
+
+    todo, done, changed = select(migrations, applied, args.reapply_changed)
+    print(f"🚀 {len(todo)} migration(s) à appliquer, {len(done)} déjà appliquée(s)")
+    for m in changed:
+        action = "ré-appliquée" if args.reapply_changed else "ignorée (--reapply-changed)"
+        print(f"  ⚠️  {m.name} modifiée depuis son application : {action}")
+    if not todo:
+        return
+    if args.dry_run:
+        print_plan(todo)
+        return
+    print_warnings(todo)
+
+    jobs = max(1, args.jobs)
+    pool = ConnectionPool(setup._connect, args.db_url)
+    started = time.perf_counter()
+    try:
+        results, failures = run(pool, todo, jobs, args.lock_timeout, max(1, args.attempts), args.keep_going)
+    finally:
+        pool.close()
+    wall = time.perf_counter() - started
+
+    total = sum(results.values())
+    print(f"\n⏱️  {len(results)} migration(s) en {wall:.2f} s ({total / 1000:.2f} s cumulées, {jobs} connexion(s))")
+    if failures:
+        skipped = len(todo) - len(results) - len(failures)
+        raise SystemExit(f"❌ {len(failures)} échec(s), {skipped} migration(s) non lancée(s)")
+
+
+if __name__ == '__main__':
+    main()
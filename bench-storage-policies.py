@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark des profils de politiques storage.objects (setup-storage.py PROFILES).
+
+Pour chaque taille, insère N objets répartis entre --users dossiers
+utilisateur dans un Postgres local, applique chaque profil (politiques + index)
+puis mesure EXPLAIN ANALYZE des requêtes d'un utilisateur authentifié (meilleur
+et médiane sur --repeat runs). Tout se fait dans une transaction annulée à la
+fin : la base n'est pas modifiée.
+
+    python bench-storage-policies.py --db-url postgresql://localhost/test --objects 10000 100000
+    python bench-storage-policies.py --db-url postgresql://localhost/test --output bench-rls.json
+"""
+
+import argparse
+import json
+import statistics
+from urllib.parse import urlsplit
+
+from scriptutil import load_script
+
+# Requêtes d'un utilisateur ; la RLS ajoute le filtre de la politique SELECT
+QUERIES = {
+    'list': "SELECT id, name FROM storage.objects",
+    'list-bucket-sorted': "SELECT name FROM storage.objects WHERE bucket_id = 'documents' ORDER BY name LIMIT 100",
+}
+
+SEED_SQL = """
+INSERT INTO storage.objects (bucket_id, name)
+SELECT CASE WHEN g %% 10 = 0 THEN 'avatars' ELSE 'documents' END,
+       md5((g %% %(users)s)::text)::uuid::text || '/' || g || '.pdf'
+FROM generate_series(1, %(objects)s) g
+"""
+
+
+def is_local(url):
+    host = urlsplit(url).hostname
+    if not host:  # socket unix (?host=/chemin) ou défaut libpq
+        return True
+    return host in ('localhost', '127.0.0.1', '::1')
+
+
+def _nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _nodes(child)
+
+
+def explain(cur, query):
+    """(temps d'exécution ms, lignes, [parcours de storage.objects])"""
+    cur.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}")
+    result = cur.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    top = result[0]
+    scans = [f"{node['Node Type']}" + (f" {node['Index Name']}" if 'Index Name' in node else '')
+             for node in _nodes(top['Plan']) if node.get('Relation Name') == 'objects']
+    return top['Execution Time'], top['Plan']['Actual Rows'], scans
+
+
+def run_profile(setup, cur, profile, uid, repeat):
+    spec = setup.PROFILES[profile]
+    cur.execute("SAVEPOINT profile")
+    cur.execute("SELECT policyname FROM pg_policies WHERE schemaname = 'storage' AND tablename = 'objects'")
+    for (name,) in cur.fetchall():
+        cur.execute(setup.drop_sql(name))
+    for index in spec['indexes']:
+        cur.execute(setup.index_sql(index, concurrently=False))
+    cur.execute(setup.guarded_sql(spec['policies']))
+    cur.execute(f"ANALYZE {setup.TABLE}")
+    cur.execute("SET LOCAL ROLE authenticated")
+    cur.execute("SELECT set_config('request.jwt.claim.sub', %s, true),"
+                " set_config('request.jwt.claims', %s, true)",
+                (uid, json.dumps({'sub': uid, 'role': 'authenticated'})))
+    results = {}
+    for query_name, query in QUERIES.items():
+        explain(cur, query)  # chauffe le cache
+        runs = [explain(cur, query) for _ in range(repeat)]
+        times = [run[0] for run in runs]
+        results[query_name] = {
+            'best_ms': min(times),
+            'median_ms': statistics.median(times),
+            'rows': runs[0][1],
+            'scans': runs[0][2],
+        }
+    cur.execute("RESET ROLE")
+    cur.execute("ROLLBACK TO SAVEPOINT profile")
+    return results
+
+
+def bench(setup, url, sizes, users, repeat):
+    conn = setup._connect(url)
+    report = []
+    try:
+        cur = conn.cursor()
+        cur.execute(setup.LOCAL_STUBS_SQL)
+        cur.execute("SELECT md5('1')::uuid::text")
+        uid = cur.fetchone()[0]
+        for objects in sizes:
+            cur.execute("SAVEPOINT seed")
+            cur.execute(SEED_SQL, {'objects': objects, 'users': users})
+            entry = {'objects': objects, 'users': users, 'profiles': {}}
+            for profile in setup.PROFILES:
+                entry['profiles'][profile] = run_profile(setup, cur, profile, uid, repeat)
+            report.append(entry)
+            print_entry(entry)
+            cur.execute("ROLLBACK TO SAVEPOINT seed")
+    finally:
+        conn.rollback()
+        conn.close()
+    return report
+
+
+def print_entry(entry):
+    print(f"\n📦 {entry['objects']:,} objets, {entry['users']} utilisateurs")
+    profiles = entry['profiles']
+    for query_name in QUERIES:
+        print(f"  {query_name}")
+        baseline = profiles['baseline'][query_name]['median_ms']
+        for profile, results in profiles.items():
+            result = results[query_name]
+            speedup = baseline / result['median_ms'] if result['median_ms'] else float('inf')
+            print(f"    {profile:<10} {result['best_ms']:9.2f} ms (méd. {result['median_ms']:9.2f})"
+                  f"  x{speedup:6.1f}  {result['rows']:>6} ligne(s)  {', '.join(result['scans'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db-url', required=True, help="Postgres local de test")
+    parser.add_argument('--objects', type=int, nargs='+', default=[10000, 100000],
+                        help="nombre d'objets insérés (plusieurs tailles possibles)")
+    parser.add_argument('--users', type=int, default=100, help="dossiers utilisateur (défaut: 100)")
+    parser.add_argument('--repeat', type=int, default=5, help="runs par mesure (défaut: 5)")
+    parser.add_argument('--allow-remote', action='store_true',
+                        help="accepter un hôte non local (la transaction est annulée, mais verrouille storage.objects)")
+    parser.add_argument('--output', help="écrire les résultats (JSON) dans ce fichier")
+    args = parser.parse_args()
+
+    if not is_local(args.db_url) and not args.allow_remote:
+        raise SystemExit("❌ Hôte non local : ce benchmark est prévu pour un Postgres de test (--allow-remote)")
+    setup = load_script('setup-storage.py')
+    print(f"⏱️  Profils {', '.join(setup.PROFILES)} : {len(QUERIES)} requête(s), {args.repeat} run(s)")
+    report = bench(setup, args.db_url, args.objects, max(1, args.users), max(1, args.repeat))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Résultats: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
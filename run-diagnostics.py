@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Exécute les diagnostics CHECK_*.sql / check-*.sql en parallèle et n'affiche que ce qui a changé.
+
+Chaque fichier est découpé en requêtes (cf. scan() d'apply-migrations.py),
+exécutées dans une transaction READ ONLY annulée à la fin : les INSERT/UPDATE
+glissés dans certains diagnostics échouent au lieu de modifier la base. Les
+fichiers tournent en même temps sur --jobs connexions et leurs résultats
+s'affichent au fur et à mesure.
+
+Chaque résultat est rangé dans .diagnostics-cache/<cible>/ sous la clé
+hash de la requête + version du schéma (empreinte du catalogue : tables,
+colonnes, contraintes, politiques, triggers, fonctions, rôles). Une requête
+qui ne lit que le catalogue (pg_*, information_schema) ne dépend que du
+schéma : si sa clé est en cache, elle n'est pas ré-exécutée (--refresh pour
+forcer). Statistiques (pg_stat*), réglages (pg_settings) et tailles
+(pg_*_size) changent à schéma égal : jamais en cache. Le dernier run est gardé comme snapshot ; on n'affiche que les
+lignes ajoutées (+) ou disparues (-) depuis, requête par requête.
+
+    python run-diagnostics.py --db-url postgresql://localhost/test
+    python run-diagnostics.py --db-url $SUPABASE_DB_URL CHECK_POLICIES.sql CHECK_TRIGGERS.sql
+    python run-diagnostics.py --db-url $SUPABASE_DB_URL --all --refresh
+
+Connexion : psycopg ou psycopg2 (cf. setup-storage.py).
+"""
+
+import argparse
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit, urlunsplit
+
+from scriptutil import load_script
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PATTERNS = ['CHECK_*.sql', 'check-*.sql']
+CACHE_DIR = '.diagnostics-cache'
+MAX_ENTRIES = 512
+# À incrémenter dès que le format des entrées ou du snapshot change
+CACHE_VERSION = 1
+
+# Empreinte de tout ce que voient les requêtes sur le catalogue
+SCHEMA_VERSION_SQL = """
+WITH ns AS (
+  SELECT oid FROM pg_namespace
+  WHERE nspname NOT IN ('pg_catalog', 'information_schema')
+    AND nspname NOT LIKE 'pg_toast%' AND nspname NOT LIKE 'pg_temp%'
+)
+SELECT md5(string_agg(part, E'\\n' ORDER BY part)) FROM (
+  SELECT format('rel %s %s %s %s', c.oid::regclass, c.relkind, c.relrowsecurity, c.relacl) AS part
+  FROM pg_class c WHERE c.relnamespace IN (SELECT oid FROM ns)
+  UNION ALL
+  SELECT format('col %s %s %s %s %s', a.attrelid::regclass, a.attname,
+                format_type(a.atttypid, a.atttypmod), a.attnotnull, pg_get_expr(d.adbin, d.adrelid))
+  FROM pg_attribute a
+  JOIN pg_class c ON c.oid = a.attrelid
+  LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+  WHERE c.relnamespace IN (SELECT oid FROM ns) AND a.attnum > 0 AND NOT a.attisdropped
+  UNION ALL
+  SELECT format('con %s %s %s', conrelid::regclass, conname, pg_get_constraintdef(oid))
+  FROM pg_constraint WHERE connamespace IN (SELECT oid FROM ns)
+  UNION ALL
+  SELECT format('pol %s %s %s %s %s %s', polrelid::regclass, polname, polcmd, polroles,
+                pg_get_expr(polqual, polrelid), pg_get_expr(polwithcheck, polrelid))
+  FROM pg_policy
+  UNION ALL
+  SELECT format('trg %s', pg_get_triggerdef(oid)) FROM pg_trigger WHERE NOT tgisinternal
+  UNION ALL
+  SELECT format('fn %s %s %s', oid::regprocedure, md5(prosrc), proacl)
+  FROM pg_proc WHERE pronamespace IN (SELECT oid FROM ns)
+  UNION ALL
+  SELECT format('role %s', rolname) FROM pg_roles
+) parts
+"""
+
+# Fonctions, vues et colonnes dont le résultat change d'un run à l'autre à schéma
+# égal (horloge, statistiques, réglages, tailles)
+_VOLATILE = {'now', 'current_timestamp', 'current_date', 'current_time', 'localtime',
+             'localtimestamp', 'clock_timestamp', 'statement_timestamp', 'transaction_timestamp',
+             'timeofday', 'random', 'gen_random_uuid', 'txid_current', 'pg_backend_pid',
+             'pg_locks', 'pg_settings', 'pg_file_settings', 'current_setting', 'pg_postmaster_start_time',
+             'pg_sequence_last_value', 'pg_sequences', 'pg_replication_slots', 'pg_prepared_xacts',
+             'reltuples', 'relpages', 'relallvisible', 'pg_size_bytes'}
+_VOLATILE_PREFIXES = ('pg_stat', 'pg_current_', 'pg_last_', 'pg_is_')
+
+
+def _volatile(word):
+    """pg_stat*/pg_statio*, pg_settings, pg_*_size()... : résultat non fixé par le schéma"""
+    return (word in _VOLATILE or word.startswith(_VOLATILE_PREFIXES)
+            or (word.startswith('pg_') and word.endswith('_size')))
+
+
+def digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+# --- Requêtes -----------------------------------------------------------------
+
+class Query:
+    """Une requête d'un fichier de diagnostic, avec son libellé (commentaire qui la précède)"""
+
+    def __init__(self, path, index, sql, label, catalog_only):
+        self.path = path
+        self.index = index
+        self.sql = sql
+        self.label = label
+        self.catalog_only = catalog_only
+        self.hash = digest(sql)
+
+    @property
+    def id(self):
+        return f"{os.path.relpath(self.path, ROOT)}#{self.index}"
+
+
+def _label(gap):
+    """Dernier commentaire '-- ...' avant une requête"""
+    comments = [line.strip()[2:].strip() for line in gap.splitlines() if line.strip().startswith('--')]
+    comments = [c for c in comments if c]
+    return comments[-1] if comments else ''
+
+
+def catalog_only(migrations, tokens):
+    """
+    Vrai si la requête lit au moins une relation pg_* / information_schema et
+    rien d'autre (résultat fixé par le schéma). Sans FROM (SELECT auth.uid(),
+    SELECT public.get_user_cabinets()) ou avec un appel de fonction qualifié
+    hors catalogue, la requête peut lire des données : jamais en cache.
+    """
+    catalog = False
+    for i, (kind, value) in enumerate(tokens):
+        if kind in ('word', 'quoted') and _volatile(value.lower()):
+            return False
+        if (kind == 'symbol' and value == '(' and i >= 3 and tokens[i - 2] == ('symbol', '.')
+                and tokens[i - 3][1].lower() not in ('pg_catalog', 'information_schema')):
+            return False  # schema.fonction(...)
+        if tokens[i] not in (('word', 'from'), ('word', 'join')):
+            continue
+        parts = migrations._dotted(tokens, i + 1)
+        if not parts:
+            continue  # sous-requête : ses FROM sont examinés à leur tour
+        schema = parts[0].lower() if len(parts) > 1 else None
+        name = parts[-1].lower()
+        if schema in ('pg_catalog', 'information_schema') or (schema is None and name.startswith('pg_')):
+            catalog = True
+            continue
+        return False
+    return catalog
+
+
+def split_file(migrations, path):
+    with open(path, 'r', encoding='utf-8') as f:
+        sql = f.read()
+    queries, previous = [], 0
+    for index, (tokens, start, end) in enumerate(migrations.scan(sql), 1):
+        text = sql[start:end].strip().rstrip(';').strip()
+        label = _label(sql[previous:start]) or ' '.join(text.split())[:60]
+        queries.append(Query(path, index, text, label, catalog_only(migrations, tokens)))
+        previous = end
+    return queries
+
+
+def discover(patterns, exclude):
+    paths = []
+    for pattern in patterns:
+        matches = glob.glob(pattern if os.path.isabs(pattern) else os.path.join(ROOT, pattern))
+        paths.extend(sorted(matches) or ([pattern] if os.path.exists(pattern) else []))
+    paths = list(dict.fromkeys(os.path.normpath(os.path.abspath(p)) for p in paths))
+    return [p for p in paths
+            if not any(fnmatch.fnmatch(os.path.relpath(p, ROOT), pattern) for pattern in exclude)]
+
+
+# --- Cache et snapshot --------------------------------------------------------
+
+def target_name(url):
+    """Répertoire de cache propre à la base visée (URL sans mot de passe)"""
+    parts = urlsplit(url)
+    netloc = parts.hostname or ''
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    if parts.port:
+        netloc = f"{netloc}:{parts.port}"
+    return digest(urlunsplit(parts._replace(netloc=netloc)))
+
+
+class ResultCache:
+    """Résultats par clé requête+schéma (JSON, LRU) et snapshot du dernier run"""
+
+    def __init__(self, directory, max_entries=MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'result-{key}.json')
+
+    def _read(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry['data'] if entry.get('version') == CACHE_VERSION else None
+
+    def _write(self, path, data):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'data': data}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def get(self, key):
+        data = self._read(self._path(key))
+        if data is None:
+            self.misses += 1
+            return None
+        os.utime(self._path(key))
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        self._write(self._path(key), data)
+
+    def load_snapshot(self):
+        return self._read(os.path.join(self.directory, 'snapshot.json')) or {}
+
+    def save_snapshot(self, snapshot):
+        self._write(os.path.join(self.directory, 'snapshot.json'), snapshot)
+        self._evict()
+
+    def _evict(self):
+        entries = [e for e in os.scandir(self.directory) if e.name.startswith('result-')]
+        if len(entries) <= self.max_entries:
+            return
+        dated = sorted((e.stat().st_mtime_ns, e.path) for e in entries)
+        for _, path in dated[:len(dated) - self.max_entries]:
+            os.remove(path)
+
+    @property
+    def stats(self):
+        return f"{self.hits} hit(s), {self.misses} miss(es)"
+
+
+# --- Exécution ----------------------------------------------------------------
+
+def schema_version(conn):
+    cur = conn.cursor()
+    cur.execute(SCHEMA_VERSION_SQL)
+    version = cur.fetchone()[0]
+    conn.rollback()
+    return version
+
+
+def _jsonable(value):
+    return value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+
+
+def execute(cur, query):
+    """{'columns', 'rows'} ou {'error'} ; la requête tourne dans un savepoint"""
+    cur.execute("SAVEPOINT diagnostic")
+    try:
+        cur.execute(query.sql)
+        if cur.description is None:
+            result = {'columns': [], 'rows': []}
+        else:
+            result = {'columns': [column[0] for column in cur.description],
+                      'rows': [[_jsonable(v) for v in row] for row in cur.fetchall()]}
+        cur.execute("RELEASE SAVEPOINT diagnostic")
+    except Exception as exc:
+        cur.execute("ROLLBACK TO SAVEPOINT diagnostic")
+        result = {'error': str(exc).strip().splitlines()[0]}
+    return result
+
+
+def run_file(pool, cache, queries, schema, statement_timeout, refresh):
+    """Résultats de queries (un fichier) : [(requête, résultat, depuis le cache, ms)]"""
+    results, pending = [], []
+    for query in queries:
+        key = f"{query.hash}-{schema[:16]}"
+        cached = cache.get(key) if query.catalog_only and not refresh else None
+        if cached is not None:
+            results.append((query, cached, True, 0))
+        else:
+            pending.append((query, key))
+    if pending:
+        conn = pool.get()
+        cur = conn.cursor()
+        try:
+            cur.execute("SET TRANSACTION READ ONLY")
+            cur.execute(f"SET LOCAL statement_timeout = '{statement_timeout}'")
+            for query, key in pending:
+                started = time.perf_counter()
+                result = execute(cur, query)
+                duration = round((time.perf_counter() - started) * 1000)
+                if 'error' not in result:
+                    cache.put(key, result)
+                results.append((query, result, False, duration))
+        finally:
+            conn.rollback()
+    return sorted(results, key=lambda r: r[0].index)
+
+
+# --- Diff ---------------------------------------------------------------------
+
+def _row(columns, row, width):
+    text = ', '.join(f"{c}={v}" for c, v in zip(columns, row)) if columns else str(row)
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+
+def diff(previous, result):
+    """(lignes ajoutées, lignes disparues) entre deux résultats, comme multiensembles"""
+    old = Counter(json.dumps(row, ensure_ascii=False) for row in previous.get('rows', []))
+    new = Counter(json.dumps(row, ensure_ascii=False) for row in result.get('rows', []))
+    added = [json.loads(row) for row in (new - old).elements()]
+    removed = [json.loads(row) for row in (old - new).elements()]
+    return added, removed
+
+
+def report(query, result, cached, duration, previous, show_all, max_rows, width):
+    """Lignes à afficher pour une requête ; retourne (lignes, changée ?)"""
+    source = 'cache' if cached else f"{duration} ms"
+    head = f"    #{query.index} {query.label} ({source})"
+    columns = result.get('columns', [])
+    if 'error' in result:
+        changed = previous is None or previous.get('error') != result['error']
+        return [f"{head}\n      ❌ {result['error']}"] if changed or show_all else [], changed
+    rows = result['rows']
+    new = previous is None or 'error' in previous
+    if new:
+        lines = [f"{head} 🆕 {len(rows)} ligne(s)"]
+        lines += [f"      {_row(columns, row, width)}" for row in rows[:max_rows]]
+        changed = True
+    else:
+        added, removed = diff(previous, result)
+        changed = bool(added or removed) or previous.get('columns') != columns
+        if not changed:
+            return ([f"{head} = {len(rows)} ligne(s) inchangée(s)"] if show_all else []), False
+        lines = [f"{head} Δ +{len(added)} -{len(removed)} sur {len(rows)} ligne(s)"]
+        if previous.get('columns') != columns:
+            lines.append(f"      colonnes : {', '.join(previous.get('columns', []))} → {', '.join(columns)}")
+        lines += [f"      + {_row(columns, row, width)}" for row in added[:max_rows]]
+        lines += [f"      - {_row(previous.get('columns', columns), row, width)}" for row in removed[:max_rows]]
+    hidden = len(rows) - max_rows if new else 0
+    if hidden > 0:
+        lines.append(f"      … {hidden} ligne(s) de plus")
+    return lines, changed
+
+
+# --- CLI ----------------------------------------------------------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='*', default=PATTERNS,
+                        help=f"fichiers ou globs (défaut: {' '.join(PATTERNS)})")
+    parser.add_argument('--db-url', default=os.environ.get('SUPABASE_DB_URL'),
+                        help="connexion Postgres directe (défaut: $SUPABASE_DB_URL)")
+    parser.add_argument('--exclude', action='append', default=[],
+                        help="fichiers à ignorer (glob sur le chemin relatif, répétable)")
+    parser.add_argument('--jobs', type=int, default=4, help="connexions / fichiers en parallèle (défaut: 4)")
+    parser.add_argument('--statement-timeout', default='30s', help="statement_timeout par fichier (défaut: 30s)")
+    parser.add_argument('--refresh', action='store_true', help="ré-exécuter aussi les requêtes en cache")
+    parser.add_argument('--all', action='store_true', help="afficher aussi les requêtes inchangées")
+    parser.add_argument('--max-rows', type=int, default=20, help="lignes affichées par requête (défaut: 20)")
+    parser.add_argument('--width', type=int, default=160, help="largeur max d'une ligne (défaut: 160)")
+    parser.add_argument('--cache-dir', default=os.path.join(ROOT, CACHE_DIR),
+                        help=f"répertoire du cache et des snapshots (défaut: {CACHE_DIR})")
+    parser.add_argument('--no-snapshot', action='store_true',
+                        help="ne pas remplacer le snapshot (comparer plusieurs fois au même état)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.db_url:
+        raise SystemExit("❌ --db-url ou $SUPABASE_DB_URL requis")
+    paths = discover(args.files, args.exclude)
+    if not paths:
+        raise SystemExit(f"❌ Aucun diagnostic trouvé ({' '.join(args.files)})")
+
+    migrations = load_script('apply-migrations.py')
+    setup = load_script('setup-storage.py')
+    files = {path: split_file(migrations, path) for path in paths}
+    cache = ResultCache(os.path.join(args.cache_dir, target_name(args.db_url)))
+    previous = cache.load_snapshot()
+
+    pool = migrations.ConnectionPool(setup._connect, args.db_url)
+    started = time.perf_counter()
+    try:
+        schema = schema_version(pool.get())
+        if previous and previous.get('schema') != schema:
+            print(f"🧬 Schéma modifié depuis le dernier snapshot ({previous.get('taken_at', '?')})")
+        print(f"🔎 {len(paths)} fichier(s), {sum(len(q) for q in files.values())} requête(s), "
+              f"schéma {schema[:12]}, {args.jobs} connexion(s)")
+
+        snapshot = {'schema': schema, 'taken_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'queries': {}}
+        changed_count = errors = 0
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+            futures = {executor.submit(run_file, pool, cache, queries, schema,
+                                       args.statement_timeout, args.refresh): path
+                       for path, queries in files.items()}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    results = future.result()
+                except Exception as exc:
+                    errors += 1
+                    print(f"\n📋 {os.path.relpath(path, ROOT)}\n    ❌ {str(exc).strip().splitlines()[0]}")
+                    continue
+                lines = []
+                for query, result, cached, duration in results:
+                    before = previous.get('queries', {}).get(query.id)
+                    if before is not None and before.get('hash') != query.hash:
+                        before = None  # requête modifiée : pas de diff ligne à ligne
+                    output, changed = report(query, result, cached, duration,
+                                             before and before['result'], args.all, args.max_rows, args.width)
+                    changed_count += changed
+                    errors += 'error' in result
+                    lines += output
+                    snapshot['queries'][query.id] = {'hash': query.hash, 'result': result}
+                if lines:
+                    print(f"\n📋 {os.path.relpath(path, ROOT)}")
+                    print('\n'.join(lines))
+    finally:
+        pool.close()
+
+    wall = time.perf_counter() - started
+    if not args.no_snapshot:
+        cache.save_snapshot(snapshot)
+    print(f"\n⏱️  {len(snapshot['queries'])} requête(s) en {wall:.2f} s, "
+          f"{changed_count} changée(s), {errors} erreur(s) ; cache : {cache.stats}")
+
+
+if __name__ == '__main__':
+    main()
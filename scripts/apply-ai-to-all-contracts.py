@@ -6,62 +6,17 @@ qui ne l'ont pas encore dans Contrats.tsx
 
 import re
 
-# Lire le fichier
-with open('src/pages/Contrats.tsx', 'r', encoding='utf-8') as f:
-    content = f.read()
+from codemod.cache import ParseCache, load_registry
+
+# Lire le fichier et son registre de handlers (en cache si inchangé)
+raw, _, registry = load_registry('src/pages/Contrats.tsx', ParseCache())
+content = raw.decode('utf-8')
 
 # Handlers déjà intégrés avec AI (à ne pas modifier)
-ALREADY_INTEGRATED = [
-    'handleDevWebAppSubmit',
-    'handleCessionDroitsAuteurSubmit', 
-    'handleLicenceLogicielleSubmit',
-    'handleMentionsLegalesSubmit'
-]
+ALREADY_INTEGRATED = [entry.name for entry in registry if entry.has_ai]
 
 # Mapping handler -> contractType pour l'Edge Function
-CONTRACT_TYPE_MAPPING = {
-    # Avocats
-    'handleTestamentOlographeSubmit': 'Testament olographe',
-    'handleReconnaissanceDetteSubmit': 'Reconnaissance de dette',
-    'handleConventionParentaleSubmit': 'Convention parentale',
-    'handleMandatProtectionSousSeingSubmit': 'Mandat de protection sous seing privé',
-    'handleEtatLieuxSubmit': 'État des lieux',
-    'handleGenericContractSubmit': 'Contrat de prestation de services',  # Generic
-    'handleCGUSubmit': 'CGU',
-    'handleMiseEnDemeureSubmit': 'Mise en demeure',
-    'handlePacteConcubinageSubmit': 'Pacte de concubinage',
-    'handleAgenceCommercialeSubmit': 'Agence commerciale',
-    'handleProtocolePreudhommalSubmit': 'Protocole préud\'hommal',
-    'handleCDISubmit': 'CDI',
-    'handleCDDSubmit': 'CDD',
-    'handleRuptureConventionnelleSubmit': 'Rupture conventionnelle',
-    'handleStageSubmit': 'Stage',
-    'handleCompromisVenteSubmit': 'Compromis de vente',
-    'handleActeVenteSubmit': 'Acte de vente',
-    'handleBailHabitationSubmit': 'Bail habitation',
-    'handleBailCommercialSubmit': 'Bail commercial',
-    'handleNDASubmit': 'NDA',
-    
-    # Notaires
-    'handleContratMariageSubmit': 'Contrat de mariage',
-    'handlePacsSubmit': 'PACS',
-    'handleDonationEntreEpouxSubmit': 'Donation entre époux',
-    'handleDonationSimpleSubmit': 'Donation simple',
-    'handleTestamentSubmit': 'Testament authentique',
-    'handleSuccessionSubmit': 'Succession',
-    'handleActeNotorieteSubmit': 'Acte de notoriété',
-    'handlePartageSuccessoralSubmit': 'Partage successoral',
-    'handleChangementRegimeSubmit': 'Changement de régime matrimonial',
-    'handlePromesseVenteSubmit': 'Promesse de vente',
-    'handleBailEmphyteotiqueSubmit': 'Bail emphytéotique',
-    'handleIndivisionSubmit': 'Indivision',
-    'handleMainleveeSubmit': 'Mainlevée',
-    'handleProcurationSubmit': 'Procuration',
-    'handleMandatProtectionSubmit': 'Mandat de protection future',
-    'handleQuitusDetteSubmit': 'Quitus de dette',
-    'handleCessionPartsSubmit': 'Cession de parts',
-    'handleAttestationSubmit': 'Attestation',
-}
+CONTRACT_TYPE_MAPPING = registry.contract_types()
 
 def apply_ai_pattern(handler_name, contract_type):
     """Applique le pattern AI à un handler spécifique"""
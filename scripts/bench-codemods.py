@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Benchmark des codemods sur des Contrats.tsx synthétiques (codemod/fixtures.py).
+
+Pour chaque taille, mesure le temps (meilleur et médiane sur --repeat runs) et
+le pic mémoire (tracemalloc, run séparé) de la fonction de transformation de
+chaque script, puis écrit les résultats en JSON pour comparer deux runs :
+
+    python scripts/bench-codemods.py --lines 10000 50000 200000
+    python scripts/bench-codemods.py --compare .codemod-bench/bench-ancien.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from codemod import EditList, HandlerIndex
+from codemod.fixtures import contract_types, form_names, sizes_for_lines, write_fixture
+from codemod.lines import find_select_blocks, iter_lines, tag_sections
+from codemod.pipeline import run_pipeline
+from codemod.transforms import TRANSFORMS, apply_ai_to_handler
+
+BENCH_DIR = '.codemod-bench'
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# scriptutil.py est à la racine du repo, au-dessus de scripts/
+sys.path.insert(1, os.path.dirname(SCRIPTS_DIR))
+from scriptutil import load_script
+
+
+def make_cases(path, handlers, selects):
+    """Cas mesurés : nom -> fonction sans argument qui retourne un nombre de patchs/blocs"""
+    with open(path, 'rb') as f:
+        content = f.read()
+    index = HandlerIndex.build(content)
+    targets = contract_types(handlers)
+    forms = form_names(selects)
+    remaining_18 = load_script('integrate-remaining-18.py', SCRIPTS_DIR)
+
+    def build_index():
+        return len(HandlerIndex.build(content))
+
+    def integrate_ai_safe():
+        edits = EditList()
+        for name, contract_type in targets.items():
+            apply_ai_to_handler(content, index, edits, name, contract_type)
+        return len(edits.sorted())
+
+    def integrate_remaining_18():
+        edits = EditList()
+        for name, contract_type in targets.items():
+            remaining_18.integrate_ai(content, index, edits, name, contract_type)
+        return len(edits.sorted())
+
+    def fix_getclientinfo_null():
+        edits, _ = run_pipeline(content, index, ['getclientinfo'])
+        return len(edits.sorted())
+
+    def run_codemods_fused():
+        edits, _ = run_pipeline(content, index, list(TRANSFORMS))
+        return len(edits.sorted())
+
+    def replace_selects():
+        return sum(1 for _ in find_select_blocks(tag_sections(iter_lines(path)), names=forms))
+
+    return {
+        'index': build_index,
+        'integrate-ai-safe': integrate_ai_safe,
+        'integrate-remaining-18': integrate_remaining_18,
+        'fix-getclientinfo-null': fix_getclientinfo_null,
+        'replace-selects-with-clientselector': replace_selects,
+        'run-codemods (fusionné)': run_codemods_fused,
+    }
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = func()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'count': count,
+        'best_s': min(timings),
+        'median_s': statistics.median(timings),
+        'peak_bytes': peak,
+    }
+
+
+def run(sizes, repeat, only, fixture_dir):
+    results = []
+    for lines in sizes:
+        handlers, selects = sizes_for_lines(lines)
+        path = os.path.join(fixture_dir, f'Contrats-{lines}.tsx')
+        size = write_fixture(path, handlers, selects)
+        with open(path, 'rb') as f:
+            actual_lines = sum(1 for _ in f)
+        print(f"\n📄 {actual_lines:,} lignes, {size:,} octets "
+              f"({handlers:,} handlers, {selects:,} Select)")
+        for case, func in make_cases(path, handlers, selects).items():
+            if only and case not in only:
+                continue
+            result = measure(func, repeat)
+            print(f"  {case:<38} {result['best_s'] * 1000:>10.1f} ms"
+                  f"  {result['peak_bytes'] / 1e6:>8.1f} Mo  ({result['count']:,})")
+            results.append({
+                'lines': lines,
+                'actual_lines': actual_lines,
+                'bytes': size,
+                'handlers': handlers,
+                'selects': selects,
+                'case': case,
+                **result,
+            })
+    return results
+
+
+def compare(results, baseline_path):
+    """Affiche le ratio temps/mémoire par rapport à un run précédent"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['lines'], r['case']): r for r in json.load(f)['results']}
+    print(f"\n📊 Comparaison avec {baseline_path} (ratio nouveau / ancien):")
+    for result in results:
+        old = baseline.get((result['lines'], result['case']))
+        if old is None:
+            continue
+        time_ratio = result['best_s'] / old['best_s'] if old['best_s'] else float('inf')
+        mem_ratio = result['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] else float('inf')
+        flag = '  ⚠️' if time_ratio > 1.2 or mem_ratio > 1.2 else ''
+        print(f"  {result['lines']:>8,} {result['case']:<38} "
+              f"temps x{time_ratio:.2f}  mémoire x{mem_ratio:.2f}{flag}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, nargs='+', default=[10_000, 50_000, 200_000],
+                        help="tailles des fixtures en lignes (défaut: 10000 50000 200000)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs chronométrés par cas")
+    parser.add_argument('--case', action='append', dest='cases', help="ne mesurer que ce cas (répétable)")
+    parser.add_argument('--output', help=f"fichier JSON (défaut: {BENCH_DIR}/bench-<date>.json)")
+    parser.add_argument('--compare', help="JSON d'un run précédent à comparer")
+    parser.add_argument('--keep-fixtures', metavar='DIR', help="générer les fixtures dans DIR et les garder")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print(f"⏱️  Benchmark codemods: {', '.join(f'{n:,}' for n in args.lines)} lignes, "
+          f"{args.repeat} run(s)")
+
+    if args.keep_fixtures:
+        os.makedirs(args.keep_fixtures, exist_ok=True)
+        results = run(args.lines, args.repeat, args.cases, args.keep_fixtures)
+    else:
+        with tempfile.TemporaryDirectory(prefix='codemod-bench-') as fixture_dir:
+            results = run(args.lines, args.repeat, args.cases, fixture_dir)
+
+    output = args.output
+    if output is None:
+        os.makedirs(BENCH_DIR, exist_ok=True)
+        output = os.path.join(BENCH_DIR, f"bench-{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'meta': {
+                'date': datetime.now().isoformat(timespec='seconds'),
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'repeat': args.repeat,
+            },
+            'results': results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Résultats: {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Gestion du store de backups des codemods (.codemod-backups/).
+
+    python scripts/codemod-backup.py list [src/pages/Contrats.tsx]
+    python scripts/codemod-backup.py restore src/pages/Contrats.tsx [-2 | @3 | 3fa9c1]
+    python scripts/codemod-backup.py snapshot src/pages/*.tsx
+    python scripts/codemod-backup.py prune --keep-last 10 --keep-days 7
+"""
+
+import argparse
+from datetime import datetime
+
+from codemod.backup import KEEP_DAYS, KEEP_LAST, BackupError, BackupStore
+
+
+def cmd_list(store, args):
+    manifest = store.snapshots()
+    paths = [path for path in manifest if not args.path or path in args.path]
+    if not paths:
+        print("⚠️  Aucun snapshot")
+    for path in paths:
+        entries = manifest[path]
+        print(f"\n📄 {path} ({len(entries)} snapshot(s))")
+        for i, entry in enumerate(entries):
+            date = datetime.fromtimestamp(entry['time']).strftime('%Y-%m-%d %H:%M:%S')
+            print(f"  {i - len(entries):>4}  {entry['hash'][:12]}  {date}  {entry['size']:>12,} octets")
+
+
+def cmd_restore(store, args):
+    digest = store.restore(args.path, args.ref, args.to)
+    print(f"♻️  {args.to or args.path} restauré depuis {digest[:12]}")
+
+
+def cmd_snapshot(store, args):
+    for path in args.path:
+        print(f"💾 {path}: {store.snapshot(path)[:12]}")
+
+
+def cmd_prune(store, args):
+    print(f"🧹 {store.prune()} objet(s) supprimé(s)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--keep-last', type=int, default=KEEP_LAST,
+                        help=f"snapshots gardés par fichier (défaut: {KEEP_LAST})")
+    parser.add_argument('--keep-days', type=float, default=KEEP_DAYS,
+                        help=f"âge maximal en jours, hors dernier snapshot (défaut: {KEEP_DAYS})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = commands.add_parser('list', help="liste les snapshots")
+    list_parser.add_argument('path', nargs='*')
+    list_parser.set_defaults(func=cmd_list)
+
+    restore_parser = commands.add_parser('restore', help="restaure un snapshot")
+    restore_parser.add_argument('path')
+    restore_parser.add_argument('ref', nargs='?', default=None,
+                                help="préfixe de hash (4+ caractères) ou index (-1 = dernier, @3) (défaut: dernier)")
+    restore_parser.add_argument('--to', help="écrire dans ce fichier au lieu de path")
+    restore_parser.set_defaults(func=cmd_restore)
+
+    snapshot_parser = commands.add_parser('snapshot', help="enregistre l'état actuel de fichiers")
+    snapshot_parser.add_argument('path', nargs='+')
+    snapshot_parser.set_defaults(func=cmd_snapshot)
+
+    prune_parser = commands.add_parser('prune', help="applique la rétention")
+    prune_parser.set_defaults(func=cmd_prune)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    store = BackupStore(keep_last=args.keep_last, keep_days=args.keep_days)
+    try:
+        args.func(store, args)
+    except BackupError as exc:
+        raise SystemExit(f"❌ {exc}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+"""
+Outils partagés par les codemods de scripts/ (Contrats.tsx et autres pages).
+
+Les scripts sont lancés depuis la racine du repo (python scripts/xxx.py) :
+le dossier scripts/ est alors dans sys.path et `import codemod` fonctionne.
+"""
+
+from codemod.index import HandlerIndex, HandlerSpan
+from codemod.lexer import Scan, scan, scan_file
+from codemod.registry import HandlerEntry, HandlerRegistry
+from codemod.splice import EditList, Patch, PatchConflict
+
+__all__ = [
+    'EditList', 'HandlerEntry', 'HandlerIndex', 'HandlerRegistry', 'HandlerSpan',
+    'Patch', 'PatchConflict', 'Scan', 'scan', 'scan_file',
+]
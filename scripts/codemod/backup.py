@@ -0,0 +1,315 @@
+"""
+Store de backups partagé par les codemods (remplace les copies `.backup_*`).
+
+Les snapshots sont adressés par contenu (SHA-256) dans .codemod-backups/ :
+un contenu identique n'est stocké qu'une fois. Chaque objet est compressé
+(zlib) et, quand un snapshot précédent du même fichier existe, stocké comme
+delta ligne à ligne contre lui ; un objet complet est réécrit tous les
+MAX_CHAIN deltas pour que la restauration reste rapide.
+
+manifest.json liste les snapshots par fichier ; la rétention (keep_last,
+keep_days) est appliquée à chaque snapshot et les objets qui ne sont plus
+référencés sont supprimés.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+
+BACKUP_DIR = '.codemod-backups'
+KEEP_LAST = 20
+KEEP_DAYS = 30
+MAX_CHAIN = 8
+# Longueur minimale d'un préfixe de hash (en dessous, un nombre est un index)
+MIN_PREFIX = 4
+
+_FULL = b'F'
+_DELTA = b'D'
+_COPY = b'C'
+_INSERT = b'I'
+_COPY_OP = struct.Struct('<II')
+_INSERT_OP = struct.Struct('<I')
+
+
+class BackupError(ValueError):
+    """Snapshot introuvable ou objet corrompu"""
+
+
+def make_delta(base, target):
+    """
+    Delta ligne à ligne de base vers target : suite d'opérations
+    COPY(ligne de base, nombre de lignes) / INSERT(octets).
+    Les correspondances sont cherchées en avant de la dernière copie d'abord,
+    ce qui suit l'ordre des éditions d'un codemod.
+    """
+    base_lines = base.splitlines(keepends=True)
+    positions = {}
+    for i, line in enumerate(base_lines):
+        positions.setdefault(line, []).append(i)
+
+    out = bytearray()
+    literal = bytearray()
+    copy_start, copy_len = 0, 0
+    next_base = 0
+
+    def flush_copy():
+        if copy_len:
+            out.extend(_COPY + _COPY_OP.pack(copy_start, copy_len))
+
+    def flush_literal():
+        if literal:
+            out.extend(_INSERT + _INSERT_OP.pack(len(literal)) + literal)
+            literal.clear()
+
+    for line in target.splitlines(keepends=True):
+        if copy_len and next_base < len(base_lines) and base_lines[next_base] == line:
+            copy_len += 1
+            next_base += 1
+            continue
+        candidates = positions.get(line)
+        if candidates is None:
+            flush_copy()
+            copy_len = 0
+            literal.extend(line)
+            continue
+        flush_copy()
+        flush_literal()
+        k = bisect.bisect_left(candidates, next_base)
+        copy_start = candidates[k] if k < len(candidates) else candidates[0]
+        copy_len = 1
+        next_base = copy_start + 1
+    flush_copy()
+    flush_literal()
+    return bytes(out)
+
+
+def apply_delta(base, delta):
+    base_lines = base.splitlines(keepends=True)
+    pieces = []
+    pos = 0
+    while pos < len(delta):
+        op = delta[pos:pos + 1]
+        pos += 1
+        if op == _COPY:
+            start, count = _COPY_OP.unpack_from(delta, pos)
+            pos += _COPY_OP.size
+            pieces.extend(base_lines[start:start + count])
+        elif op == _INSERT:
+            (length,) = _INSERT_OP.unpack_from(delta, pos)
+            pos += _INSERT_OP.size
+            pieces.append(delta[pos:pos + length])
+            pos += length
+        else:
+            raise BackupError(f'opération de delta inconnue: {op!r}')
+    return b''.join(pieces)
+
+
+class BackupStore:
+    """Snapshots dédupliqués et compressés, avec politique de rétention"""
+
+    def __init__(self, directory=BACKUP_DIR, keep_last=KEEP_LAST, keep_days=KEEP_DAYS):
+        self.directory = directory
+        self.keep_last = keep_last
+        self.keep_days = keep_days
+        self._manifest_path = os.path.join(directory, 'manifest.json')
+        self._objects = os.path.join(directory, 'objects')
+
+    # --- manifest -----------------------------------------------------------
+
+    def _load(self):
+        try:
+            with open(self._manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save(self, manifest):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f'{self._manifest_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self._manifest_path)
+
+    def snapshots(self, path=None):
+        """{chemin: [snapshot]} (ou la liste de path), du plus ancien au plus récent"""
+        manifest = self._load()
+        if path is None:
+            return manifest
+        return manifest.get(os.path.normpath(path), [])
+
+    # --- objets -------------------------------------------------------------
+
+    def _object_path(self, digest):
+        return os.path.join(self._objects, digest[:2], digest[2:])
+
+    def _has(self, digest):
+        return os.path.exists(self._object_path(digest))
+
+    def _write_object(self, digest, kind, payload, base=None):
+        path = self._object_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        header = kind + (base.encode('ascii') if base else b'')
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(header + zlib.compress(payload, 6))
+        os.replace(tmp_path, path)
+
+    def _read_header(self, digest):
+        """(type, base) d'un objet"""
+        with open(self._object_path(digest), 'rb') as f:
+            head = f.read(65)
+        if head[:1] == _DELTA:
+            return _DELTA, head[1:65].decode('ascii')
+        return _FULL, None
+
+    def _chain_length(self, digest):
+        length = 0
+        while digest is not None:
+            kind, digest = self._read_header(digest)
+            if kind == _DELTA:
+                length += 1
+        return length
+
+    def read(self, digest):
+        """Contenu d'un objet (les deltas sont appliqués depuis l'objet complet)"""
+        chain = []
+        while True:
+            try:
+                with open(self._object_path(digest), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                raise BackupError(f'objet manquant: {digest}') from None
+            if data[:1] == _DELTA:
+                chain.append(zlib.decompress(data[65:]))
+                digest = data[1:65].decode('ascii')
+            elif data[:1] == _FULL:
+                content = zlib.decompress(data[1:])
+                break
+            else:
+                raise BackupError(f'objet corrompu: {digest}')
+        for delta in reversed(chain):
+            content = apply_delta(content, delta)
+        return content
+
+    def _store(self, content, digest, base_digest):
+        """Écrit l'objet digest, en delta contre base_digest si la chaîne le permet"""
+        if base_digest and self._has(base_digest) and self._chain_length(base_digest) < MAX_CHAIN:
+            delta = make_delta(self.read(base_digest), content)
+            # Un delta plus gros que le contenu n'apporte rien
+            if len(delta) < len(content):
+                self._write_object(digest, _DELTA, delta, base_digest)
+                return
+        self._write_object(digest, _FULL, content)
+
+    # --- API ----------------------------------------------------------------
+
+    def snapshot(self, path, content=None):
+        """
+        Enregistre l'état actuel de path (ou content) et retourne son hash.
+        Rien n'est écrit si le contenu est déjà le dernier snapshot du fichier.
+        """
+        if content is None:
+            with open(path, 'rb') as f:
+                content = f.read()
+        key = os.path.normpath(path)
+        digest = hashlib.sha256(content).hexdigest()
+        manifest = self._load()
+        entries = manifest.setdefault(key, [])
+        if entries and entries[-1]['hash'] == digest:
+            return digest
+        if not self._has(digest):
+            self._store(content, digest, entries[-1]['hash'] if entries else None)
+        entries.append({'hash': digest, 'time': time.time(), 'size': len(content)})
+        self._prune(manifest)
+        self._save(manifest)
+        return digest
+
+    def find(self, path, ref=None):
+        """
+        Snapshot de path : le dernier, un index (-2, 0, @3...) ou un préfixe de
+        hash (au moins MIN_PREFIX caractères). Un nombre assez long pour être un
+        préfixe est d'abord cherché comme préfixe ; @N est toujours un index.
+        """
+        entries = self.snapshots(path)
+        if not entries:
+            raise BackupError(f'aucun snapshot pour {path}')
+        if ref is None:
+            return entries[-1]
+        if isinstance(ref, int):
+            return self._at(entries, ref)
+        if ref.startswith('@'):
+            if not ref[1:].lstrip('-').isdigit():
+                raise BackupError(f"index invalide : '{ref}'")
+            return self._at(entries, int(ref[1:]))
+        if len(ref) >= MIN_PREFIX:
+            matches = [e for e in entries if e['hash'].startswith(ref.lower())]
+            if len(matches) == 1:
+                return matches[0]
+            if len(matches) > 1:
+                raise BackupError(f"préfixe '{ref}' ambigu : {len(matches)} snapshot(s) (@{ref} pour un index)")
+        if ref.lstrip('-').isdigit():
+            return self._at(entries, int(ref))
+        raise BackupError(f"préfixe '{ref}' : aucun snapshot")
+
+    @staticmethod
+    def _at(entries, index):
+        try:
+            return entries[index]
+        except IndexError:
+            raise BackupError(f'snapshot {index} hors limites ({len(entries)})') from None
+
+    def restore(self, path, ref=None, dest=None):
+        """Réécrit dest (par défaut path) avec le snapshot choisi ; retourne son hash"""
+        entry = self.find(path, ref)
+        content = self.read(entry['hash'])
+        dest = path if dest is None else dest
+        tmp_path = f'{dest}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, dest)
+        return entry['hash']
+
+    def prune(self):
+        """Applique la rétention et supprime les objets orphelins"""
+        manifest = self._load()
+        removed = self._prune(manifest)
+        self._save(manifest)
+        return removed
+
+    def _prune(self, manifest):
+        cutoff = time.time() - self.keep_days * 86400 if self.keep_days is not None else None
+        for key, entries in list(manifest.items()):
+            kept = entries[-self.keep_last:] if self.keep_last else entries
+            if cutoff is not None:
+                # Le snapshot le plus récent est toujours gardé
+                kept = [e for e in kept[:-1] if e['time'] >= cutoff] + kept[-1:]
+            manifest[key] = kept
+            if not kept:
+                del manifest[key]
+        return self._collect(manifest)
+
+    def _collect(self, manifest):
+        """
+        Supprime les objets non référencés. Un delta dont la base n'est plus
+        référencée est d'abord réécrit en objet complet.
+        """
+        if not os.path.isdir(self._objects):
+            return 0
+        live = {e['hash'] for entries in manifest.values() for e in entries}
+        for digest in sorted(live):
+            kind, base = self._read_header(digest)
+            if kind == _DELTA and base not in live:
+                self._write_object(digest, _FULL, self.read(digest))
+        removed = 0
+        for prefix in os.scandir(self._objects):
+            for entry in os.scandir(prefix.path):
+                if entry.name.endswith('.tmp'):
+                    continue
+                if prefix.name + entry.name not in live:
+                    os.remove(entry.path)
+                    removed += 1
+        return removed
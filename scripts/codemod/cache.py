@@ -0,0 +1,180 @@
+"""
+Cache disque des index (handlers, blocs Select) entre deux runs des codemods.
+
+Une entrée est identifiée par le type d'index, le hash SHA-256 du contenu et
+le mtime du fichier. Les entrées sont des fichiers JSON dans .codemod-cache/ ;
+au-delà de MAX_ENTRIES, les moins récemment utilisées sont supprimées (LRU,
+le mtime de l'entrée est rafraîchi à chaque lecture).
+"""
+
+import hashlib
+import json
+import mmap
+import os
+
+from codemod.index import HandlerIndex
+from codemod.lines import FormAnchors, LineIndex, find_select_blocks, iter_lines, tag_sections
+from codemod.registry import HandlerRegistry
+from codemod.tables import HANDLERS_CONFIG
+
+CACHE_DIR = '.codemod-cache'
+MAX_ENTRIES = 64
+# À incrémenter dès que le format d'un index ou sa construction change
+CACHE_VERSION = 2
+
+_CHUNK = 1 << 20
+
+
+def content_key(content, mtime_ns):
+    return f'{hashlib.sha256(content).hexdigest()}-{mtime_ns}'
+
+
+def file_key(path):
+    """Clé d'un fichier sans le charger en entier (hash par blocs)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b''):
+            digest.update(chunk)
+    return f'{digest.hexdigest()}-{os.stat(path).st_mtime_ns}'
+
+
+class ParseCache:
+    """Cache LRU d'index sérialisés en JSON, avec compteurs hit/miss"""
+
+    def __init__(self, directory=CACHE_DIR, max_entries=MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, kind, key):
+        return os.path.join(self.directory, f'{kind}-{key}.json')
+
+    def get(self, kind, key):
+        path = self._path(kind, key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if entry.get('version') != CACHE_VERSION:
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return entry['data']
+
+    def put(self, kind, key, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(kind, key)
+        # Suffixe par processus : run-codemods.py écrit le cache depuis plusieurs workers
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'data': data}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith('.json')]
+        if len(entries) <= self.max_entries:
+            return
+        dated = []
+        for entry in entries:
+            try:
+                dated.append((entry.stat().st_mtime_ns, entry.path))
+            except FileNotFoundError:
+                pass  # déjà évincée par un autre processus
+        dated.sort()
+        for _, path in dated[:len(dated) - self.max_entries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def stats(self):
+        return f"{self.hits} hit(s), {self.misses} miss(es)"
+
+
+def _load_handler_index(path, cache):
+    with open(path, 'rb') as f:
+        content = f.read()
+    key = content_key(content, os.stat(path).st_mtime_ns)
+    data = cache.get('handlers', key)
+    if data is not None:
+        return content, HandlerIndex.from_json(data), key
+    index = HandlerIndex.build(content)
+    cache.put('handlers', key, index.to_json())
+    return content, index, key
+
+
+def load_handler_index(path, cache):
+    """Lit path et retourne (contenu en bytes, HandlerIndex), via le cache"""
+    content, index, _ = _load_handler_index(path, cache)
+    return content, index
+
+
+def load_registry(path, cache):
+    """
+    (contenu en bytes, HandlerIndex, HandlerRegistry) de path, via le cache.
+    La clé inclut HANDLERS_CONFIG, repli des handlers sans contractType lisible.
+    """
+    content, index, key = _load_handler_index(path, cache)
+    config_digest = hashlib.sha256(
+        json.dumps(HANDLERS_CONFIG, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+    kind = f'registry-{config_digest[:12]}'
+    data = cache.get(kind, key)
+    if data is not None:
+        return content, index, HandlerRegistry.from_json(data)
+    registry = HandlerRegistry.discover(content, index)
+    cache.put(kind, key, registry.to_json())
+    return content, index, registry
+
+
+def load_form_index(path, cache):
+    """(LineIndex, FormAnchors) de path, via le cache"""
+    with open(path, 'rb') as f:
+        content = f.read()
+    key = content_key(content, os.stat(path).st_mtime_ns)
+    data = cache.get('forms', key)
+    if data is not None:
+        return LineIndex(data['starts'], data['size']), FormAnchors([tuple(a) for a in data['anchors']])
+    lines, anchors = LineIndex.build(content), FormAnchors.build(content)
+    cache.put('forms', key, {'starts': lines.starts, 'size': lines.size, 'anchors': anchors.anchors})
+    return lines, anchors
+
+
+def load_select_blocks(path, cache, names=None):
+    """Blocs (start, end) de find_select_blocks pour path, via le cache"""
+    kind = 'selects'
+    if names is not None:
+        names_digest = hashlib.sha256('\n'.join(sorted(names)).encode('utf-8')).hexdigest()
+        kind = f'selects-{names_digest[:12]}'
+    key = file_key(path)
+    data = cache.get(kind, key)
+    if data is not None:
+        return [tuple(block) for block in data]
+    blocks = list(find_select_blocks(tag_sections(iter_lines(path)), names=names))
+    cache.put(kind, key, blocks)
+    return blocks
+
+
+def store_handler_index(path, cache, index):
+    """Range un index déjà à jour sous la clé du contenu actuel de path"""
+    cache.put('handlers', file_key(path), index.to_json())
+
+
+def refresh_handler_index(path, cache, index, edits):
+    """
+    Après edits.write(content, path) : met l'index à jour de façon incrémentale
+    (seuls les handlers touchés sont re-lexés) et le range dans le cache sous la
+    clé du nouveau contenu, pour que le codemod suivant de la chaîne le retrouve.
+    Retourne le résultat de HandlerIndex.apply_patches.
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        relexed = index.apply_patches(mm, edits.sorted())
+        key = content_key(mm, os.stat(path).st_mtime_ns)
+    cache.put('handlers', key, index.to_json())
+    return relexed
@@ -0,0 +1,120 @@
+"""
+Fixtures synthétiques façon Contrats.tsx pour bench-codemods.py.
+
+Le fichier généré contient n handlers `const handleXxxSubmit = async () => {`
+avec leur `supabase.from('contrats').insert({...})` (un sur FIX_EVERY porte
+déjà le bloc `getClientInfo(null, clients)` visé par GETCLIENTINFO_FIXES),
+puis des formulaires `{contractType === '...' && (` contenant des
+`<Select ... clients.map( ... </Select>`.
+"""
+
+import os
+
+from codemod.tables import GETCLIENTINFO_FIXES
+
+# Lignes générées par handler / par bloc Select (pour viser un nombre de lignes)
+HANDLER_LINES = 21
+SELECT_LINES = 15
+SELECTS_PER_FORM = 4
+FIX_EVERY = 5
+
+_HANDLER = '''\
+  const handle{name}Submit = async () => {{
+    if (!user) return;
+    try {{
+{ai}      const {{ data, error }} = await supabase
+        .from('contrats')
+        .insert({{
+          owner_id: user.id,
+          name: "{contract_type} {i}",
+          category: "Synthétique",
+          role: role,
+          content: "Contrat {contract_type}",
+        }});
+      if (error) throw error;
+      toast.success("Contrat créé");
+      navigate(`/contrats/${{data.id}}`);
+    }} catch (err) {{
+      console.error("Erreur {name}:", err);
+    }}
+  }};
+
+'''
+
+_FORM_OPEN = "      {{contractType === '{form}' && (\n        <div className=\"space-y-4\">\n"
+_FORM_CLOSE = "        </div>\n      )}\n\n"
+
+_SELECT = '''\
+          <Select
+            value={{questionnaireData.client{i}}}
+            onValueChange={{(value) => setQuestionnaireData({{ ...questionnaireData, client{i}: value }})}}
+          >
+            <SelectTrigger>
+              <SelectValue placeholder="Choisir un client" />
+            </SelectTrigger>
+            <SelectContent>
+              {{clients.map((c) => (
+                <SelectItem key={{c.id}} value={{c.id}}>{{c.nom}} {{c.prenom}}</SelectItem>
+              ))}}
+            </SelectContent>
+          </Select>
+          <Input value={{questionnaireData.note{i}}} />
+'''
+
+
+def handler_name(i):
+    return f'Synth{i:06d}'
+
+
+def form_name(i):
+    return f'Formulaire synthétique {i}'
+
+
+def contract_types(handlers):
+    """Table handler -> contractType des handlers générés (comme HANDLERS_CONFIG)"""
+    return {f'handle{handler_name(i)}Submit': f'Type {i}' for i in range(handlers)}
+
+
+def form_names(selects):
+    return {form_name(i) for i in range(-(-selects // SELECTS_PER_FORM))}
+
+
+def _ai_block(i):
+    # Le texte exact d'une aiguille de GETCLIENTINFO_FIXES, indenté comme dans Contrats.tsx
+    fix = GETCLIENTINFO_FIXES[i % len(GETCLIENTINFO_FIXES)]
+    return fix['old'] + '\n        formData: {},\n        clientInfo,\n        user\n      });\n'
+
+
+def sizes_for_lines(lines):
+    """(handlers, selects) pour un fichier d'environ lines lignes (40 % handlers)"""
+    handlers = max(1, lines * 2 // 5 // HANDLER_LINES)
+    selects = max(1, (lines - handlers * HANDLER_LINES) // SELECT_LINES)
+    return handlers, selects
+
+
+def iter_fixture(handlers, selects):
+    """Génère le fichier morceau par morceau (str)"""
+    yield "export default function Contrats() {\n"
+    for i in range(handlers):
+        yield _HANDLER.format(
+            name=handler_name(i),
+            contract_type=f'Type {i}',
+            i=i,
+            ai=_ai_block(i) if i % FIX_EVERY == 0 else '',
+        )
+    yield "  return (\n    <div>\n"
+    for i in range(selects):
+        if i % SELECTS_PER_FORM == 0:
+            if i:
+                yield _FORM_CLOSE
+            yield _FORM_OPEN.format(form=form_name(i // SELECTS_PER_FORM))
+        yield _SELECT.format(i=i)
+    yield _FORM_CLOSE
+    yield "    </div>\n  );\n}\n"
+
+
+def write_fixture(path, handlers, selects):
+    """Écrit la fixture dans path et retourne sa taille en octets"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(iter_fixture(handlers, selects))
+    return os.path.getsize(path)
@@ -0,0 +1,191 @@
+"""
+Index des handlers `const handleXxxSubmit = async () => {` d'un fichier TSX.
+
+Le fichier est parcouru une seule fois (voir lexer.py) : chaque handler est
+associé à son span exact (en octets) et au span de son
+`supabase.from('contrats').insert({...})`. Les scripts interrogent ensuite l'index au lieu de relancer un re.search
+par handler, et décalent les spans après chaque modification (shift).
+"""
+
+import re
+from dataclasses import dataclass
+
+from codemod import lexer
+from codemod.piecetable import PieceTable
+
+# Une seule regex pour les deux motifs : un seul finditer sur tout le fichier
+SCAN_RE = re.compile(
+    rb'(?P<handler>const (?P<name>handle\w+Submit) = async \(\) => \{)'
+    rb'|(?P<insert>await supabase\s*\.from\([\'"]contrats[\'"]\)\s*\.insert\(\{)'
+)
+
+# Champs qui marquent un début de span (inclusifs) / une fin (exclusifs)
+_START_FIELDS = ('start', 'body_start', 'insert_start')
+_END_FIELDS = ('end', 'insert_end')
+
+
+@dataclass
+class HandlerSpan:
+    """Position d'un handler et de son .insert() dans le buffer (offsets en octets)"""
+    name: str
+    start: int                  # début de `const handleXxx`
+    body_start: int             # position du `{` ouvrant le corps
+    end: int                    # juste après le `}` fermant le corps
+    insert_start: int = None    # début de `await supabase...insert({`
+    insert_end: int = None      # juste après le `}` fermant l'objet inséré
+
+    @property
+    def has_insert(self):
+        return self.insert_start is not None
+
+
+class HandlerIndex:
+    """Index nom de handler -> HandlerSpan, mis à jour en place après édition"""
+
+    def __init__(self, spans):
+        self._reset(spans)
+
+    def _reset(self, spans):
+        self.spans = sorted(spans, key=lambda s: s.start)
+        self._by_name = {}
+        for span in self.spans:
+            # En cas de doublon, on garde la première définition (comme re.search)
+            self._by_name.setdefault(span.name, span)
+
+    def _rebuild(self, buf):
+        if isinstance(buf, PieceTable):
+            buf = bytes(buf)
+        self._reset(_find_spans(buf, lexer.scan(buf)))
+
+    @classmethod
+    def build(cls, buf, scanned=None):
+        """
+        Construit l'index à partir de buf (bytes, memoryview ou mmap) :
+        un passage du lexer pour les accolades, un finditer pour les motifs.
+        """
+        if scanned is None:
+            scanned = lexer.scan(buf)
+        return cls(_find_spans(buf, scanned))
+
+    def to_json(self):
+        """Forme sérialisable (liste de listes) pour le cache disque"""
+        return [
+            [s.name, s.start, s.body_start, s.end, s.insert_start, s.insert_end]
+            for s in self.spans
+        ]
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(HandlerSpan(*row) for row in data)
+
+    def get(self, name):
+        return self._by_name.get(name)
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def __iter__(self):
+        return iter(self.spans)
+
+    def __len__(self):
+        return len(self.spans)
+
+    def apply_patches(self, buf, patches):
+        """
+        Met à jour l'index après application de patches (en coordonnées de
+        l'ancien buffer, cf. EditList.sorted) ; buf est le NOUVEAU contenu
+        (bytes, mmap ou PieceTable).
+        Les spans sont décalés puis seuls les handlers touchés sont re-lexés.
+        Retourne le nombre de handlers re-lexés, ou None si l'index a dû être
+        reconstruit en entier (en-tête modifié, nouveau handler, corps déplacé).
+        """
+        patches = sorted(patches, key=lambda p: (p.start, p.end))
+        touched = []
+        for span in self.spans:
+            for patch in patches:
+                if patch.start >= span.end:
+                    break
+                if patch.start < span.body_start + 1 and patch.end > span.start:
+                    # En-tête modifié : le nom ou le `{` du corps peut avoir changé
+                    self._rebuild(buf)
+                    return None
+                if patch.end > span.start and (patch.start < patch.end or patch.start > span.start):
+                    touched.append(span)
+                    break
+        # Nouveaux handlers introduits par un patch : reconstruction complète
+        for patch in patches:
+            if any(m.group('handler') for m in SCAN_RE.finditer(patch.replacement)):
+                self._rebuild(buf)
+                return None
+
+        # Décalage : du dernier patch au premier, les coordonnées restent valides
+        for patch in reversed(patches):
+            self.shift(patch.start, patch.end, len(patch.replacement))
+
+        for span in touched:
+            found = _relex(buf, span.start, span.end)
+            if not found or found[0].start != span.start or found[0].end != span.end:
+                self._rebuild(buf)
+                return None
+            span.insert_start = found[0].insert_start
+            span.insert_end = found[0].insert_end
+        return len(touched)
+
+    def shift(self, start, end, new_length):
+        """
+        Met à jour les offsets après le remplacement de buf[start:end] par
+        new_length octets (start == end pour une insertion pure).
+        Les offsets situés strictement à l'intérieur de [start, end) ne bougent pas.
+        """
+        delta = new_length - (end - start)
+        if delta == 0:
+            return
+        for span in self.spans:
+            for field in _START_FIELDS:
+                value = getattr(span, field)
+                if value is not None and value >= end:
+                    setattr(span, field, value + delta)
+            for field in _END_FIELDS:
+                value = getattr(span, field)
+                if value is not None and value >= end and value > start:
+                    setattr(span, field, value + delta)
+
+
+def _relex(buf, start, end):
+    """HandlerSpan de buf[start:end] ; une PieceTable n'est matérialisée que sur la fenêtre"""
+    if not isinstance(buf, PieceTable):
+        return _find_spans(buf, lexer.scan(buf, start, end), start, end)
+    window = buf[start:end]
+    found = _find_spans(window, lexer.scan(window))
+    for span in found:
+        for field in _START_FIELDS + _END_FIELDS:
+            value = getattr(span, field)
+            if value is not None:
+                setattr(span, field, value + start)
+    return found
+
+
+def _find_spans(buf, scanned, start=0, end=None):
+    """HandlerSpan de buf[start:end] à partir des paires du lexer"""
+    spans = []
+    current = None
+    for m in SCAN_RE.finditer(buf, start, len(buf) if end is None else end):
+        # Une accolade absente des paires est dans une chaîne ou un commentaire
+        if m.group('handler'):
+            body_start = m.end() - 1
+            body_end = scanned.close_of(body_start)
+            if body_end is None:
+                continue
+            current = HandlerSpan(
+                name=m.group('name').decode('ascii'),
+                start=m.start(),
+                body_start=body_start,
+                end=body_end,
+            )
+            spans.append(current)
+        elif current is not None and not current.has_insert and m.start() < current.end:
+            insert_end = scanned.close_of(m.end() - 1)
+            if insert_end is not None:
+                current.insert_start = m.start()
+                current.insert_end = insert_end
+    return spans
@@ -0,0 +1,178 @@
+"""
+Journal append-only (JSONL) des runs de codemods, un fichier par fichier source.
+
+Chaque run écrit, AVANT de réécrire le fichier source :
+
+    {"op": "begin", "run": ..., "time": ..., "before": sha256 du contenu}
+    {"op": "patch", "run": ..., "handler": label, "start": ..., "end": ...,
+     "at": offset dans le nouveau contenu, "old": ..., "new": ...}   (un par patch)
+
+puis, une fois le fichier écrit, {"op": "commit", "run": ..., "after": sha256}.
+Un run sans commit (crash, Ctrl-C) est ignoré : le fichier n'a pas été remplacé
+(écriture via fichier temporaire + os.replace).
+
+- completed() : handlers déjà patchés par les runs qui mènent au contenu
+  actuel (--resume : pas besoin de les re-scanner) ;
+- rollback() : ré-applique les patchs du dernier run à l'envers, sans passer
+  par le store de backups, puis écrit {"op": "rollback", "run": ...}.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from codemod.splice import EditList
+
+JOURNAL_DIR = '.codemod-journal'
+
+_CHUNK = 1 << 20
+
+
+class JournalError(ValueError):
+    """Journal incohérent avec le fichier (modifié hors codemod, run introuvable)"""
+
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _text(data):
+    return data.decode('utf-8', 'surrogateescape')
+
+
+def _bytes(text):
+    return text.encode('utf-8', 'surrogateescape')
+
+
+class Journal:
+    """Journal JSONL d'un fichier source"""
+
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def for_file(cls, source_path, directory=JOURNAL_DIR):
+        name = hashlib.sha256(os.path.abspath(source_path).encode('utf-8')).hexdigest()[:16]
+        return cls(os.path.join(directory, f'journal-{name}.jsonl'))
+
+    # --- écriture -----------------------------------------------------------
+
+    def _append(self, records, sync=False):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def begin(self, content, edits):
+        """Journalise les patchs de edits (coordonnées de content) ; retourne l'id du run"""
+        run = f'{time.time():.6f}-{os.getpid()}'
+        records = [{'op': 'begin', 'run': run, 'time': time.time(), 'before': content_hash(content)}]
+        shift = 0
+        for patch in edits.sorted():
+            records.append({
+                'op': 'patch', 'run': run, 'handler': patch.label,
+                'start': patch.start, 'end': patch.end, 'at': patch.start + shift,
+                'old': _text(bytes(content[patch.start:patch.end])),
+                'new': _text(patch.replacement),
+            })
+            shift += patch.delta
+        # Le journal doit être sur disque avant que le fichier source ne change
+        self._append(records, sync=True)
+        return run
+
+    def commit(self, run, source_path):
+        """À appeler après l'écriture du fichier source"""
+        after = file_hash(source_path)
+        self._append([{'op': 'commit', 'run': run, 'after': after}])
+        return after
+
+    # --- lecture ------------------------------------------------------------
+
+    def records(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        return  # dernière ligne tronquée par un crash
+        except FileNotFoundError:
+            return
+
+    def runs(self):
+        """Runs validés et non annulés, du plus ancien au plus récent"""
+        runs = {}
+        for record in self.records():
+            op, run = record['op'], record['run']
+            if op == 'begin':
+                runs[run] = {'run': run, 'time': record['time'], 'before': record['before'],
+                             'after': None, 'patches': []}
+            elif run not in runs:
+                continue
+            elif op == 'patch':
+                runs[run]['patches'].append(record)
+            elif op == 'commit':
+                runs[run]['after'] = record['after']
+            elif op == 'rollback':
+                del runs[run]
+        return [r for r in runs.values() if r['after'] is not None]
+
+    def completed(self, content):
+        """
+        Labels (handlers) patchés par la chaîne de runs qui mène à content, ou
+        None si le fichier a changé depuis le dernier run journalisé.
+        """
+        runs = self.runs()
+        if not runs:
+            return set()
+        if runs[-1]['after'] != content_hash(content):
+            return None
+        done = set()
+        previous = None
+        for run in runs:
+            if previous is not None and run['before'] != previous:
+                done = set()  # fichier modifié entre deux runs : la chaîne repart de là
+            done.update(p['handler'] for p in run['patches'])
+            previous = run['after']
+        return done
+
+    # --- annulation ---------------------------------------------------------
+
+    def rollback(self, source_path):
+        """Annule le dernier run sur source_path ; retourne ce run"""
+        runs = self.runs()
+        if not runs:
+            raise JournalError(f'aucun run à annuler pour {source_path}')
+        run = runs[-1]
+        with open(source_path, 'rb') as f:
+            content = f.read()
+        if content_hash(content) != run['after']:
+            raise JournalError(
+                f'{source_path} a changé depuis le run {run["run"]} : '
+                f'restaurer un backup (scripts/codemod-backup.py) à la place'
+            )
+        edits = EditList()
+        for patch in run['patches']:
+            new = _bytes(patch['new'])
+            edits.replace(patch['at'], patch['at'] + len(new), _bytes(patch['old']), patch['handler'])
+        restored = edits.apply(content)
+        if content_hash(restored) != run['before']:
+            raise JournalError(f'journal corrompu : le run {run["run"]} ne se rejoue pas à l\'envers')
+        tmp_path = f'{source_path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(restored)
+        os.replace(tmp_path, source_path)
+        self._append([{'op': 'rollback', 'run': run['run'], 'time': time.time()}], sync=True)
+        return run
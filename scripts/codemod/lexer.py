@@ -0,0 +1,226 @@
+"""
+Scanner lexical TSX minimal : appariement des accolades/parenthèses/crochets.
+
+Un seul passage linéaire sur le buffer (bytes, memoryview ou mmap) qui saute
+les chaînes, template literals (avec leurs `${...}`), commentaires, regex
+littérales et le texte JSX. Les regex de saut travaillent directement sur le
+buffer : aucune copie de la fin du fichier n'est faite.
+"""
+
+import mmap
+import re
+from dataclasses import dataclass, field
+
+# Modes du scanner (type de la frame au sommet de la pile)
+CODE, TEMPLATE, TAG, CHILDREN = range(4)
+
+_CODE_RE = re.compile(rb'[{}()\[\]\'"`/<]')
+_TEMPLATE_RE = re.compile(rb'\\.|`|\$\{', re.S)
+_TAG_RE = re.compile(rb'[{}\'"/>]')
+_CHILDREN_RE = re.compile(rb'[{<]')
+_TAG_NAME_RE = re.compile(rb'<\s*(/?)\s*([A-Za-z_$][\w$.:-]*)?')
+_STRING_RES = {
+    0x27: re.compile(rb"'(?:\\.|[^'\\\n])*'"),
+    0x22: re.compile(rb'"(?:\\.|[^"\\\n])*"'),
+}
+# Les attributs JSX n'ont pas d'échappement
+_JSX_STRING_RES = {
+    0x27: re.compile(rb"'[^']*'"),
+    0x22: re.compile(rb'"[^"]*"'),
+}
+_EOL_RE = re.compile(rb'\n')
+_LINE_COMMENT_RE = re.compile(rb'//[^\n]*')
+_BLOCK_COMMENT_RE = re.compile(rb'/\*.*?\*/', re.S)
+_REGEX_RE = re.compile(rb'/(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[a-z]*')
+_WORD_RE = re.compile(rb'[\w$]+$')
+_GENERIC_RE = re.compile(rb'<\s*[A-Za-z_$][\w$]*\s*(?:,|extends\b)')
+
+_OPENERS = {0x7B: 0x7D, 0x28: 0x29, 0x5B: 0x5D}   # { ( [  ->  } ) ]
+_CLOSERS = {v: k for k, v in _OPENERS.items()}
+_SPACE = b' \t\r\n'
+# Après ces caractères, `/` ouvre une regex et `<` peut ouvrir du JSX
+_EXPR_START = b'(,=:[!&|?{};+-*%<>~^/'
+_EXPR_KEYWORDS = {
+    b'return', b'typeof', b'case', b'do', b'else', b'in', b'of', b'new',
+    b'delete', b'void', b'throw', b'yield', b'await', b'instanceof',
+}
+
+
+@dataclass
+class Scan:
+    """Résultat d'un passage : paires ouvrant -> fermant et erreurs lexicales"""
+    pairs: dict = field(default_factory=dict)     # offset ouvrant -> offset fermant
+    elements: list = field(default_factory=list)  # (start, end, nom) des éléments JSX
+    errors: list = field(default_factory=list)    # (offset, message)
+
+    def close_of(self, open_pos):
+        """Offset juste après le caractère fermant celui de open_pos (ou None)"""
+        close = self.pairs.get(open_pos)
+        return None if close is None else close + 1
+
+
+def _expression_allowed(buf, pos):
+    """Vrai si le dernier token significatif avant pos permet une expression"""
+    i = pos - 1
+    while i >= 0 and buf[i] in _SPACE:
+        i -= 1
+    if i < 0:
+        return True
+    c = buf[i]
+    if c in _EXPR_START:
+        return True
+    if c == 0x5F or c == 0x24 or 0x30 <= c <= 0x39 or 0x41 <= c <= 0x5A or 0x61 <= c <= 0x7A:
+        word = _WORD_RE.search(buf, max(0, i - 16), i + 1)
+        return word is not None and bytes(word.group()) in _EXPR_KEYWORDS
+    return False
+
+
+def _starts_tag(buf, pos):
+    """Vrai si `<` à pos est suivi d'un nom de balise ou d'un fragment `<>`"""
+    if pos + 1 >= len(buf):
+        return False
+    c = buf[pos + 1]
+    if not (c == 0x3E or c == 0x5F or c == 0x24 or 0x41 <= c <= 0x5A or 0x61 <= c <= 0x7A):
+        return False
+    # `<T,>(x) => ...` et `<T extends U>` sont des génériques TypeScript
+    return _GENERIC_RE.match(buf, pos) is None
+
+
+def scan(buf, start=0, end=None):
+    """
+    Parcourt buf[start:end] une seule fois et retourne un Scan.
+    Les offsets restent absolus ; start doit être en position de code.
+    """
+    result = Scan()
+    pairs, errors = result.pairs, result.errors
+    # Frames : (mode, offset d'ouverture, ouvrant ou nom de balise, balise fermante)
+    stack = [(CODE, -1, None, False)]
+    pos, n = start, len(buf) if end is None else end
+
+    while pos < n:
+        mode, opened, opener, closing = stack[-1]
+
+        if mode == CODE:
+            m = _CODE_RE.search(buf, pos, n)
+            if m is None:
+                break
+            i = m.start()
+            c = buf[i]
+            pos = i + 1
+            if c in _OPENERS:
+                stack.append((CODE, i, c, False))
+            elif c in _CLOSERS:
+                if opened < 0:
+                    errors.append((i, f"'{chr(c)}' fermant sans ouvrant"))
+                    continue
+                if opener != _CLOSERS[c]:
+                    errors.append((i, f"'{chr(c)}' ferme '{chr(opener)}' ouvert en {opened}"))
+                pairs[opened] = i
+                stack.pop()
+            elif c in _STRING_RES:
+                s = _STRING_RES[c].match(buf, i, n)
+                if s is None:
+                    errors.append((i, 'chaîne non terminée'))
+                    eol = _EOL_RE.search(buf, i, n)
+                    pos = n if eol is None else eol.start()
+                else:
+                    pos = s.end()
+            elif c == 0x60:  # `
+                stack.append((TEMPLATE, i, None, False))
+            elif c == 0x2F:  # /
+                nxt = buf[i + 1] if i + 1 < n else 0
+                if nxt == 0x2F:
+                    pos = _LINE_COMMENT_RE.match(buf, i, n).end()
+                elif nxt == 0x2A:
+                    s = _BLOCK_COMMENT_RE.match(buf, i, n)
+                    if s is None:
+                        errors.append((i, 'commentaire non terminé'))
+                        pos = n
+                    else:
+                        pos = s.end()
+                elif _expression_allowed(buf, i):
+                    s = _REGEX_RE.match(buf, i, n)
+                    if s is not None:
+                        pos = s.end()
+            elif c == 0x3C and _starts_tag(buf, i) and _expression_allowed(buf, i):  # <
+                t = _TAG_NAME_RE.match(buf, i, n)
+                stack.append((TAG, i, bytes(t.group(2) or b''), False))
+                pos = t.end()
+
+        elif mode == TEMPLATE:
+            m = _TEMPLATE_RE.search(buf, pos, n)
+            if m is None:
+                errors.append((opened, 'template literal non terminé'))
+                break
+            pos = m.end()
+            if buf[m.start()] == 0x60:
+                stack.pop()
+            elif buf[m.start()] == 0x24:  # ${
+                stack.append((CODE, m.start() + 1, 0x7B, False))
+
+        elif mode == TAG:
+            m = _TAG_RE.search(buf, pos, n)
+            if m is None:
+                errors.append((opened, f'balise <{opener.decode()}> non terminée'))
+                break
+            i = m.start()
+            c = buf[i]
+            pos = i + 1
+            if c == 0x7B:
+                stack.append((CODE, i, c, False))
+            elif c == 0x7D:
+                errors.append((i, "'}' fermant sans ouvrant dans une balise"))
+            elif c in _JSX_STRING_RES:
+                s = _JSX_STRING_RES[c].match(buf, i, n)
+                if s is None:
+                    errors.append((i, "valeur d'attribut non terminée"))
+                    pos = n
+                else:
+                    pos = s.end()
+            elif c == 0x2F and i + 1 < n and buf[i + 1] == 0x3E:  # />
+                stack.pop()
+                result.elements.append((opened, i + 2, opener))
+                pos = i + 2
+            elif c == 0x3E:  # >
+                stack.pop()
+                if not closing:
+                    stack.append((CHILDREN, opened, opener, False))
+                    continue
+                parent = stack[-1]
+                if parent[0] != CHILDREN:
+                    errors.append((opened, f'</{opener.decode()}> sans balise ouvrante'))
+                    continue
+                if parent[2] != opener:
+                    errors.append((opened, f'</{opener.decode()}> ferme <{parent[2].decode()}>'))
+                stack.pop()
+                result.elements.append((parent[1], i + 1, parent[2]))
+
+        else:  # CHILDREN : texte JSX, seuls `{` et `<` comptent
+            m = _CHILDREN_RE.search(buf, pos, n)
+            if m is None:
+                errors.append((opened, f'élément <{opener.decode()}> non fermé'))
+                break
+            i = m.start()
+            if buf[i] == 0x7B:
+                stack.append((CODE, i, 0x7B, False))
+                pos = i + 1
+            else:
+                t = _TAG_NAME_RE.match(buf, i, n)
+                stack.append((TAG, i, bytes(t.group(2) or b''), t.group(1) == b'/'))
+                pos = t.end()
+
+    for mode, opened, opener, _ in stack[1:]:
+        if mode == CODE:
+            errors.append((opened, f"'{chr(opener)}' jamais fermé"))
+        elif mode == CHILDREN and pos >= n:
+            errors.append((opened, f'élément <{opener.decode()}> non fermé'))
+    return result
+
+
+def scan_file(path):
+    """Scanne un fichier via mmap (lecture seule, sans le charger en mémoire)"""
+    with open(path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return Scan()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return scan(mm)
@@ -0,0 +1,211 @@
+"""
+Lecture ligne à ligne en streaming pour les scripts d'analyse ClientSelector.
+
+Le fichier n'est jamais chargé en entier : chaque étape est un générateur
+(iter_lines -> tag_sections -> find_select_blocks) et la détection des blocs
+`<Select ... clients.map( ... </Select>` ne garde qu'une fenêtre bornée
+(deque) de lignes en mémoire.
+
+Pour les accès aléatoires, LineIndex (débuts de ligne, bisect) et FormAnchors
+(marqueurs contractType) se construisent en un passage sur le buffer et se
+mettent en cache (cf. cache.load_form_index).
+"""
+
+import re
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass
+
+NOTAIRE_SELECTOR = 'src/components/dashboard/ContractSelectorNotaire.tsx'
+
+# Début d'un formulaire : {contractType === '...' && (
+CONTRACT_MARKER_RE = re.compile(r'''contractType === (['"])(.*?)(?<!\\)\1''')
+CONTRACT_MARKER_BYTES_RE = re.compile(CONTRACT_MARKER_RE.pattern.encode('ascii'))
+_QUOTED_LINE_RE = re.compile(r'''^\s*(['"])(.*)\1,?\s*$''')
+
+SELECT_WINDOW = 50
+
+
+@dataclass
+class Section:
+    """Formulaire d'un type de contrat : lignes [start, end] (1-based, incluses)"""
+    name: str
+    start: int
+    end: int
+
+
+class LineIndex:
+    """Offsets des débuts de ligne d'un buffer : ligne <-> offset en O(log n)"""
+
+    def __init__(self, starts, size):
+        self.starts = starts
+        self.size = size
+
+    @classmethod
+    def build(cls, buf):
+        starts = [0]
+        pos = buf.find(b'\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = buf.find(b'\n', pos + 1)
+        if len(starts) > 1 and starts[-1] == len(buf):
+            starts.pop()  # pas de ligne vide après le dernier \n
+        return cls(starts, len(buf))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def line_of(self, offset):
+        """Numéro de ligne (1-based) contenant offset"""
+        if not 0 <= offset <= self.size:
+            raise ValueError(f'offset hors du buffer: {offset}')
+        return bisect_right(self.starts, offset)
+
+    def offset_of(self, lineno):
+        """Offset du début de la ligne lineno (1-based)"""
+        if not 1 <= lineno <= len(self.starts):
+            raise ValueError(f'ligne hors du buffer: {lineno}')
+        return self.starts[lineno - 1]
+
+
+class FormAnchors:
+    """
+    Marqueurs `contractType === '...'` d'un buffer, trouvés en un passage :
+    retrouver un formulaire est ensuite une recherche dans un dict, quel que
+    soit le décalage du fichier depuis le dernier run.
+    """
+
+    def __init__(self, anchors):
+        self.anchors = anchors  # [(offset, nom)] dans l'ordre du fichier
+        self._by_name = {}
+        for i, (_, name) in enumerate(anchors):
+            self._by_name.setdefault(name, i)
+
+    @classmethod
+    def build(cls, buf):
+        return cls([
+            (m.start(), m.group(2).decode('utf-8').replace("\\'", "'").replace('\\"', '"'))
+            for m in CONTRACT_MARKER_BYTES_RE.finditer(buf)
+        ])
+
+    def offset(self, name):
+        """Offset du premier marqueur de name (ou None)"""
+        i = self._by_name.get(name)
+        return None if i is None else self.anchors[i][0]
+
+    def section(self, name, lines):
+        """Section (lignes) du formulaire name : jusqu'au marqueur suivant, comme find_sections"""
+        i = self._by_name.get(name)
+        if i is None:
+            return None
+        start = lines.line_of(self.anchors[i][0])
+        if i + 1 < len(self.anchors):
+            end = lines.line_of(self.anchors[i + 1][0]) - 1
+        else:
+            end = len(lines)
+        return Section(name, start, end)
+
+
+def iter_lines(path):
+    """Génère (numéro de ligne 1-based, ligne sans fin de ligne), paresseusement"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for lineno, line in enumerate(f, 1):
+            yield lineno, line.rstrip('\r\n')
+
+
+def load_notaire_contracts(path=NOTAIRE_SELECTOR):
+    """Noms des contrats notaires lus depuis NOTAIRE_CONTRACT_CATEGORIES"""
+    names = set()
+    in_categories = False
+    for _, line in iter_lines(path):
+        if 'NOTAIRE_CONTRACT_CATEGORIES' in line:
+            in_categories = True
+        elif in_categories:
+            if line.startswith('];'):
+                break
+            m = _QUOTED_LINE_RE.match(line)
+            if m:
+                names.add(m.group(2))
+    return names
+
+
+def marker_name(line):
+    """Nom du contrat si la ligne ouvre un formulaire `contractType === '...'`"""
+    m = CONTRACT_MARKER_RE.search(line)
+    if m is None:
+        return None
+    return m.group(2).replace("\\'", "'").replace('\\"', '"')
+
+
+def tag_sections(lines):
+    """
+    Ajoute à chaque ligne le nom du formulaire courant :
+    génère (lineno, line, section) avec section None avant le premier marqueur.
+    """
+    current = None
+    for lineno, line in lines:
+        name = marker_name(line)
+        if name is not None:
+            current = name
+        yield lineno, line, current
+
+
+def find_sections(lines, names=None):
+    """Génère une Section par formulaire (filtrée sur names si fourni)"""
+    current = None
+    last = 0
+    for lineno, line in lines:
+        last = lineno
+        name = marker_name(line)
+        if name is None:
+            continue
+        if current is not None:
+            current.end = lineno - 1
+            yield current
+            current = None
+        if names is None or name in names:
+            current = Section(name, lineno, lineno)
+    if current is not None:
+        current.end = last
+        yield current
+
+
+def find_select_blocks(tagged_lines, names=None, window=SELECT_WINDOW):
+    """
+    Génère (start, end) pour chaque `<Select` suivi d'un `clients.map(` avant
+    son `</Select>`, cherché au plus `window` lignes plus loin.
+    tagged_lines vient de tag_sections ; names filtre les formulaires.
+    """
+    ahead = deque()
+    source = iter(tagged_lines)
+
+    def fill():
+        while len(ahead) < window:
+            item = next(source, None)
+            if item is None:
+                return
+            if names is None or item[2] in names:
+                ahead.append(item)
+
+    fill()
+    while ahead:
+        start, line, _ = ahead[0]
+        end = _select_end(ahead) if '<Select' in line else None
+        if end is None:
+            ahead.popleft()
+        else:
+            yield start, ahead[end][0]
+            for _ in range(end + 1):
+                ahead.popleft()
+        fill()
+
+
+def _select_end(window):
+    """Position dans la fenêtre du `</Select>` d'un Select qui utilise clients.map("""
+    has_clients_map = False
+    for k, (_, text, _) in enumerate(window):
+        if 'clients.map(' in text:
+            has_clients_map = True
+        if '</Select>' in text:
+            return k if has_clients_map and k > 0 else None
+    return None
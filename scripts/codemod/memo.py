@@ -0,0 +1,99 @@
+"""
+Mémo persistant des résultats de transformation par handler.
+
+La clé d'une entrée est le hash du source exact du handler, du nom et de la
+version de la transformation, de son `salt` (hash des tables qu'elle lit) et
+des résultats des transformations déjà passées sur ce span. L'entrée garde le
+résultat de handler() et ses patchs en offsets relatifs au début du span :
+un handler inchangé est rejoué (patchs décalés) sans relancer la transformation.
+
+Un fichier JSON par fichier source dans .codemod-cache/memo/ (les workers de
+run-codemods.py ne se partagent donc jamais un mémo ; le sous-dossier est
+hors de l'éviction LRU de ParseCache).
+"""
+
+import hashlib
+import json
+import os
+
+from codemod.cache import CACHE_DIR
+
+MEMO_DIR = os.path.join(CACHE_DIR, 'memo')
+MAX_ENTRIES = 4096
+
+
+def digest(*parts):
+    """Hash court et stable de valeurs sérialisables en JSON"""
+    data = json.dumps(parts, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+class HandlerMemo:
+    """Entrées {clé: [résultat, [[début, fin, remplacement, label], ...]]}"""
+
+    def __init__(self, path, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @classmethod
+    def for_file(cls, source_path, directory=MEMO_DIR):
+        name = hashlib.sha256(os.path.abspath(source_path).encode('utf-8')).hexdigest()[:16]
+        return cls(os.path.join(directory, f'memo-{name}.json'))
+
+    def key(self, visitor, span, content, visited):
+        h = hashlib.sha256()
+        h.update(f'{visitor.name}\0{visitor.version}\0{visitor.salt}\0'.encode('utf-8'))
+        h.update(json.dumps(visited, sort_keys=True).encode('utf-8'))
+        h.update(b'\0')
+        h.update(content[span.start:span.end])
+        return h.hexdigest()
+
+    def get(self, key):
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        if next(reversed(self.entries)) != key:
+            # En fin de dict : le plus récemment utilisé ; l'ordre doit être sauvé
+            self.entries[key] = self.entries.pop(key)
+            self._dirty = True
+        self.hits += 1
+        return self.entries[key]
+
+    def put(self, key, result, patches, base):
+        self.entries[key] = [result, [
+            [p.start - base, p.end - base, p.replacement.decode('utf-8', 'surrogateescape'), p.label]
+            for p in patches
+        ]]
+        self._dirty = True
+        while len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
+
+    @staticmethod
+    def replay(entry, base, edits):
+        """Ajoute à edits les patchs de l'entrée, décalés de base ; retourne (résultat, labels)"""
+        result, patches = entry
+        for start, end, replacement, label in patches:
+            edits.replace(base + start, base + end, replacement.encode('utf-8', 'surrogateescape'), label)
+        return result, [label for _, _, _, label in patches]
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    @property
+    def stats(self):
+        return f"{self.hits} hit(s), {self.misses} miss(es)"
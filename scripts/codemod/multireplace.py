@@ -0,0 +1,79 @@
+"""
+Remplacement multi-motifs en un seul passage.
+
+Toutes les aiguilles sont compilées en UNE regex en forme de trie (préfixes
+communs factorisés, ce qui évite de retester chaque alternative à chaque
+position) ; une table de dispatch associe chaque occurrence à son
+remplacement. Sémantique : occurrences sans chevauchement, la plus à gauche
+puis la plus longue gagne.
+"""
+
+import re
+
+from codemod.piecetable import PieceTable
+
+
+def _trie_pattern(needles):
+    trie = {}
+    for needle in needles:
+        node = trie
+        for byte in needle:
+            node = node.setdefault(byte, {})
+        node[None] = True  # fin d'aiguille
+    return _node_pattern(trie)
+
+
+def _node_pattern(node):
+    """Regex d'un nœud du trie (les chaînes sans embranchement sont aplaties)"""
+    literal = bytearray()
+    while len(node) == 1 and None not in node:
+        (byte, node), = node.items()
+        literal.append(byte)
+    branches = [
+        re.escape(bytes([byte])) + _node_pattern(child)
+        for byte, child in sorted((k, v) for k, v in node.items() if k is not None)
+    ]
+    if not branches:
+        body = b''
+    elif len(branches) == 1:
+        body = branches[0]
+    else:
+        body = b'(?:' + b'|'.join(branches) + b')'
+    if None in node and body:
+        # Extension optionnelle tentée d'abord : l'aiguille la plus longue gagne
+        body = b'(?:' + body + b')?'
+    return re.escape(bytes(literal)) + body
+
+
+class MultiReplacer:
+    """Remplace un ensemble d'aiguilles (bytes -> bytes) en un passage"""
+
+    def __init__(self, replacements):
+        self.replacements = dict(replacements)
+        if b'' in self.replacements:
+            raise ValueError('aiguille vide')
+        self._regex = re.compile(_trie_pattern(self.replacements)) if self.replacements else None
+        self._max_len = max(map(len, self.replacements), default=0)
+
+    def finditer(self, buf, start=0, end=None):
+        """Génère (start, end, aiguille) pour chaque occurrence"""
+        if self._regex is None:
+            return
+        if isinstance(buf, PieceTable):
+            # Par fenêtres : aucune occurrence ne dépasse la plus longue aiguille
+            yield from buf.finditer(self._regex, start, end, overlap=self._max_len - 1)
+            return
+        for m in self._regex.finditer(buf, start, len(buf) if end is None else end):
+            yield m.start(), m.end(), m.group()
+
+    def add_patches(self, buf, edits, label=None):
+        """
+        Ajoute à edits un patch par occurrence et retourne les compteurs
+        {aiguille: nombre d'occurrences} (0 pour les aiguilles absentes).
+        label(aiguille) donne le libellé des patchs.
+        """
+        counts = dict.fromkeys(self.replacements, 0)
+        for start, end, needle in self.finditer(buf):
+            counts[needle] += 1
+            edits.replace(start, end, self.replacements[needle], label(needle) if label else '')
+        return counts
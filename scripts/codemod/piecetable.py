@@ -0,0 +1,206 @@
+"""
+Piece table pour les éditions séquentielles dépendantes (chaque recherche voit
+les éditions précédentes) sans reconstruire le fichier à chaque étape.
+
+Le texte est une suite de morceaux (buffer source, offset, longueur) rangés
+dans un treap implicite (arbre équilibré aléatoire indexé par position) :
+insertion, suppression et remplacement coûtent O(log n) et ne copient pas
+le texte existant. Les lectures ne matérialisent que la fenêtre demandée ;
+le contenu complet n'est reconstruit qu'à l'écriture (write).
+"""
+
+import os
+import random
+
+_CHUNK = 1 << 20
+
+
+class _Node:
+    __slots__ = ('buf', 'off', 'length', 'size', 'prio', 'left', 'right')
+
+    def __init__(self, buf, off, length):
+        self.buf = buf
+        self.off = off
+        self.length = length
+        self.size = length
+        self.prio = random.random()
+        self.left = None
+        self.right = None
+
+    def update(self):
+        self.size = self.length
+        if self.left is not None:
+            self.size += self.left.size
+        if self.right is not None:
+            self.size += self.right.size
+        return self
+
+
+def _size(node):
+    return 0 if node is None else node.size
+
+
+def _merge(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.prio > b.prio:
+        a.right = _merge(a.right, b)
+        return a.update()
+    b.left = _merge(a, b.left)
+    return b.update()
+
+
+def _split(node, pos):
+    """(morceaux de [0, pos), morceaux de [pos, fin)) ; coupe un morceau si besoin"""
+    if node is None:
+        return None, None
+    left_size = _size(node.left)
+    if pos <= left_size:
+        left, node.left = _split(node.left, pos)
+        return left, node.update()
+    if pos >= left_size + node.length:
+        node.right, right = _split(node.right, pos - left_size - node.length)
+        return node.update(), right
+    # pos tombe à l'intérieur du morceau : deux morceaux sur le même buffer
+    cut = pos - left_size
+    tail = _Node(node.buf, node.off + cut, node.length - cut)
+    tail.right = node.right
+    node.length = cut
+    node.right = None
+    return node.update(), tail.update()
+
+
+class PieceTable:
+    """Texte éditable (bytes) : buf d'origine + morceaux insérés"""
+
+    def __init__(self, buf=b''):
+        view = memoryview(buf)
+        self._root = _Node(view, 0, len(view)) if len(view) else None
+
+    def __len__(self):
+        return _size(self._root)
+
+    def _check(self, start, end):
+        if not 0 <= start <= end <= len(self):
+            raise ValueError(f'span invalide: {start}-{end} (taille {len(self)})')
+
+    def insert(self, pos, data):
+        self.replace(pos, pos, data)
+
+    def delete(self, start, end):
+        self.replace(start, end, b'')
+
+    def replace(self, start, end, data):
+        """Remplace [start, end) par data ; O(log n) quelle que soit la taille"""
+        self._check(start, end)
+        left, rest = _split(self._root, start)
+        _, right = _split(rest, end - start)
+        if data:
+            view = memoryview(bytes(data))
+            left = _merge(left, _Node(view, 0, len(view)))
+        self._root = _merge(left, right)
+
+    def apply(self, edits):
+        """Applique une EditList (coordonnées du contenu actuel), de la fin au début"""
+        for patch in reversed(edits.sorted()):
+            self.replace(patch.start, patch.end, patch.replacement)
+
+    def pieces(self, start=0, end=None):
+        """Génère les memoryview qui couvrent [start, end), dans l'ordre"""
+        end = len(self) if end is None else end
+        self._check(start, end)
+        stack = []
+        node, base = self._root, 0
+        while (stack or node is not None) and start < end:
+            if node is not None:
+                # Sous-arbre gauche seulement s'il recoupe [start, end)
+                stack.append((node, base))
+                if base + _size(node.left) > start:
+                    node = node.left
+                else:
+                    node = None
+                continue
+            node, base = stack.pop()
+            piece_start = base + _size(node.left)
+            if piece_start >= end:
+                break
+            piece_end = piece_start + node.length
+            if piece_end > start:
+                lo = max(start, piece_start) - piece_start
+                hi = min(end, piece_end) - piece_start
+                yield node.buf[node.off + lo:node.off + hi]
+            node, base = node.right, piece_end
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError('PieceTable ne supporte que les tranches contiguës')
+        start, end, _ = key.indices(len(self))
+        return b''.join(self.pieces(start, max(start, end)))
+
+    def __bytes__(self):
+        return self[:]
+
+    def find(self, sub, start=0, end=None):
+        """Comme bytes.find, en ne matérialisant que [start, end)"""
+        end = len(self) if end is None else min(end, len(self))
+        if start >= end:
+            return -1 if sub else start
+        i = self[start:end].find(sub)
+        return -1 if i == -1 else start + i
+
+    def __contains__(self, sub):
+        return any(True for _ in self.finditer_literal(sub))
+
+    def finditer_literal(self, sub):
+        """Positions de sub, fenêtre par fenêtre (sans matérialiser tout le texte)"""
+        pos, n = 0, len(self)
+        while pos < n:
+            window_end = min(pos + _CHUNK + len(sub) - 1, n)
+            window = self[pos:window_end]
+            i = window.find(sub)
+            while i != -1 and i < _CHUNK:
+                yield pos + i
+                i = window.find(sub, i + max(1, len(sub)))
+            pos += _CHUNK
+
+    def finditer(self, regex, start=0, end=None, overlap=0, chunk=_CHUNK):
+        """
+        Génère (start, end, texte) pour chaque occurrence de regex, sans
+        chevauchement, fenêtre par fenêtre. Exact si aucune occurrence ne
+        dépasse overlap + 1 octets (cas des aiguilles de MultiReplacer).
+        """
+        end = len(self) if end is None else end
+        pos = start
+        while pos < end:
+            owned_end = min(pos + chunk, end)
+            window = self[pos:min(owned_end + overlap, end)]
+            last = 0
+            for m in regex.finditer(window):
+                if pos + m.start() >= owned_end:
+                    break
+                yield pos + m.start(), pos + m.end(), m.group()
+                last = m.end()
+            pos = max(owned_end, pos + last)
+
+    def iter_lines(self):
+        """Génère (numéro de ligne 1-based, ligne décodée), comme lines.iter_lines"""
+        lineno, tail = 1, b''
+        for piece in self.pieces():
+            for i in range(0, len(piece), _CHUNK):
+                *complete, tail = (tail + bytes(piece[i:i + _CHUNK])).split(b'\n')
+                for line in complete:
+                    yield lineno, line.decode('utf-8').rstrip('\r')
+                    lineno += 1
+        if tail:
+            yield lineno, tail.decode('utf-8').rstrip('\r')
+
+    def write(self, path):
+        """Écrit le contenu morceau par morceau (via un fichier temporaire)"""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            for piece in self.pieces():
+                f.write(piece)
+        os.replace(tmp_path, path)
+        return len(self)
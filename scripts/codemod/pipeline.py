@@ -0,0 +1,144 @@
+"""
+Driver des transformations fusionnées : une lecture, un parcours, une écriture.
+
+Les visiteurs sélectionnés (transforms.TRANSFORMS) sont ordonnés selon leurs
+contraintes `after`, puis le fichier est parcouru une seule fois : les spans
+de handlers (HandlerIndex) et les formulaires JSX (marqueurs contractType,
+`<Select>`, `<ClientSelector`) sont fusionnés dans l'ordre du document et
+chaque événement est passé à tous les visiteurs. Tous les patchs vont dans une
+seule EditList, appliquée en une écriture ; les régions touchées sont
+re-lexées avant (cf. validate.py).
+"""
+
+import heapq
+import re
+
+from codemod.profile import NULL_PROFILER
+from codemod.splice import EditList
+from codemod.transforms import TRANSFORMS, Transform
+from codemod.validate import check
+
+_JSX_RE = re.compile(
+    rb'''contractType === (['"])(?P<section>.*?)(?<!\\)\1'''
+    rb'|<(?P<tag>Select|ClientSelector)\b'
+)
+
+
+def order(names):
+    """
+    names triés selon les contraintes `after` (seules celles entre
+    transformations sélectionnées comptent), sinon dans l'ordre de TRANSFORMS.
+    """
+    unknown = set(names) - set(TRANSFORMS)
+    if unknown:
+        raise ValueError(f"transformation(s) inconnue(s): {', '.join(sorted(unknown))}")
+    pending = [name for name in TRANSFORMS if name in names]
+    ordered = []
+    while pending:
+        ready = next(
+            (name for name in pending
+             if all(dep not in pending for dep in TRANSFORMS[name].after)),
+            None,
+        )
+        if ready is None:
+            raise ValueError(f"contraintes `after` circulaires: {', '.join(pending)}")
+        ordered.append(ready)
+        pending.remove(ready)
+    return ordered
+
+
+def jsx_events(content):
+    """(offset, méthode, arguments) des formulaires JSX, puis ('end', dernière ligne)"""
+    lineno, last = 1, 0
+    for m in _JSX_RE.finditer(content):
+        lineno += content.count(b'\n', last, m.start())
+        last = m.start()
+        if m.group('section') is not None:
+            name = m.group('section').decode('utf-8').replace("\\'", "'").replace('\\"', '"')
+            yield m.start(), 'section', (name, m.start(), lineno)
+        elif m.group('tag') == b'Select':
+            end = content.find(b'</Select>', m.end())
+            end = len(content) if end == -1 else end + len(b'</Select>')
+            yield m.start(), 'select', ('Select', m.start(), end, lineno)
+        else:
+            yield m.start(), 'select', ('ClientSelector', m.start(), m.start(), lineno)
+    yield len(content), 'end', (lineno + content.count(b'\n', last),)
+
+
+def _handler_events(index):
+    for span in index:
+        yield span.start, 'handler', span
+
+
+def _visit_handler(visitor, span, visited, content, edits, memo):
+    """handler() du visiteur, ou son résultat rejoué depuis le mémo"""
+    if memo is None or not visitor.memoize:
+        return visitor.handler(span, visited)
+    key = memo.key(visitor, span, content, visited)
+    entry = memo.get(key)
+    if entry is not None:
+        result, labels = memo.replay(entry, span.start, edits)
+        visitor.replayed(span, result, labels)
+        return result
+    # Patchs capturés à part pour les mémoriser en offsets relatifs au span
+    captured = EditList()
+    visitor.edits = captured
+    try:
+        result = visitor.handler(span, visited)
+    finally:
+        visitor.edits = edits
+    edits.patches.extend(captured.patches)
+    memo.put(key, result, captured.patches, span.start)
+    return result
+
+
+def run_pipeline(content, index, names, prof=NULL_PROFILER, jsx=None, memo=None, validate=True,
+                 done=None):
+    """
+    Applique les transformations names à content (bytes) en un parcours.
+    jsx : événements de jsx_events(content) déjà calculés (mode watch).
+    memo : HandlerMemo pour rejouer les handlers inchangés (cf. memo.py).
+    validate : re-lexer les régions touchées (lève validate.ValidationError).
+    done : {nom de transformation: handlers déjà traités} (journal, --resume) :
+    ces spans ne sont pas visités.
+    Retourne (EditList en coordonnées de content, {nom: rapport}).
+    """
+    edits = EditList()
+    done = done or {}
+    visitors = [TRANSFORMS[name](content, index, edits, prof) for name in order(names)]
+    on_handler = [v for v in visitors if type(v).handler is not Transform.handler]
+    on_between = [v for v in visitors if type(v).between is not Transform.between]
+    on_jsx = [v for v in visitors if v.visits_jsx]
+
+    last_lineno = None
+    cursor = 0  # fin du dernier span de handler
+    sources = [_handler_events(index)] if on_handler or on_between else []
+    if on_jsx:
+        sources.append(jsx_events(content) if jsx is None else iter(jsx))
+    for _, kind, payload in heapq.merge(*sources, key=lambda event: event[0]):
+        if kind == 'handler':
+            if payload.start > cursor:
+                for visitor in on_between:
+                    visitor.between(cursor, payload.start)
+            cursor = max(cursor, payload.end)
+            visited = {}
+            for visitor in on_handler:
+                if payload.name in done.get(visitor.name, ()):
+                    visited[visitor.name] = False
+                    if visitor in on_between:
+                        visitor.between(payload.start, payload.end)
+                    continue
+                visited[visitor.name] = _visit_handler(visitor, payload, visited, content, edits, memo)
+        elif kind == 'end':
+            last_lineno = payload[0]
+        else:
+            for visitor in on_jsx:
+                getattr(visitor, kind)(*payload)
+    if cursor < len(content):
+        for visitor in on_between:
+            visitor.between(cursor, len(content))
+    if last_lineno is None:
+        last_lineno = content.count(b'\n') + 1
+    if validate and edits:
+        prof.count('octets validés', check(content, edits, index))
+    return edits, {visitor.name: visitor.finish(last_lineno) for visitor in visitors}
@@ -0,0 +1,132 @@
+"""
+Instrumentation optionnelle des codemods : temps par handler et par phase
+(locate, splice, rewrite), compteurs (appels regex, octets copiés) et dump
+cProfile/pstats.
+
+Activée par --profile [FICHIER.pstats] ou la variable CODEMOD_PROFILE
+(1 pour les temps seuls, un chemin pour aussi écrire le pstats). Désactivée,
+les scripts reçoivent NULL_PROFILER dont les méthodes ne font rien.
+"""
+
+import cProfile
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+ENV_VAR = 'CODEMOD_PROFILE'
+PHASES = ('locate', 'splice', 'rewrite')
+
+_NULL_CONTEXT = nullcontext()
+
+
+class Profiler:
+    """Temps cumulés {handler: {phase: secondes}} et compteurs d'un run"""
+
+    enabled = True
+
+    def __init__(self, pstats_path=None):
+        self.pstats_path = pstats_path
+        self.timings = {}
+        self.counters = Counter()
+        self._cprofile = None
+
+    @contextmanager
+    def phase(self, handler, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            per_phase = self.timings.setdefault(handler, {})
+            per_phase[phase] = per_phase.get(phase, 0.0) + time.perf_counter() - started
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def start(self):
+        if self.pstats_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self):
+        """Arrête cProfile et écrit le pstats ; retourne son chemin (ou None)"""
+        if self._cprofile is None:
+            return None
+        self._cprofile.disable()
+        self._cprofile.dump_stats(self.pstats_path)
+        self._cprofile = None
+        return self.pstats_path
+
+    def slowest(self, n=10):
+        """[(handler, total, {phase: secondes})] du plus lent au plus rapide"""
+        totals = [(name, sum(phases.values()), phases) for name, phases in self.timings.items()]
+        totals.sort(key=lambda item: item[1], reverse=True)
+        return totals[:n]
+
+    def to_json(self):
+        return {'timings': self.timings, 'counters': dict(self.counters)}
+
+    def merge(self, data, prefix=''):
+        """Ajoute le to_json() d'un autre Profiler (worker de run-codemods.py)"""
+        for name, phases in data['timings'].items():
+            per_phase = self.timings.setdefault(f'{prefix}{name}', {})
+            for phase, seconds in phases.items():
+                per_phase[phase] = per_phase.get(phase, 0.0) + seconds
+        self.counters.update(data['counters'])
+
+    def report(self, n=10):
+        """Lignes de rapport : compteurs puis les n handlers les plus lents"""
+        lines = ["⏱️  Profil:"]
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"  • {name}: {value:,}")
+        slowest = self.slowest(n)
+        if slowest:
+            lines.append(f"  • Handlers les plus lents ({len(slowest)}/{len(self.timings)}):")
+        for name, total, phases in slowest:
+            detail = ', '.join(
+                f"{phase} {phases[phase] * 1000:.2f}" for phase in PHASES if phase in phases
+            )
+            lines.append(f"    - {name}: {total * 1000:.2f} ms ({detail})")
+        return lines
+
+
+class NullProfiler:
+    """Profiler désactivé : aucun coût mesurable sur le chemin chaud"""
+
+    enabled = False
+    pstats_path = None
+
+    def phase(self, handler, phase):
+        return _NULL_CONTEXT
+
+    def count(self, name, n=1):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        return None
+
+    def to_json(self):
+        return None
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def add_argument(parser):
+    """Ajoute --profile [FICHIER.pstats] à un ArgumentParser"""
+    parser.add_argument('--profile', nargs='?', const=True, default=None, metavar='PSTATS',
+                        help=f"temps par handler et compteurs ; avec un chemin, dump cProfile "
+                             f"(aussi via {ENV_VAR}=1 ou {ENV_VAR}=fichier.pstats)")
+
+
+def make_profiler(option=None):
+    """Profiler selon --profile (None, True ou chemin) puis CODEMOD_PROFILE"""
+    if option is None:
+        env = os.environ.get(ENV_VAR, '')
+        if env in ('', '0'):
+            return NULL_PROFILER
+        option = True if env == '1' else env
+    return Profiler(None if option is True else option)
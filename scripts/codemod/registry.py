@@ -0,0 +1,114 @@
+"""
+Registre des handlers de contrats, découvert dans le source au lieu d'être
+recopié à la main dans chaque script (TARGETS, HANDLERS_TO_INTEGRATE,
+CONTRACT_TYPE_MAPPING divergeaient).
+
+Un seul passage sur le HandlerIndex : pour chaque handler, le contractType
+(celui de generateContractWithAI s'il est déjà intégré, sinon le `name:` de
+son `.insert({` ; HANDLERS_CONFIG ne sert que si le source ne dit rien), ses
+champs clientId et la présence de l'IA. Le registre se sérialise en JSON et se met en cache avec l'index
+(cf. cache.load_registry).
+"""
+
+import re
+
+from codemod.tables import HANDLERS_CONFIG
+
+_CONTRACT_TYPE_RE = re.compile(rb'''contractType:\s*(["'])(.*?)(?<!\\)\1''')
+_INSERT_NAME_RE = re.compile(rb'''\bname:\s*(["'`])(.*?)(?<!\\)\1''', re.DOTALL)
+# bailHabitationData.bailleurClientId, indivisionData.indivisaires?.find(...)?.clientId...
+_CLIENT_FIELD_RE = re.compile(rb'\b[a-z]\w*Data(?:\??\.\w+)*?\??\.\w*[cC]lientId\b')
+_AI_MARKER = b'generateContractWithAI'
+
+
+def _name_prefix(literal):
+    """`Bail habitation - ${...}` -> 'Bail habitation'"""
+    return literal.split('${', 1)[0].split(' - ', 1)[0].strip(' -:')
+
+
+class HandlerEntry:
+    """Ce que les scripts savent d'un handler ; compact (un registre par fichier en mémoire)"""
+
+    __slots__ = ('name', 'contract_type', 'client_fields', 'has_ai')
+
+    def __init__(self, name, contract_type, client_fields=(), has_ai=False):
+        self.name = name
+        self.contract_type = contract_type
+        self.client_fields = tuple(client_fields)
+        self.has_ai = has_ai
+
+    @property
+    def client_field(self):
+        """Premier champ clientId du handler, ou 'null' (pour getClientInfo)"""
+        return self.client_fields[0] if self.client_fields else 'null'
+
+    def to_json(self):
+        return [self.name, self.contract_type, list(self.client_fields), self.has_ai]
+
+    def __repr__(self):
+        return f'HandlerEntry({self.name!r}, {self.contract_type!r})'
+
+
+class HandlerRegistry:
+    """Nom de handler -> HandlerEntry, dans l'ordre du fichier (premières définitions)"""
+
+    __slots__ = ('_entries',)
+
+    def __init__(self, entries):
+        self._entries = {}
+        for entry in entries:
+            self._entries.setdefault(entry.name, entry)
+
+    @classmethod
+    def discover(cls, content, index):
+        """Construit le registre à partir de content (bytes) et de son HandlerIndex"""
+        entries = []
+        for span in index:
+            # Doublon d'un nom : seule la première définition compte (cf. HandlerIndex)
+            if index.get(span.name) is not span:
+                continue
+            body = content[span.start:span.end]
+            has_ai = _AI_MARKER in body
+            contract_type = None
+            if has_ai:
+                m = _CONTRACT_TYPE_RE.search(body)
+                if m:
+                    contract_type = m.group(2).decode('utf-8')
+            if contract_type is None and span.has_insert:
+                m = _INSERT_NAME_RE.search(content, span.insert_start, span.insert_end)
+                if m:
+                    contract_type = _name_prefix(m.group(2).decode('utf-8')) or None
+            if contract_type is None:
+                # Repli : handler sans appel IA ni `name:` lisible
+                contract_type = HANDLERS_CONFIG.get(span.name)
+            fields = dict.fromkeys(m.group().decode('ascii') for m in _CLIENT_FIELD_RE.finditer(body))
+            entries.append(HandlerEntry(span.name, contract_type, fields, has_ai))
+        return cls(entries)
+
+    def to_json(self):
+        return [entry.to_json() for entry in self._entries.values()]
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(HandlerEntry(*row) for row in data)
+
+    def get(self, name):
+        return self._entries.get(name)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __iter__(self):
+        return iter(self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def contract_types(self, skip=(), pending_only=False):
+        """{handler: contractType} des handlers typés, hors skip (et hors IA déjà intégrée)"""
+        return {
+            entry.name: entry.contract_type
+            for entry in self._entries.values()
+            if entry.contract_type and entry.name not in skip
+            and not (pending_only and entry.has_ai)
+        }
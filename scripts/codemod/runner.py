@@ -0,0 +1,141 @@
+"""
+Exécution des transformations (transforms.py) sur plusieurs fichiers TSX,
+répartis sur un ProcessPoolExecutor.
+
+Chaque worker traite un fichier de bout en bout (index via le cache, un seul
+parcours pour toutes les transformations, cf. pipeline.py, une écriture) et
+ne renvoie que son rapport : rien de volumineux ne repasse par le processus
+principal. Les fichiers sont soumis du plus gros au
+plus petit, pour que la durée totale soit bornée par le plus gros fichier.
+
+Hors dry-run, chaque fichier est d'abord sauvegardé dans le store de backups
+(par le processus principal : le manifest n'est pas partagé entre workers),
+puis ses patchs sont journalisés avant l'écriture (cf. journal.py) : un run
+interrompu ou mauvais s'annule avec rollback() ou codemod-backup.py restore.
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from codemod.backup import BACKUP_DIR, BackupStore
+from codemod.cache import ParseCache, load_handler_index, refresh_handler_index
+from codemod.journal import JOURNAL_DIR, Journal, JournalError
+from codemod.memo import MEMO_DIR, HandlerMemo
+from codemod.pipeline import run_pipeline
+from codemod.profile import NULL_PROFILER, Profiler
+
+
+def expand(patterns):
+    """Fichiers (dédoublonnés) correspondant aux globs, du plus gros au plus petit"""
+    paths = {
+        os.path.normpath(path)
+        for pattern in patterns
+        for path in glob.glob(pattern, recursive=True)
+        if os.path.isfile(path)
+    }
+    return sorted(paths, key=lambda path: (-os.path.getsize(path), path))
+
+
+def _worker_profiler(path, profile):
+    """Profiler d'un worker : un pstats par fichier (<racine>-<fichier>.pstats)"""
+    if not profile:
+        return NULL_PROFILER
+    if profile is True:
+        return Profiler()
+    root, ext = os.path.splitext(profile)
+    return Profiler(f'{root}-{os.path.basename(path)}{ext or ".pstats"}')
+
+
+def _dir(cache_dir, default, name):
+    return default if cache_dir is None else os.path.join(cache_dir, name)
+
+
+def snapshot(paths, cache_dir=None):
+    """Snapshot de chaque fichier avant le run : {chemin: hash}"""
+    store = BackupStore(_dir(cache_dir, BACKUP_DIR, 'backups'))
+    return {path: store.snapshot(path) for path in paths}
+
+
+def journal_for(path, cache_dir=None):
+    return Journal.for_file(path, _dir(cache_dir, JOURNAL_DIR, 'journal'))
+
+
+def run_file(path, names, dry_run=False, cache_dir=None, profile=None):
+    """
+    Applique les transformations names (clés de transforms.TRANSFORMS) à path.
+    Retourne {'path', 'reports': {nom: rapport}, 'patches', 'delta', 'profile'} ;
+    le fichier n'est réécrit que si au moins un patch a été produit.
+    profile : None, True ou chemin pstats (cf. profile.make_profiler).
+    """
+    prof = _worker_profiler(path, profile)
+    prof.start()
+    cache = ParseCache() if cache_dir is None else ParseCache(cache_dir)
+    # Une lecture (index via le cache), un parcours fusionné, une écriture
+    content, index = load_handler_index(path, cache)
+    memo_dir = MEMO_DIR if cache_dir is None else os.path.join(cache_dir, 'memo')
+    memo = HandlerMemo.for_file(path, memo_dir)
+    edits, reports = run_pipeline(content, index, names, prof, memo=memo)
+    memo.save()
+    journal = None
+    if edits and not dry_run:
+        # Patchs sur disque avant que le fichier ne change (rollback possible)
+        journal = journal_for(path, cache_dir)
+        run_id = journal.begin(content, edits)
+        prof.count('octets écrits', edits.write(content, path))
+        journal.commit(run_id, path)
+        refresh_handler_index(path, cache, index, edits)
+    return {
+        'path': path,
+        'reports': reports,
+        'patches': len(edits),
+        'delta': edits.delta,
+        'journal': journal.path if journal else None,
+        'memo': [memo.hits, memo.misses],
+        'profile': prof.to_json(),
+        'pstats': prof.stop(),
+    }
+
+
+def run(paths, names, jobs=None, dry_run=False, cache_dir=None, profile=None):
+    """
+    Lance run_file sur chaque chemin et génère les résultats au fil de l'eau.
+    Les erreurs d'un fichier sont rapportées sous 'error' sans arrêter les autres.
+    Hors dry-run, chaque résultat porte le hash de son snapshot ('backup').
+    """
+    backups = {} if dry_run else snapshot(paths, cache_dir)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(run_file, path, names, dry_run, cache_dir, profile): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                result = {'path': path, 'error': f'{type(exc).__name__}: {exc}'}
+            result['backup'] = backups.get(path)
+            yield result
+
+
+def rollback(paths, cache_dir=None):
+    """Annule le dernier run journalisé de chaque fichier : [(chemin, run ou JournalError)]"""
+    results = []
+    for path in paths:
+        try:
+            results.append((path, journal_for(path, cache_dir).rollback(path)))
+        except JournalError as exc:
+            results.append((path, exc))
+    return results
+
+
+def merge(results):
+    """Fusionne les rapports par transformation : {nom: {clé: [(path, valeur)]}}"""
+    merged = {}
+    for result in results:
+        for name, report in result.get('reports', {}).items():
+            per_key = merged.setdefault(name, {})
+            for key, values in report.items():
+                per_key.setdefault(key, []).extend((result['path'], v) for v in values)
+    return merged
@@ -0,0 +1,384 @@
+"""
+Découpage de Contrats.tsx en un module par contrat (shard-contrats.py).
+
+Un shard regroupe un handler `handleXxxSubmit` et les formulaires
+`{contractType === '...' && (...)}` qui l'appellent. Il est écrit dans
+<out>/<avocats|notaires>/<Xxx>.tsx :
+
+- le handler est recopié tel quel dans une fabrique
+  `createHandleXxxSubmit({ ...variables du composant })` : le texte
+  `const handleXxxSubmit = async () => {` est conservé, les codemods
+  (HandlerIndex, transforms) s'appliquent donc aussi aux shards ;
+- chaque formulaire devient un composant `XxxForm` dont le corps est
+  l'expression `contractType === '...' && (...)` d'origine (le marqueur reste
+  dans le shard pour FormAnchors et les outils ClientSelector).
+
+Dans Contrats.tsx, le handler devient
+`const handleXxxSubmit = () => createHandleXxxSubmit({ a, b })();` (les
+variables sont lues au moment de l'appel, comme la closure d'origine) et le
+formulaire `<XxxForm {...{ contractType, a, b }} />`.
+
+Les variables passées sont les identifiants du texte déplacé déclarés au
+niveau du composant (ou ses paramètres) ; les imports sont repris de
+Contrats.tsx pour les noms utilisés, chemins relatifs recalculés.
+"""
+
+import os
+import re
+import unicodedata
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+from codemod import lexer
+from codemod.splice import EditList
+
+PROFESSIONS = ('avocats', 'notaires')
+
+_IDENT_RE = re.compile(rb'(?<![\w$.])[A-Za-z_$][\w$]*')
+_DECL_RE = re.compile(
+    rb'\b(?:const|let|var)\s+(?:\[(?P<array>[^\]]*)\]|\{(?P<object>[^}]*)\}|(?P<name>[A-Za-z_$][\w$]*))'
+    rb'|\bfunction\s+(?P<function>[A-Za-z_$][\w$]*)'
+)
+_IMPORT_RE = re.compile(
+    rb'''^import\s+(?P<type>type\s+)?(?P<clause>[^;'"]*?)\s+from\s+(?P<q>['"])(?P<spec>[^'"]+)(?P=q);?[ \t]*$''',
+    re.M,
+)
+# Déclarations de niveau module, pour signaler les helpers non exportés
+_MODULE_DECL_RE = re.compile(rb'^(?:export\s+)?(?:const|let|var|function|class|interface|type|enum)\s+([A-Za-z_$][\w$]*)', re.M)
+_FORM_RE = re.compile(rb'''\{\s*contractType === (['"])(.*?)(?<!\\)\1\s*&&\s*\(''')
+_HANDLER_REF_RE = re.compile(rb'\bhandle\w+Submit\b')
+
+
+@dataclass
+class Form:
+    """Formulaire déplacé : {contractType === name && (...)} en [start, end)"""
+    name: str
+    component: str
+    start: int
+    end: int
+    free: list = field(default_factory=list)
+
+
+@dataclass
+class Shard:
+    """Un module généré : un handler (optionnel) et ses formulaires"""
+    name: str
+    profession: str
+    path: str
+    handler: object = None      # HandlerSpan
+    factory: str = None         # createHandleXxxSubmit
+    free: list = field(default_factory=list)
+    forms: list = field(default_factory=list)
+    imports: list = field(default_factory=list)
+    unresolved: list = field(default_factory=list)   # helpers de Contrats.tsx non exportés
+
+
+def slug(text):
+    """"Bail d'habitation vide" -> 'BailDHabitationVide'"""
+    ascii_text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    words = re.findall(r'[A-Za-z0-9]+', ascii_text)
+    name = ''.join(word[:1].upper() + word[1:] for word in words)
+    return name if name[:1].isalpha() else f'Contrat{name}'
+
+
+def _identifiers(buf, start, end):
+    return {m.group().decode('ascii') for m in _IDENT_RE.finditer(buf, start, end)}
+
+
+def _pattern_names(text):
+    """Noms liés par un motif `a, b: c, ...d = 1` (déstructuration à un niveau)"""
+    names = []
+    for item in text.decode('utf-8').split(','):
+        item = item.split('=')[0].strip().lstrip('.')
+        if ':' in item:
+            item = item.split(':')[1].strip()
+        if re.fullmatch(r'[A-Za-z_$][\w$]*', item):
+            names.append(item)
+    return names
+
+
+def _component(scanned, index):
+    """(ouvrant, fermant) des accolades du composant qui contient les handlers"""
+    first = index.spans[0]
+    best = None
+    for open_pos, close_pos in scanned.pairs.items():
+        if open_pos < first.start and close_pos >= first.end and (best is None or open_pos > best[0]):
+            best = (open_pos, close_pos)
+    return best
+
+
+def _outermost(scanned, start, end):
+    """Paires de scanned strictement dans (start, end), non imbriquées : [(ouvrant, fermant)]"""
+    inner = sorted((o, c) for o, c in scanned.pairs.items() if start < o and c < end)
+    outer = []
+    for o, c in inner:
+        if outer and o < outer[-1][1]:
+            continue
+        outer.append((o, c))
+    return outer
+
+
+def component_scope(content, scanned, body):
+    """Noms déclarés au niveau du composant (hors blocs imbriqués) et ses paramètres"""
+    start, end = body
+    nested = _outermost(scanned, start, end)
+    nested_starts = [o for o, _ in nested]
+    names = set()
+    for m in _DECL_RE.finditer(content, start + 1, end):
+        i = bisect_right(nested_starts, m.start()) - 1
+        if i >= 0 and m.start() < nested[i][1]:
+            continue
+        if m.group('name') or m.group('function'):
+            names.add((m.group('name') or m.group('function')).decode('ascii'))
+        else:
+            names.update(_pattern_names(m.group('array') or m.group('object')))
+    # Paramètres : la dernière paire de parenthèses avant le corps
+    params = max(
+        ((o, c) for o, c in scanned.pairs.items() if c < start and content[o:o + 1] == b'('),
+        default=None, key=lambda pair: pair[1],
+    )
+    if params is not None and not content[params[1] + 1:start].strip(b' \t\r\n:=>').strip():
+        names.update(_identifiers(content, params[0] + 1, params[1]))
+    return names
+
+
+def parse_imports(content):
+    """{nom local: (spec, type, forme)} ; forme : 'default', '*' ou le nom importé"""
+    imports = {}
+    for m in _IMPORT_RE.finditer(content):
+        spec = m.group('spec').decode('utf-8')
+        is_type = bool(m.group('type'))
+        clause = m.group('clause').decode('utf-8').strip()
+        named = re.search(r'\{(.*)\}', clause, re.S)
+        rest = re.sub(r'\{.*\}', '', clause, flags=re.S)
+        for part in rest.split(','):
+            part = part.strip()
+            if part.startswith('*'):
+                imports[part.split()[-1]] = (spec, is_type, '*')
+            elif part:
+                imports[part] = (spec, is_type, 'default')
+        if named:
+            for item in named.group(1).split(','):
+                item = item.strip()
+                item_type = item.startswith('type ')
+                item = item[5:].strip() if item_type else item
+                if not item:
+                    continue
+                imported, _, local = item.partition(' as ')
+                imports[(local or imported).strip()] = (spec, is_type or item_type, imported.strip())
+    return imports
+
+
+def _relative(spec, source_dir, module_dir):
+    if not spec.startswith('.'):
+        return spec
+    target = os.path.normpath(os.path.join(source_dir, spec))
+    rel = os.path.relpath(target, module_dir).replace(os.sep, '/')
+    return rel if rel.startswith('.') else f'./{rel}'
+
+
+def render_imports(names, imports, source_dir, module_dir):
+    """Lignes `import ... from '...'` pour les noms utilisés, groupées par module"""
+    by_spec = {}
+    for name in sorted(names):
+        if name in imports:
+            spec, is_type, form = imports[name]
+            by_spec.setdefault(spec, []).append((name, is_type, form))
+    lines = []
+    for spec, items in by_spec.items():
+        parts = []
+        for name, is_type, form in items:
+            if form == 'default':
+                parts.insert(0, name)
+            elif form == '*':
+                parts.append(f'* as {name}')
+        named = [
+            ('type ' if is_type else '') + (form if form == name else f'{form} as {name}')
+            for name, is_type, form in items if form not in ('default', '*')
+        ]
+        if named:
+            parts.append('{ ' + ', '.join(named) + ' }')
+        lines.append(f"import {', '.join(parts)} from '{_relative(spec, source_dir, module_dir)}';")
+    return lines
+
+
+def find_forms(content, scanned):
+    """Formulaires {contractType === '...' && (...)} de premier niveau : [(nom, start, end)]"""
+    forms = []
+    for m in _FORM_RE.finditer(content):
+        end = scanned.close_of(m.start())
+        if end is None or (forms and m.start() < forms[-1][2]):
+            continue
+        name = m.group(2).decode('utf-8').replace("\\'", "'").replace('\\"', '"')
+        forms.append((name, m.start(), end))
+    return forms
+
+
+def plan(content, index, source_path, out_dir, notaires=()):
+    """Shards de content (bytes) ; retourne (shards, portée du composant)"""
+    scanned = lexer.scan(content)
+    body = _component(scanned, index) if len(index) else None
+    if body is None:
+        return [], set()
+    scope = component_scope(content, scanned, body)
+    imports = parse_imports(content)
+    module_level = {
+        m.group(1).decode('ascii') for m in _MODULE_DECL_RE.finditer(content)
+        if not body[0] < m.start() < body[1]
+    }
+    source_dir = os.path.dirname(source_path)
+
+    shards = {}
+    for span in index:
+        if index.get(span.name) is not span or not (body[0] < span.start < body[1]):
+            continue
+        name = span.name[len('handle'):-len('Submit')] or span.name
+        shards[span.name] = Shard(
+            name=name, profession='avocats', path=None, handler=span,
+            factory=f'create{span.name[0].upper()}{span.name[1:]}',
+        )
+    components = set()
+    for form_name, start, end in find_forms(content, scanned):
+        if not (body[0] < start < body[1]):
+            continue
+        refs = [r.decode('ascii') for r in _HANDLER_REF_RE.findall(content, start, end)]
+        owner = next((shards[r] for r in refs if r in shards), None)
+        if owner is None:
+            key = f'form:{form_name}'
+            owner = shards.get(key) or shards.setdefault(
+                key, Shard(name=slug(form_name), profession='avocats', path=None)
+            )
+        component = f'{slug(form_name)}Form'
+        while component in components:
+            component += '_'
+        components.add(component)
+        owner.forms.append(Form(form_name, component, start, end))
+        if form_name in notaires:
+            owner.profession = 'notaires'
+
+    used_paths = set()
+    for shard in shards.values():
+        module_dir = os.path.join(out_dir, shard.profession)
+        path = os.path.join(module_dir, f'{shard.name}.tsx')
+        while path in used_paths:
+            path = path[:-4] + '_.tsx'
+        used_paths.add(path)
+        shard.path = path
+        names = set()
+        if shard.handler is not None:
+            span = shard.handler
+            used = _identifiers(content, span.start, span.end)
+            shard.free = sorted((used & scope) - {span.name})
+            names |= used
+        for form in shard.forms:
+            used = _identifiers(content, form.start + 1, form.end - 1)
+            form.free = sorted(used & scope)
+            names |= used
+        shard.imports = render_imports(names - scope, imports, source_dir, module_dir)
+        shard.unresolved = sorted((names & module_level) - scope - set(imports))
+    return list(shards.values()), scope
+
+
+def _destructure(names):
+    return '{ ' + ', '.join(names) + ' }' if names else '{}'
+
+
+def render_module(content, shard, source_path):
+    """Contenu (str) du module d'un shard"""
+    out = [f'// Extrait de {source_path} par scripts/shard-contrats.py']
+    out += shard.imports
+    if shard.handler is not None:
+        span = shard.handler
+        handler = content[span.start:span.end].decode('utf-8')
+        out += [
+            '',
+            f'export const {shard.factory} = ({_destructure(shard.free)}: any) => {{',
+            f'  {handler};',
+            f'  return {span.name};',
+            '};',
+        ]
+    for form in shard.forms:
+        expression = content[form.start + 1:form.end - 1].decode('utf-8')
+        out += [
+            '',
+            f'export function {form.component}({_destructure(form.free)}: any) {{',
+            f'  return ({expression});',
+            '}',
+        ]
+    return '\n'.join(out) + '\n'
+
+
+def rewrite_source(content, shards, source_path):
+    """EditList de Contrats.tsx : appels aux shards et imports ajoutés après le dernier import"""
+    edits = EditList()
+    source_dir = os.path.dirname(source_path)
+    imports = []
+    for shard in shards:
+        spec = os.path.relpath(shard.path[:-4], source_dir).replace(os.sep, '/')
+        spec = spec if spec.startswith('.') else f'./{spec}'
+        exported = ([shard.factory] if shard.handler is not None else []) + [f.component for f in shard.forms]
+        imports.append(f"import {{ {', '.join(exported)} }} from '{spec}';")
+        if shard.handler is not None:
+            span = shard.handler
+            call = (f'const {span.name} = () => '
+                    f'{shard.factory}({_destructure(shard.free)})()')
+            edits.replace(span.start, span.end, call.encode('utf-8'), shard.name)
+        for form in shard.forms:
+            element = f'<{form.component} {{...{_destructure(form.free)}}} />'
+            edits.replace(form.start, form.end, element.encode('utf-8'), shard.name)
+    last_import = None
+    for last_import in _IMPORT_RE.finditer(content):
+        pass
+    at = last_import.end() if last_import is not None else 0
+    edits.insert(at, ('\n' if at else '').encode('utf-8') + '\n'.join(imports).encode('utf-8')
+                 + (b'' if at else b'\n'), 'imports')
+    return edits
+
+
+def verify(content, new_content, shards, modules):
+    """Rapport de vérification : {'ok', 'source', 'shards': [...]}"""
+    before = lexer.scan(content).errors
+    after = lexer.scan(new_content).errors
+    report = {
+        'source': {
+            'lines_before': content.count(b'\n') + 1,
+            'lines_after': new_content.count(b'\n') + 1,
+            'lexer_errors_before': len(before),
+            'lexer_errors_after': [[offset, message] for offset, message in after],
+        },
+        'shards': [],
+    }
+    ok = len(after) <= len(before)
+    for shard in shards:
+        module = modules[shard.path].encode('utf-8')
+        errors = lexer.scan(module).errors
+        moved = []
+        if shard.handler is not None:
+            moved.append(content[shard.handler.start:shard.handler.end])
+        moved += [content[f.start + 1:f.end - 1] for f in shard.forms]
+        verbatim = all(text in module for text in moved)
+        wired = (shard.handler is None or f'{shard.factory}('.encode('utf-8') in new_content) and all(
+            f'<{f.component} '.encode('utf-8') in new_content for f in shard.forms
+        )
+        shard_ok = not errors and verbatim and wired and not shard.unresolved
+        ok = ok and shard_ok
+        report['shards'].append({
+            'path': shard.path,
+            'profession': shard.profession,
+            'handler': shard.handler.name if shard.handler is not None else None,
+            'forms': [f.name for f in shard.forms],
+            'variables': len(set(shard.free).union(*(f.free for f in shard.forms))),
+            'imports': len(shard.imports),
+            'lines': module.count(b'\n'),
+            'lexer_errors': [[offset, message] for offset, message in errors],
+            'unresolved': shard.unresolved,
+            'verbatim': verbatim,
+            'wired': wired,
+            'ok': shard_ok,
+        })
+    # Imports de Contrats.tsx qui ne servaient qu'au code déplacé
+    code = _IMPORT_RE.sub(b'', new_content)
+    used = _identifiers(code, 0, len(code))
+    report['source']['unused_imports'] = sorted(set(parse_imports(new_content)) - used)
+    report['ok'] = ok
+    return report
@@ -0,0 +1,97 @@
+"""
+Moteur de patchs : toutes les modifications d'un run sont collectées sous la
+forme (start, end, replacement) par rapport au buffer ORIGINAL, vérifiées
+(aucun chevauchement) puis appliquées en une seule reconstruction.
+"""
+
+import os
+from dataclasses import dataclass
+
+
+class PatchConflict(ValueError):
+    """Deux patchs se chevauchent"""
+
+
+@dataclass(frozen=True)
+class Patch:
+    start: int
+    end: int
+    replacement: bytes
+    label: str = ''
+
+    @property
+    def delta(self):
+        return len(self.replacement) - (self.end - self.start)
+
+
+class EditList:
+    """Liste de patchs non chevauchants sur un même buffer"""
+
+    def __init__(self):
+        self.patches = []
+
+    def __len__(self):
+        return len(self.patches)
+
+    def replace(self, start, end, replacement, label=''):
+        if not 0 <= start <= end:
+            raise ValueError(f'span invalide: {start}-{end}')
+        self.patches.append(Patch(start, end, replacement, label))
+
+    def insert(self, pos, text, label=''):
+        self.replace(pos, pos, text, label)
+
+    @property
+    def delta(self):
+        """Différence de taille entre le résultat et l'original"""
+        return sum(p.delta for p in self.patches)
+
+    def sorted(self):
+        """
+        Patchs triés par position, après vérification des conflits.
+        Plusieurs insertions au même offset gardent leur ordre d'ajout et
+        passent avant un remplacement qui commence au même offset.
+        """
+        ordered = sorted(self.patches, key=lambda p: (p.start, p.end))
+        reach, owner = -1, None
+        for patch in ordered:
+            if patch.start < reach:
+                raise PatchConflict(
+                    f"patch '{patch.label}' ({patch.start}-{patch.end}) chevauche "
+                    f"'{owner.label}' ({owner.start}-{owner.end})"
+                )
+            if patch.end > reach:
+                reach, owner = patch.end, patch
+        return ordered
+
+    def _pieces(self, buf):
+        view = memoryview(buf)
+        prev = 0
+        for patch in self.sorted():
+            yield view[prev:patch.start]
+            yield patch.replacement
+            prev = patch.end
+        yield view[prev:]
+
+    def apply(self, buf):
+        """Retourne le nouveau contenu (un seul join)"""
+        if not self.patches:
+            return bytes(buf)
+        return b''.join(self._pieces(buf))
+
+    def write(self, buf, path, guard=None):
+        """
+        Écrit le résultat en streaming dans path (via un fichier temporaire).
+        guard : appelée juste avant os.replace ; si elle retourne faux, le
+        fichier temporaire est supprimé, path reste intact et on retourne None.
+        """
+        pieces = self._pieces(buf) if self.patches else iter([buf])
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            for piece in pieces:
+                f.write(piece)
+        if guard is not None and not guard():
+            os.remove(tmp_path)
+            return None
+        os.replace(tmp_path, path)
+        return len(buf) + self.delta
@@ -0,0 +1,170 @@
+"""
+Tables partagées par les codemods (handlers, correctifs, formulaires).
+
+Déplacées depuis integrate-ai-safe.py, fix-getclientinfo-null.py et
+add-clientselector-notaires.py pour que run-codemods.py puisse les utiliser.
+"""
+
+# Mapping: handler -> (contractType, exemple de champ client)
+HANDLERS_CONFIG = {
+    # NOTAIRES
+    'handleCompromisVenteSubmit': 'Compromis de vente',
+    'handleActeVenteSubmit': 'Acte de vente',
+    'handleBailHabitationSubmit': 'Bail habitation',
+    'handleBailCommercialSubmit': 'Bail commercial',
+    'handleIndivisionSubmit': 'Indivision',
+    'handleMainleveeSubmit': 'Mainlevée',
+    'handleContratMariageSubmit': 'Contrat de mariage',
+    'handlePacsSubmit': 'PACS',
+    'handleDonationEntreEpouxSubmit': 'Donation entre époux',
+    'handleDonationSimpleSubmit': 'Donation simple',
+    'handleTestamentSubmit': 'Testament authentique',
+    'handleChangementRegimeSubmit': 'Changement de régime matrimonial',
+    'handleSuccessionSubmit': 'Succession',
+    'handleActeNotorieteSubmit': 'Acte de notoriété',
+    'handlePartageSuccessoralSubmit': 'Partage successoral',
+    'handleProcurationSubmit': 'Procuration',
+    'handleMandatProtectionSubmit': 'Mandat de protection future',
+    'handleAttestationSubmit': 'Attestation',
+    'handleQuitusDetteSubmit': 'Quitus de dette',
+    'handleCessionPartsSubmit': 'Cession de parts',
+    
+    # AVOCATS
+    'handleGenericContractSubmit': 'Contrat de prestation de services',
+    'handleCGUSubmit': 'CGU',
+    'handleAgenceCommercialeSubmit': 'Agence commerciale',
+    'handleNDASubmit': 'NDA',
+    'handleMiseEnDemeureSubmit': 'Mise en demeure',
+    'handlePacteConcubinageSubmit': 'Pacte de concubinage',
+    'handleConventionParentaleSubmit': 'Convention parentale',
+    'handleReconnaissanceDetteSubmit': 'Reconnaissance de dette',
+    'handleMandatProtectionSousSeingSubmit': 'Mandat de protection sous seing privé',
+    'handleTestamentOlographeSubmit': 'Testament olographe',
+}
+
+# Handlers à ne PAS toucher (déjà intégrés)
+SKIP = ['handleDevWebAppSubmit', 'handleCessionDroitsAuteurSubmit', 'handleLicenceLogicielleSubmit', 'handleMentionsLegalesSubmit', 'handleEtatLieuxSubmit']
+
+# Liste des replacements à faire (déjà fixés: Cession parts, Attestation, Questionnaire)
+GETCLIENTINFO_FIXES = [
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Bail habitation",',
+        "new": '      const clientInfo = getClientInfo(bailHabitationData.bailleurClientId || bailHabitationData.locataireClientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Bail habitation",'
+    },
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Bail commercial",',
+        "new": '      const clientInfo = getClientInfo(bailCommercialData.bailleurClientId || bailCommercialData.locataireClientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Bail commercial",'
+    },
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Convention d\'indivision",',
+        "new": '      const clientInfo = getClientInfo(indivisionData.indivisaires?.find(i => i.clientId)?.clientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Convention d\'indivision",'
+    },
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Acte de mainlevée",',
+        "new": '      const clientInfo = getClientInfo(mainleveeData.debiteurs?.find(d => d.clientId)?.clientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Acte de mainlevée",'
+    },
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Contrat de mariage",',
+        "new": '      const clientInfo = getClientInfo(contratMariageData.epoux?.[0]?.clientId || contratMariageData.epoux?.[1]?.clientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Contrat de mariage",'
+    },
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Pacte civil de solidarité (PACS)",',
+        "new": '      const clientInfo = getClientInfo(pacsData.partenaires?.[0]?.clientId || pacsData.partenaires?.[1]?.clientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Pacte civil de solidarité (PACS)",'
+    },
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Donation entre époux",',
+        "new": '      const clientInfo = getClientInfo(donationEntreEpouxData.epoux?.[0]?.clientId || donationEntreEpouxData.epoux?.[1]?.clientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Donation entre époux",'
+    },
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Donation simple",',
+        "new": '      const clientInfo = getClientInfo(donationSimpleData.donateur?.clientId || donationSimpleData.donataire?.clientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Donation simple",'
+    },
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Testament",',
+        "new": '      const clientInfo = getClientInfo(testamentData.clientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Testament",'
+    },
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Déclaration de succession",',
+        "new": '      const clientInfo = getClientInfo(successionData.defuntClientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Déclaration de succession",'
+    },
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Acte de notoriété",',
+        "new": '      const clientInfo = getClientInfo(acteNotorieteData.defuntClientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Acte de notoriété",'
+    },
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Acte de partage successoral",',
+        "new": '      const clientInfo = getClientInfo(partageSuccessoralData.defuntClientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Acte de partage successoral",'
+    },
+    {
+        "old": '      const clientInfo = getClientInfo(null, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Contrat de licence de logiciel",',
+        "new": '      const clientInfo = getClientInfo(licenceLogicielleData.licencieClientId, clients);\n      const generatedContract = await generateContractWithAI({\n        contractType: "Contrat de licence de logiciel",'
+    },
+]
+
+# Liste des contrats notaires sans ClientSelector (selon l'analyse du subagent)
+CLIENTSELECTOR_FORMS = [
+    {
+        "name": "Convention d'indivision",
+        "client_field": "clientId"  # Nom du champ dans questionnaireData
+    },
+    {
+        "name": "Mainlevée d'hypothèque",
+        "client_field": "clientId"
+    },
+    {
+        "name": "Contrat de mariage (régimes matrimoniaux)",
+        "client_field": "clientId"
+    },
+    {
+        "name": "PACS (convention + enregistrement)",
+        "client_field": "clientId"
+    },
+    {
+        "name": "Donation entre époux",
+        "client_field": "donateurClientId"  # Spécifique: il y a donateur ET donataire
+    },
+    {
+        "name": "Donation simple (parent → enfant, etc.)",
+        "client_field": "donateurClientId"
+    },
+    {
+        "name": "Testament authentique ou mystique",
+        "client_field": "testateurClientId"
+    },
+    {
+        "name": "Changement de régime matrimonial",
+        "client_field": "epoux1ClientId"  # Il y a epoux1 et epoux2
+    },
+    {
+        "name": "Déclaration de succession",
+        "client_field": "defuntClientId"  # Le défunt peut être un client
+    },
+    {
+        "name": "Acte de notoriété",
+        "client_field": "defuntClientId"
+    },
+    {
+        "name": "Partage successoral",
+        "client_field": "defuntClientId"
+    },
+    {
+        "name": "Procuration authentique",
+        "client_field": "mandantClientId"  # Mandant = celui qui donne procuration
+    },
+    {
+        "name": "Mandat de protection future",
+        "client_field": "mandantClientId"
+    },
+    {
+        "name": "Attestation de propriété immobilière",
+        "client_field": "proprietaireClientId"
+    },
+    {
+        "name": "Quitus / reconnaissance de dette",
+        "client_field": "debiteurClientId"  # Débiteur = celui qui doit
+    },
+    {
+        "name": "Acte de cession de parts sociales",
+        "client_field": "cedantClientId"  # Cédant = celui qui cède
+    },
+]
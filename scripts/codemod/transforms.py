@@ -0,0 +1,256 @@
+"""
+Transformations enregistrées, appliquées fichier par fichier par run-codemods.py.
+
+Une transformation reçoit (content, index, edits, prof) — contenu (bytes ou
+PieceTable), son HandlerIndex, l'EditList du fichier et le profiler (cf.
+profile.py) — ajoute ses patchs à edits et retourne un rapport (dict sérialisable, remonté
+du worker au processus principal).
+"""
+
+import re
+
+from codemod.memo import digest
+from codemod.multireplace import MultiReplacer
+from codemod.profile import NULL_PROFILER
+from codemod.tables import CLIENTSELECTOR_FORMS, GETCLIENTINFO_FIXES, HANDLERS_CONFIG, SKIP
+
+
+def apply_ai_to_handler(content, index, edits, handler_name, contract_type, prof=NULL_PROFILER):
+    """
+    Ajoute à edits les patchs du pattern AI pour un handler (content en bytes)
+    Retourne True, ou None si échec
+    """
+
+    with prof.phase(handler_name, 'locate'):
+        span = index.get(handler_name)
+        if span is None or not span.has_insert:
+            return None
+
+        # Vérifier si déjà intégré (dans le corps exact du handler)
+        if content.find(b'generateContractWithAI', span.start, span.end) != -1:
+            return None  # Déjà intégré
+
+    insert_start, insert_end = span.insert_start, span.insert_end
+
+    with prof.phase(handler_name, 'splice'):
+        # Code AI à insérer AVANT le .insert()
+        ai_code = f'''
+      // Génération du contrat par l'IA
+      toast.info("Génération du contrat par l'IA...");
+      const clientInfo = getClientInfo(null, clients); // Sera adapté selon le handler
+      const generatedContract = await generateContractWithAI({{
+        contractType: "{contract_type}",
+        formData: {{ /* données du formulaire */ }},
+        clientInfo,
+        user
+      }});
+
+      '''.encode('utf-8')
+
+        insert_block = content[insert_start:insert_end]
+        prof.count('octets copiés', len(insert_block))
+
+        # Remplacer content: "..." ou description: "..." par content: generatedContract
+        modified_insert = re.sub(
+            rb'(content|description):\s*["\'][^"\']*["\']',
+            b'content: generatedContract',
+            insert_block,
+            count=1
+        )
+        prof.count('appels regex')
+
+        # Si pas de content/description, on cherche juste après role: et on ajoute
+        if modified_insert == insert_block:
+            # Pas de content trouvé, on l'ajoute après role:
+            modified_insert = re.sub(
+                rb'(role:\s*role,)',
+                rb'\1\n          content: generatedContract,',
+                insert_block,
+                count=1
+            )
+            prof.count('appels regex')
+
+    with prof.phase(handler_name, 'rewrite'):
+        # Insérer le code AI avant le .insert() et remplacer le bloc insert
+        edits.insert(insert_start, ai_code, handler_name)
+        if modified_insert != insert_block:
+            edits.replace(insert_start, insert_end, modified_insert, handler_name)
+            prof.count('octets copiés', len(modified_insert))
+
+    return True
+
+
+class Transform:
+    """Visiteur de base : toutes les méthodes de visite sont optionnelles"""
+
+    name = None
+    after = ()
+    # Le driver ne cherche les formulaires JSX que si un visiteur les demande
+    visits_jsx = False
+    memoize = False
+    version = 1
+    salt = ''
+
+    def __init__(self, content, index, edits, prof=NULL_PROFILER):
+        self.content = content
+        self.index = index
+        self.edits = edits
+        self.prof = prof
+
+    def handler(self, span, visited):
+        """span : HandlerSpan ; visited : {nom de transformation: résultat} sur ce span"""
+
+    def replayed(self, span, result, labels):
+        """handler() rejoué depuis le mémo : mettre à jour le rapport"""
+
+    def between(self, start, end):
+        """Région start-end hors des spans de handlers visités (avant, entre, après eux)"""
+
+    def section(self, name, start, lineno):
+        """Début du formulaire `contractType === name` (offset, ligne 1-based)"""
+
+    def select(self, tag, start, end, lineno):
+        """Élément `<Select>` (start-end) ou `<ClientSelector` (start == end)"""
+
+    def finish(self, last_lineno):
+        """Fin du parcours (dernière ligne du fichier) ; retourne le rapport"""
+        return {}
+
+
+class IntegrateAI(Transform):
+    """Pattern AI sur chaque handler de HANDLERS_CONFIG présent dans le fichier"""
+
+    name = 'ai'
+    memoize = True
+    salt = digest(HANDLERS_CONFIG, SKIP)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.modified = []
+
+    def handler(self, span, visited):
+        contract_type = HANDLERS_CONFIG.get(span.name)
+        # Doublon d'un nom : seule la première définition est traitée (cf. HandlerIndex)
+        if contract_type is None or span.name in SKIP or self.index.get(span.name) is not span:
+            return False
+        ok = apply_ai_to_handler(
+            self.content, self.index, self.edits, span.name, contract_type, self.prof
+        )
+        if ok:
+            self.modified.append(span.name)
+        return bool(ok)
+
+    def replayed(self, span, result, labels):
+        if result:
+            self.modified.append(span.name)
+
+    def finish(self, last_lineno):
+        return {'modified': self.modified}
+
+
+def _fix_label(fix):
+    return fix['new'].split('contractType:')[1].split(',')[0].strip()
+
+
+_FIX_LABELS = {fix['old'].encode('utf-8'): _fix_label(fix) for fix in GETCLIENTINFO_FIXES}
+_FIX_REPLACER = MultiReplacer(
+    (fix['old'].encode('utf-8'), fix['new'].encode('utf-8')) for fix in GETCLIENTINFO_FIXES
+)
+
+
+class FixGetClientInfo(Transform):
+    """
+    getClientInfo(null, clients) -> clientId du formulaire (GETCLIENTINFO_FIXES),
+    dans tout le fichier comme str.replace : les handlers passent par le mémo,
+    le reste par between() (occurrences listées dans le rapport 'outside').
+    """
+
+    name = 'getclientinfo'
+    # Un handler que l'IA vient d'intégrer n'a pas encore de clientId à corriger
+    after = ('ai',)
+    memoize = True
+    salt = digest(GETCLIENTINFO_FIXES)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fixed = []
+        self.outside = []
+
+    def _fix(self, start, end):
+        """Patchs des aiguilles entre start et end ; retourne les libellés"""
+        labels = []
+        for match_start, match_end, old in _FIX_REPLACER.finditer(self.content, start, end):
+            self.edits.replace(match_start, match_end, _FIX_REPLACER.replacements[old], _FIX_LABELS[old])
+            labels.append(_FIX_LABELS[old])
+        self.prof.count('appels regex')
+        return labels
+
+    def handler(self, span, visited):
+        if visited.get('ai'):
+            return False
+        with self.prof.phase(span.name, 'splice'):
+            labels = self._fix(span.start, span.end)
+        self.fixed.extend(labels)
+        return bool(labels)
+
+    def replayed(self, span, result, labels):
+        self.fixed.extend(labels)
+
+    def between(self, start, end):
+        labels = self._fix(start, end)
+        self.fixed.extend(labels)
+        self.outside.extend(labels)
+
+    def finish(self, last_lineno):
+        return {'fixed': self.fixed, 'outside': self.outside}
+
+
+class ReportClientSelector(Transform):
+    """
+    Formulaires de CLIENTSELECTOR_FORMS présents sans ClientSelector.
+    Pas de patch : l'insertion reste manuelle (cf. add-clientselector-notaires.py).
+    """
+
+    name = 'clientselector'
+    visits_jsx = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wanted = {form['name']: form['client_field'] for form in CLIENTSELECTOR_FORMS}
+        self.missing = []
+        self.current = None  # [nom, ligne de début, ClientSelector vu, Select clients vus]
+
+    def _close(self, end_lineno):
+        if self.current is None:
+            return
+        name, start, has_selector, selects = self.current
+        self.current = None
+        if not has_selector:
+            self.missing.append(
+                f"{name} (l. {start}-{end_lineno}, questionnaireData.{self.wanted[name]}, "
+                f"{selects} Select clients)"
+            )
+
+    def section(self, name, start, lineno):
+        self._close(lineno - 1)
+        if name in self.wanted:
+            self.current = [name, lineno, False, 0]
+
+    def select(self, tag, start, end, lineno):
+        if self.current is None:
+            return
+        if tag == 'ClientSelector':
+            self.current[2] = True
+        elif self.content.find(b'clients.map(', start, end) != -1:
+            self.current[3] += 1
+
+    def finish(self, last_lineno):
+        self._close(last_lineno)
+        return {'missing': self.missing}
+
+
+# Ordre par défaut ; les contraintes `after` sont appliquées par pipeline.order()
+TRANSFORMS = {
+    transform.name: transform
+    for transform in (IntegrateAI, FixGetClientInfo, ReportClientSelector)
+}
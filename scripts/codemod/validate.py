@@ -0,0 +1,142 @@
+"""
+Validation rapide après le moteur de patchs, avant toute écriture.
+
+Au lieu d'un `tsc`/build Vite sur tout Contrats.tsx, seules les régions
+touchées sont re-lexées (lexer.scan : accolades, parenthèses, crochets,
+balises JSX, template literals) : le handler qui contient chaque patch, sinon
+l'élément JSX le plus interne qui le contient, sinon le fichier entier. Le
+contenu modifié d'une région est reconstruit à partir de l'original et des
+patchs, sans matérialiser le fichier.
+
+Les erreurs déjà présentes avant les patchs ne sont pas signalées (le lexer
+est minimal : on ne reproche aux codemods que ce qu'ils ont cassé) ; dans une
+région déjà invalide, seules les erreurs en plus, par type, le sont.
+"""
+
+import re
+from bisect import bisect_right
+from collections import Counter
+
+from codemod import lexer
+from codemod.piecetable import PieceTable
+
+
+class ValidationError(ValueError):
+    """Patchs qui cassent l'équilibre lexical d'une région ; errors : [(offset, région, message)]"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        lines = [f"{len(errors)} erreur(s) lexicale(s) après patchs :"]
+        lines += [f"  offset {offset} ({region}) : {message}" for offset, region, message in errors]
+        super().__init__('\n'.join(lines))
+
+
+def _innermost(elements, start, end):
+    """
+    Plus petit élément JSX (start, end, nom) contenant [start, end) ; une
+    insertion au bord d'un élément appartient à son parent.
+    """
+    best = None
+    for e_start, e_end, name in elements:
+        inside = e_start < start < e_end if start == end else e_start <= start and start < e_end
+        if inside and end <= e_end:
+            if best is None or e_end - e_start < best[1] - best[0]:
+                best = (e_start, e_end, name)
+    return best
+
+
+def touched_regions(buf, patches, index=None):
+    """
+    Régions [(start, end, nom)] de buf (contenu AVANT patchs) qui contiennent
+    les patches, fusionnées et triées. index : HandlerIndex de buf (optionnel).
+    """
+    spans = list(index) if index is not None else []
+    starts = [span.start for span in spans]
+    elements = None
+    regions = []
+    for patch in patches:
+        i = bisect_right(starts, patch.start) - 1
+        if i >= 0 and patch.end <= spans[i].end and patch.start < spans[i].end:
+            span = spans[i]
+            regions.append((span.start, span.end, span.name))
+            continue
+        if elements is None:
+            whole = bytes(buf) if isinstance(buf, PieceTable) else buf
+            elements = lexer.scan(whole).elements
+        element = _innermost(elements, patch.start, patch.end)
+        if element is None:
+            return [(0, len(buf), 'fichier')]
+        regions.append((element[0], element[1], f"<{element[2].decode('utf-8', 'replace')}>"))
+
+    regions.sort()
+    merged = []
+    for region in regions:
+        if merged and region[0] < merged[-1][1]:
+            last = merged[-1]
+            if region[1] > last[1]:
+                merged[-1] = (last[0], region[1], f'{last[2]}+{region[2]}')
+            continue
+        merged.append(region)
+    # Un patch à cheval sur une limite de région : le fichier entier
+    for patch in patches:
+        for start, end, _ in merged:
+            if patch.start < end and patch.end > start and not (start <= patch.start and patch.end <= end):
+                return [(0, len(buf), 'fichier')]
+    return merged
+
+
+def _patched(buf, patches, start, end):
+    """buf[start:end] avec les patchs de la région appliqués"""
+    pieces = []
+    prev = start
+    for patch in patches:
+        pieces.append(bytes(buf[prev:patch.start]))
+        pieces.append(patch.replacement)
+        prev = patch.end
+    pieces.append(bytes(buf[prev:end]))
+    return b''.join(pieces)
+
+
+_OFFSETS = re.compile(r'\d+')
+
+
+def _new_errors(before, after):
+    """Erreurs de after en surnombre par rapport à before, par type (message sans offsets)"""
+    remaining = Counter(_OFFSETS.sub('', message) for _, message in before)
+    new = []
+    for offset, message in after:
+        kind = _OFFSETS.sub('', message)
+        if remaining[kind]:
+            remaining[kind] -= 1
+        else:
+            new.append((offset, message))
+    return new
+
+
+def check(buf, edits, index=None):
+    """
+    Vérifie l'équilibre lexical des régions touchées par edits (EditList en
+    coordonnées de buf : bytes, mmap ou PieceTable). Lève ValidationError avec
+    les offsets dans le contenu modifié ; retourne le nombre d'octets re-lexés.
+    """
+    patches = edits.sorted()
+    if not patches:
+        return 0
+    errors = []
+    scanned = 0
+    for start, end, name in touched_regions(buf, patches, index):
+        inside = [p for p in patches if start <= p.start and p.end <= end and (p.start < end or end == len(buf))]
+        new_start = start + sum(p.delta for p in patches if p.start < start)
+        region = _patched(buf, inside, start, end)
+        scanned += len(region)
+        found = lexer.scan(region).errors
+        if found:
+            found = _new_errors(lexer.scan(bytes(buf[start:end])).errors, found)
+        if not found:
+            continue
+        labels = ', '.join(sorted({p.label for p in inside if p.label}))
+        where = f'{name}, patchs {labels}' if labels else name
+        errors.extend((new_start + offset, where, message) for offset, message in found)
+    if errors:
+        raise ValidationError(errors)
+    return scanned
@@ -0,0 +1,189 @@
+"""
+Mode watch de run-codemods.py : les fichiers restent indexés en mémoire et
+seuls ceux qui changent sont relus, réindexés puis passés au pipeline.
+
+Le réveil se fait par inotify si le paquet optionnel inotify_simple est
+installé (Linux), sinon par scrutation des mtimes toutes les `interval`
+secondes. Dans les deux cas, un changement est détecté par (mtime, taille) :
+nos propres écritures sont enregistrées et ne redéclenchent rien.
+
+Avant d'écrire, le fichier est sauvegardé (store de backups) et les patchs
+journalisés, comme dans runner.py ; l'écriture passe par EditList.write
+(fichier temporaire + os.replace). Le fichier est re-stat juste avant
+os.replace : si l'éditeur l'a réécrit depuis sa lecture, le fichier
+temporaire est jeté et le changement sera traité au tour suivant.
+
+Avec inotify, les dossiers créés pendant la surveillance (IN_CREATE|IN_ISDIR)
+sont ajoutés aux watches, avec leurs sous-dossiers.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+
+from codemod.backup import BackupStore
+from codemod.cache import ParseCache, load_handler_index
+from codemod.index import HandlerIndex
+from codemod.memo import HandlerMemo
+from codemod.pipeline import jsx_events, run_pipeline
+from codemod.runner import expand, journal_for
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # dépendance optionnelle : scrutation des mtimes
+    INotify = None
+
+
+@dataclass
+class FileState:
+    """Contenu et index en mémoire d'un fichier surveillé"""
+    key: tuple          # (mtime_ns, taille) au moment de la lecture / écriture
+    content: bytes
+    index: HandlerIndex
+    jsx: list           # événements de pipeline.jsx_events(content)
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+class Watcher:
+    """Garde l'état des fichiers des globs et traite ceux qui changent"""
+
+    def __init__(self, patterns, names, dry_run=False, interval=0.2, cache=None):
+        self.patterns = patterns
+        self.names = names
+        self.dry_run = dry_run
+        self.interval = interval
+        # Le cache disque ne sert qu'au premier chargement de chaque fichier
+        self.cache = ParseCache() if cache is None else cache
+        self.backups = BackupStore()
+        self.files = {}
+        self.memos = {}
+        self.watches = {}   # descripteur inotify -> dossier
+
+    def _load(self, path, key):
+        if path in self.files:
+            with open(path, 'rb') as f:
+                content = f.read()
+            index = HandlerIndex.build(content)
+        else:
+            content, index = load_handler_index(path, self.cache)
+        return FileState(key, content, index, list(jsx_events(content)))
+
+    def process(self, path, key):
+        """Réindexe path, applique le pipeline et retourne une ligne de résumé"""
+        started = time.perf_counter()
+        state = self._load(path, key)
+        memo = self.memos.get(path)
+        if memo is None:
+            memo = self.memos[path] = HandlerMemo.for_file(path)
+        edits, reports = run_pipeline(state.content, state.index, self.names, jsx=state.jsx, memo=memo)
+        memo.save()
+        if edits and not self.dry_run:
+            if _stat_key(path) != key:
+                # L'éditeur vient d'écrire : ne pas écraser, le prochain tour relira
+                return f"{path}: modifié pendant le traitement, patchs reportés"
+            patches = edits.sorted()
+            self.backups.snapshot(path, state.content)
+            journal = journal_for(path)
+            run_id = journal.begin(state.content, edits)
+            # Run sans commit si l'éditeur écrit entre-temps : ignoré par le journal
+            if edits.write(state.content, path, guard=lambda: _stat_key(path) == key) is None:
+                return f"{path}: modifié pendant le traitement, patchs reportés"
+            journal.commit(run_id, path)
+            content = edits.apply(state.content)
+            state.index.apply_patches(content, patches)
+            state = FileState(_stat_key(path), content, state.index, list(jsx_events(content)))
+        self.files[path] = state
+        elapsed = (time.perf_counter() - started) * 1000
+        return f"{path}: {self._summary(state, reports, len(edits))} ({elapsed:.1f} ms)"
+
+    def _summary(self, state, reports, patches):
+        parts = []
+        total = len(state.index)
+        if total:
+            # Couverture : handlers dont le corps appelle déjà generateContractWithAI
+            with_ai = sum(
+                1 for span in state.index
+                if state.content.find(b'generateContractWithAI', span.start, span.end) != -1
+            )
+            parts.append(f"IA {with_ai}/{total} handlers")
+        for name, report in reports.items():
+            for key, values in report.items():
+                if values:
+                    parts.append(f"{name} {key} {len(values)}")
+        if patches:
+            parts.append(f"{patches} patch(s){' (dry-run)' if self.dry_run else ''}")
+        return ', '.join(parts) or 'rien à signaler'
+
+    def poll(self):
+        """Traite les fichiers nouveaux ou modifiés ; retourne les lignes de résumé"""
+        lines = []
+        seen = set()
+        for path in expand(self.patterns):
+            seen.add(path)
+            try:
+                key = _stat_key(path)
+            except FileNotFoundError:
+                continue
+            state = self.files.get(path)
+            if state is not None and state.key == key:
+                continue
+            try:
+                lines.append(self.process(path, key))
+            except (OSError, ValueError) as exc:
+                lines.append(f"{path}: ❌ {type(exc).__name__}: {exc}")
+        for path in set(self.files) - seen:
+            del self.files[path]
+            self.memos.pop(path, None)
+            lines.append(f"{path}: supprimé")
+        return lines
+
+    def _wait(self, inotify):
+        if inotify is None:
+            time.sleep(self.interval)
+            return
+        # Timeout : rattrape les dossiers hors des watches (aucun fichier au démarrage)
+        for event in inotify.read(timeout=1000, read_delay=20):
+            if event.mask & flags.ISDIR and event.mask & (flags.CREATE | flags.MOVED_TO):
+                parent = self.watches.get(event.wd)
+                if parent is not None:
+                    self._watch(inotify, os.path.join(parent, event.name), recursive=True)
+
+    def _watch(self, inotify, directory, recursive=False):
+        mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.DELETE
+        # mkdir -p a/b : b existe peut-être déjà quand l'événement de a arrive
+        directories = [root for root, _, _ in os.walk(directory)] if recursive else [directory]
+        for directory in directories:
+            try:
+                self.watches[inotify.add_watch(directory, mask)] = directory
+            except OSError:
+                continue  # dossier supprimé entre-temps
+
+    def _inotify(self):
+        if INotify is None:
+            return None
+        inotify = INotify()
+        for directory in {os.path.dirname(path) or '.' for path in self.files}:
+            self._watch(inotify, directory)
+        return inotify
+
+    def run(self, on_line=print):
+        """Boucle jusqu'à Ctrl-C"""
+        for line in self.poll():
+            on_line(line)
+        inotify = self._inotify()
+        on_line(f"👀 {len(self.files)} fichier(s) surveillé(s) "
+                 f"({'inotify' if inotify else f'scrutation {self.interval}s'}), Ctrl-C pour arrêter")
+        try:
+            while True:
+                self._wait(inotify)
+                for line in self.poll():
+                    on_line(line)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if inotify is not None:
+                inotify.close()
@@ -6,70 +6,26 @@ Script pour intégrer automatiquement ChatGPT à TOUS les handlers de contrats
 import re
 import sys
 
-# Mapping complet: handler -> (contractType, clientFieldName)
-HANDLERS_TO_INTEGRATE = {
-    # ============ NOTAIRES ============
-    'handleCompromisVenteSubmit': ('Compromis de vente', 'compromisVenteData.vendeurClientId'),
-    'handleActeVenteSubmit': ('Acte de vente', 'acteVenteData.vendeurClientId'),
-    'handleBailHabitationSubmit': ('Bail habitation', 'bailHabitationData.bailleurClientId'),
-    'handleBailCommercialSubmit': ('Bail commercial', 'bailCommercialData.bailleurClientId'),
-    'handleIndivisionSubmit': ('Indivision', 'indivisionData.indivisaire1ClientId'),
-    'handleMainleveeSubmit': ('Mainlevée', 'mainleveeData.beneficiaireClientId'),
-    'handleContratMariageSubmit': ('Contrat de mariage', 'contratMariageData.epoux1ClientId'),
-    'handlePacsSubmit': ('PACS', 'pacsData.partenaire1ClientId'),
-    'handleDonationEntreEpouxSubmit': ('Donation entre époux', 'donationEntreEpouxData.donateurClientId'),
-    'handleDonationSimpleSubmit': ('Donation simple', 'donationSimpleData.donateurClientId'),
-    'handleTestamentSubmit': ('Testament authentique', 'testamentData.testateurClientId'),
-    'handleChangementRegimeSubmit': ('Changement de régime matrimonial', 'changementRegimeData.epoux1ClientId'),
-    'handleSuccessionSubmit': ('Succession', 'successionData.defuntClientId'),
-    'handleActeNotorieteSubmit': ('Acte de notoriété', 'acteNotorieteData.defuntClientId'),
-    'handlePartageSuccessoralSubmit': ('Partage successoral', 'partageSuccessoralData.succession.defunt.clientId'),
-    'handleProcurationSubmit': ('Procuration', 'procurationData.mandantClientId'),
-    'handleMandatProtectionSubmit': ('Mandat de protection future', 'mandatProtectionData.mandantClientId'),
-    'handleAttestationSubmit': ('Attestation', 'attestationData.declarantClientId'),
-    'handleQuitusDetteSubmit': ('Quitus de dette', 'quitusDetteData.creancierClientId'),
-    'handleCessionPartsSubmit': ('Cession de parts', 'cessionPartsData.cedantClientId'),
-    
-    # ============ AVOCATS ============
-    'handleGenericContractSubmit': ('Contrat de prestation de services', 'prestataireClientId'),
-    'handleCGUSubmit': ('CGU', 'cguData.denominationSociale'),
-    'handleAgenceCommercialeSubmit': ('Agence commerciale', 'agenceCommercialeData.mandantClientId'),
-    'handleNDASubmit': ('NDA', 'ndaData.partie1ClientId'),
-    'handleBailHabitationSubmit': ('Bail habitation', 'bailHabitationData.bailleurClientId'),
-    'handleMiseEnDemeureSubmit': ('Mise en demeure', 'miseEnDemeureData.expediteurClientId'),
-    'handlePacteConcubinageSubmit': ('Pacte de concubinage', 'pacteConcubinageData.concubin1ClientId'),
-    'handleConventionParentaleSubmit': ('Convention parentale', 'conventionParentaleData.parent1ClientId'),
-    'handleReconnaissanceDetteSubmit': ('Reconnaissance de dette', 'reconnaissanceDetteData.debiteurClientId'),
-    'handleMandatProtectionSousSeingSubmit': ('Mandat de protection sous seing privé', 'mandatProtectionSousSeingData.mandantClientId'),
-    'handleTestamentOlographeSubmit': ('Testament olographe', 'testamentOlographeData.testateurClientId'),
-}
-
-# Handlers déjà intégrés (ne pas modifier)
-SKIP_HANDLERS = [
-    'handleDevWebAppSubmit',
-    'handleCessionDroitsAuteurSubmit',
-    'handleLicenceLogicielleSubmit',
-    'handleMentionsLegalesSubmit',
-    'handleEtatLieuxSubmit'  # Déjà modifié récemment
-]
+from codemod import EditList
+from codemod.cache import ParseCache, load_registry, refresh_handler_index
+from codemod.tables import SKIP
+from codemod.validate import ValidationError, check
 
-def apply_ai_to_handler(content, handler_name, contract_type, client_field):
+def apply_ai_to_handler(content, index, edits, handler_name, contract_type, client_field):
     """
-    Applique le pattern AI à un handler spécifique
+    Ajoute à edits les patchs du pattern AI pour un handler spécifique
+    (content en bytes). Retourne True si le handler a été modifié.
     """
     
-    # Pattern pour trouver le début du handler
-    handler_pattern = rf'(const {handler_name} = async \(\) => {{[\s\S]*?)(\.insert\({{)'
-    
-    match = re.search(handler_pattern, content)
-    if not match:
+    span = index.get(handler_name)
+    if span is None or not span.has_insert:
         print(f"  ⚠️  Handler {handler_name} non trouvé ou format inattendu")
-        return content
+        return False
     
     # Vérifier si l'IA est déjà intégrée
-    if 'generateContractWithAI' in match.group(1):
+    if content.find(b'generateContractWithAI', span.start, span.insert_start) != -1:
         print(f"  ⏭️  {handler_name} - IA déjà intégrée")
-        return content
+        return False
     
     # Code AI à insérer AVANT le .insert()
     ai_code = f'''
@@ -83,66 +39,69 @@ def apply_ai_to_handler(content, handler_name, contract_type, client_field):
         user
       }});
 
-      '''
+      '''.encode('utf-8')
     
-    # Remplacer
-    new_content = content.replace(
-        match.group(0),
-        match.group(1) + ai_code + match.group(2)
+    # Remplacer content: ... par content: generatedContract, dans le .insert() de ce handler
+    insert_start, insert_end = span.insert_start, span.insert_end
+    insert_block = content[insert_start:insert_end]
+    modified_block = re.sub(
+        rb'content:\s*[^,}]+',
+        b'content: generatedContract',
+        insert_block,
+        count=1
     )
     
-    # Maintenant, trouver le champ content/description dans le .insert() et le remplacer
-    # Pattern pour trouver le .insert() de ce handler
-    insert_pattern = rf'({re.escape(match.group(2))}[\s\S]*?content:.*?)(,|\}})'
-    
-    insert_match = re.search(insert_pattern, new_content[match.start():])
-    if insert_match:
-        # Remplacer content: ... par content: generatedContract
-        new_content = re.sub(
-            r'content:\s*[^,}]+',
-            'content: generatedContract',
-            new_content,
-            count=1
-        )
+    edits.insert(insert_start, ai_code, handler_name)
+    if modified_block != insert_block:
+        edits.replace(insert_start, insert_end, modified_block, handler_name)
     
     print(f"  ✅ {handler_name} → '{contract_type}'")
-    return new_content
+    return True
 
 def main():
     print("🤖 Intégration automatique de ChatGPT à tous les handlers de contrats\n")
     
-    # Lire le fichier
+    # Lire le fichier (index en cache si inchangé)
+    cache = ParseCache()
     try:
-        with open('src/pages/Contrats.tsx', 'r', encoding='utf-8') as f:
-            content = f.read()
+        content, index, registry = load_registry('src/pages/Contrats.tsx', cache)
     except FileNotFoundError:
         print("❌ Erreur: fichier src/pages/Contrats.tsx non trouvé")
         return 1
+    edits = EditList()
     
-    original_content = content
     modified_count = 0
     
     # Appliquer l'IA à chaque handler
-    for handler_name, (contract_type, client_field) in HANDLERS_TO_INTEGRATE.items():
-        if handler_name in SKIP_HANDLERS:
-            print(f"  ⏭️  {handler_name} - Déjà intégré (skip)")
+    for entry in registry:
+        if entry.name in SKIP:
+            print(f"  ⏭️  {entry.name} - Déjà intégré (skip)")
+            continue
+        if entry.contract_type is None:
+            print(f"  ⚠️  {entry.name} - contractType introuvable (ni name: ni HANDLERS_CONFIG)")
             continue
         
-        new_content = apply_ai_to_handler(content, handler_name, contract_type, client_field)
-        if new_content != content:
+        if apply_ai_to_handler(content, index, edits, entry.name, entry.contract_type, entry.client_field):
             modified_count += 1
-            content = new_content
     
     # Sauvegarder si des modifications ont été faites
-    if content != original_content:
-        with open('src/pages/Contrats.tsx', 'w', encoding='utf-8') as f:
-            f.write(content)
+    if edits:
+        # Re-lexe les handlers touchés avant d'écrire quoi que ce soit
+        try:
+            check(content, edits, index)
+        except ValidationError as exc:
+            print(f"\n❌ Rien n'a été écrit : {exc}")
+            return 1
+        edits.write(content, 'src/pages/Contrats.tsx')
+        refresh_handler_index('src/pages/Contrats.tsx', cache, index, edits)
         
         print(f"\n✅ Script terminé: {modified_count} handlers modifiés")
         print(f"📝 Fichier src/pages/Contrats.tsx mis à jour")
+        print(f"💾 Cache index: {cache.stats}")
         return 0
     else:
         print("\n⚠️  Aucune modification effectuée")
+        print(f"💾 Cache index: {cache.stats}")
         return 1
 
 if __name__ == '__main__':
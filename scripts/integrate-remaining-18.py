@@ -1,57 +1,66 @@
 #!/usr/bin/env python3
 """
-Script pour intégrer l'IA aux 18 handlers restants
+Intègre l'IA aux handlers restants : les 18 de REMAINING, ou tous avec --all-pending
+
+Par défaut, seuls les handlers de REMAINING (la liste historique) qui
+n'appellent pas encore generateContractWithAI ; --all-pending vise tous les
+handlers du fichier sans IA. Les handlers de SKIP sont toujours exclus et le
+contractType vient du registre (cf. codemod.registry).
 """
 
+import argparse
 import re
-import shutil
-from datetime import datetime
 
-# Les 18 handlers restants + leur contractType
-TARGETS = {
-    'handleActeNotorieteSubmit': 'Acte de notoriété',
-    'handleActeVenteSubmit': 'Acte de vente',
-    'handleAttestationSubmit': 'Attestation',
-    'handleBailCommercialSubmit': 'Bail commercial',
-    'handleBailHabitationSubmit': 'Bail habitation',
-    'handleCessionPartsSubmit': 'Cession de parts',
-    'handleChangementRegimeSubmit': 'Changement de régime matrimonial',
-    'handleContratMariageSubmit': 'Contrat de mariage',
-    'handleDonationEntreEpouxSubmit': 'Donation entre époux',
-    'handleDonationSimpleSubmit': 'Donation simple',
-    'handleIndivisionSubmit': 'Indivision',
-    'handleLicenceLogicielleSubmit': 'Licence logicielle',
-    'handleMainleveeSubmit': 'Mainlevée',
-    'handlePacsSubmit': 'PACS',
-    'handlePartageSuccessoralSubmit': 'Partage successoral',
-    'handleQuestionnaireSubmit': 'Questionnaire',  # À vérifier
-    'handleSuccessionSubmit': 'Succession',
-    'handleTestamentSubmit': 'Testament authentique',
-}
+from codemod import EditList, profile
+from codemod.backup import BackupStore
+from codemod.cache import ParseCache, load_registry, store_handler_index
+from codemod.piecetable import PieceTable
+from codemod.profile import NULL_PROFILER
+from codemod.tables import SKIP
+from codemod.validate import ValidationError, check
+
+# Les 18 handlers restants (leur contractType est lu dans le registre)
+REMAINING = (
+    'handleActeNotorieteSubmit',
+    'handleActeVenteSubmit',
+    'handleAttestationSubmit',
+    'handleBailCommercialSubmit',
+    'handleBailHabitationSubmit',
+    'handleCessionPartsSubmit',
+    'handleChangementRegimeSubmit',
+    'handleContratMariageSubmit',
+    'handleDonationEntreEpouxSubmit',
+    'handleDonationSimpleSubmit',
+    'handleIndivisionSubmit',
+    'handleLicenceLogicielleSubmit',
+    'handleMainleveeSubmit',
+    'handlePacsSubmit',
+    'handlePartageSuccessoralSubmit',
+    'handleQuestionnaireSubmit',  # À vérifier
+    'handleSuccessionSubmit',
+    'handleTestamentSubmit',
+)
 
 def backup(path):
-    ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = f'{path}.backup2_{ts}'
-    shutil.copy2(path, backup_path)
-    print(f"💾 Backup: {backup_path}")
-    return backup_path
+    digest = BackupStore().snapshot(path)
+    print(f"💾 Backup: {digest[:12]} (scripts/codemod-backup.py restore {path} {digest[:12]})")
+    return digest[:12]
 
-def integrate_ai(content, handler_name, contract_type):
-    """Intègre l'IA dans un handler"""
-    
-    # Pattern: trouver le handler et son .insert()
-    pattern = rf'(const {handler_name} = async \(\) => \{{[\s\S]*?)(await supabase\s*\.from\([\'"]contrats[\'"]\)\s*\.insert\(\{{)'
-    
-    match = re.search(pattern, content)
-    if not match:
-        return None, "Handler ou .insert() non trouvé"
+def integrate_ai(content, index, edits, handler_name, contract_type, prof=NULL_PROFILER):
+    """Ajoute à edits les patchs qui intègrent l'IA dans un handler (content en bytes)"""
     
-    # Vérifier que generateContractWithAI n'existe pas déjà
-    if 'generateContractWithAI' in match.group(1):
-        return None, "IA déjà intégrée"
+    with prof.phase(handler_name, 'locate'):
+        span = index.get(handler_name)
+        if span is None or not span.has_insert:
+            return None, "Handler ou .insert() non trouvé"
+        
+        # Vérifier que generateContractWithAI n'existe pas déjà avant le .insert()
+        if content.find(b'generateContractWithAI', span.start, span.insert_start) != -1:
+            return None, "IA déjà intégrée"
     
-    # Code IA à insérer
-    ai_code = f'''
+    with prof.phase(handler_name, 'splice'):
+        # Code IA à insérer
+        ai_code = f'''
       // Génération du contrat par l'IA
       toast.info("Génération du contrat par l'IA...");
       const clientInfo = getClientInfo(null, clients);
@@ -62,56 +71,94 @@ def integrate_ai(content, handler_name, contract_type):
         user
       }});
 
-      '''
-    
-    # Insérer avant le .insert()
-    new_content = content.replace(match.group(0), match.group(1) + ai_code + match.group(2))
-    
-    # Maintenant, trouver et remplacer content: dans le .insert()
-    # On cherche le .insert() de ce handler spécifiquement
-    insert_pattern = rf'{re.escape(match.group(2))}[\s\S]*?\.select\(\)'
-    insert_match = re.search(insert_pattern, new_content[match.start():match.start()+10000])
-    
-    if insert_match:
-        insert_block = insert_match.group(0)
-        # Remplacer content/description par generatedContract
-        if 'content:' in insert_block or 'description:' in insert_block:
+      '''.encode('utf-8')
+        
+        # Remplacer content/description par generatedContract dans le .insert() du handler
+        insert_block = content[span.insert_start:span.insert_end]
+        prof.count('octets copiés', len(insert_block))
+        if b'content:' in insert_block or b'description:' in insert_block:
             modified_block = re.sub(
-                r'(content|description):\s*[^,}\n]+',
-                r'content: generatedContract',
+                rb'(content|description):\s*[^,}\n]+',
+                rb'content: generatedContract',
                 insert_block,
                 count=1
             )
         else:
             # Ajouter après role:
             modified_block = re.sub(
-                r'(role:\s*role,)',
-                r'\1\n          content: generatedContract,',
+                rb'(role:\s*role,)',
+                rb'\1\n          content: generatedContract,',
                 insert_block,
                 count=1
             )
-        
-        new_content = new_content[:match.start()] + new_content[match.start():match.start()+10000].replace(insert_block, modified_block, 1) + new_content[match.start()+10000:]
+        prof.count('appels regex')
+    
+    with prof.phase(handler_name, 'rewrite'):
+        # Insérer avant le .insert() et remplacer le bloc
+        edits.insert(span.insert_start, ai_code, handler_name)
+        if modified_block != insert_block:
+            edits.replace(span.insert_start, span.insert_end, modified_block, handler_name)
+            prof.count('octets copiés', len(modified_block))
     
-    return new_content, "✅ Modifié"
+    return True, "✅ Modifié"
+
+def _pending_status(registry, handler):
+    """Pourquoi un handler de REMAINING n'est pas visé"""
+    if handler in SKIP:
+        return "exclu (SKIP)"
+    entry = registry.get(handler)
+    if entry is None:
+        return "Handler non trouvé"
+    if entry.has_ai:
+        return "IA déjà intégrée"
+    return "contractType introuvable"
 
 def main():
-    print("🤖 Intégration IA aux 18 handlers restants\n")
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--all-pending', action='store_true',
+                        help="tous les handlers sans IA du fichier, pas seulement les 18 de REMAINING")
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    prof = profile.make_profiler(args.profile)
+    prof.start()
+    
+    scope = "tous les handlers sans IA" if args.all_pending else f"{len(REMAINING)} handlers restants"
+    print(f"🤖 Intégration IA aux {scope} (hors SKIP)\n")
     
     path = 'src/pages/Contrats.tsx'
     backup(path)
     
-    with open(path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    cache = ParseCache()
+    original, index, registry = load_registry(path, cache)
+    # Les handlers restants : ceux qui n'appellent pas encore generateContractWithAI
+    targets = registry.contract_types(skip=SKIP, pending_only=True)
+    skipped = []
+    if not args.all_pending:
+        targets = {handler: targets[handler] for handler in REMAINING if handler in targets}
+        skipped = [(handler, _pending_status(registry, handler))
+                   for handler in REMAINING if handler not in targets]
+    # Éditions appliquées au fur et à mesure : chaque handler voit les
+    # précédentes, le fichier n'est reconstruit qu'à l'écriture
+    content = PieceTable(original)
     
     success = 0
     failed = []
+    for handler, status in skipped:
+        print(f"⏭️  {handler} - {status}")
     
-    for handler, contract_type in TARGETS.items():
-        new_content, status = integrate_ai(content, handler, contract_type)
+    for handler, contract_type in targets.items():
+        edits = EditList()
+        ok, status = integrate_ai(content, index, edits, handler, contract_type, prof)
         
-        if new_content:
-            content = new_content
+        if ok:
+            # Le handler est re-lexé avant d'être appliqué : rien n'est écrit s'il est cassé
+            try:
+                prof.count('octets validés', check(content, edits, index))
+            except ValidationError as exc:
+                raise SystemExit(f"❌ {handler} : rien n'a été écrit : {exc}")
+            patches = edits.sorted()
+            content.apply(edits)
+            index.apply_patches(content, patches)
             success += 1
             print(f"✅ {handler} → '{contract_type}'")
         else:
@@ -120,13 +167,20 @@ def main():
     
     # Sauvegarder
     if success > 0:
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        prof.count('octets écrits', content.write(path))
+        store_handler_index(path, cache, index)
         print(f"\n✅ {success} handlers intégrés")
         if failed:
             print(f"⚠️  {len(failed)} échecs")
     else:
         print("\n⚠️  Aucune modification")
+    print(f"💾 Cache index: {cache.stats}")
+    
+    if prof.enabled:
+        pstats_path = prof.stop()
+        print('\n'.join(prof.report()))
+        if pstats_path:
+            print(f"  • pstats: {pstats_path}")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Applique les codemods (intégration IA, fix getClientInfo, rapport ClientSelector)
+à tous les fichiers TSX d'un glob, en parallèle (un processus par fichier).
+
+    python scripts/run-codemods.py                      # src/**/*.tsx, tout
+    python scripts/run-codemods.py 'src/pages/*.tsx' -t getclientinfo --dry-run
+    python scripts/run-codemods.py 'src/pages/*.tsx' --watch --dry-run
+    python scripts/run-codemods.py 'src/pages/*.tsx' --rollback   # annule le dernier run
+
+Hors dry-run, chaque fichier est sauvegardé (scripts/codemod-backup.py) et
+ses patchs journalisés avant d'être réécrit.
+"""
+
+import argparse
+import time
+
+from codemod import profile
+from codemod.pipeline import order
+from codemod.journal import JournalError
+from codemod.runner import expand, merge, rollback, run
+from codemod.transforms import TRANSFORMS
+from codemod.watch import Watcher
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('patterns', nargs='*', default=['src/**/*.tsx'],
+                        help="globs des fichiers (défaut: src/**/*.tsx)")
+    parser.add_argument('-t', '--transform', action='append', choices=list(TRANSFORMS),
+                        dest='transforms', help="transformation à appliquer (répétable, défaut: toutes)")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="nombre de processus (défaut: nombre de CPU)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="calcule les rapports sans réécrire les fichiers")
+    parser.add_argument('--rollback', action='store_true',
+                        help="annule le dernier run journalisé de chaque fichier (patchs rejoués à l'envers)")
+    parser.add_argument('--watch', action='store_true',
+                        help="reste actif et retraite chaque fichier modifié (index en mémoire)")
+    parser.add_argument('--interval', type=float, default=0.2,
+                        help="période de scrutation sans inotify, en secondes (défaut: 0.2)")
+    profile.add_argument(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # Ordre des contraintes `after`, quel que soit l'ordre des -t
+    names = order(args.transforms or list(TRANSFORMS))
+    if args.watch:
+        Watcher(args.patterns, names, dry_run=args.dry_run, interval=args.interval).run()
+        return
+    paths = expand(args.patterns)
+    if not paths:
+        print(f"⚠️  Aucun fichier pour {' '.join(args.patterns)}")
+        return
+    if args.rollback:
+        for path, outcome in rollback(paths):
+            if isinstance(outcome, JournalError):
+                print(f"  ⏭️  {path}: {outcome}")
+            else:
+                print(f"  ↩️  {path}: run {outcome['run']} annulé ({len(outcome['patches'])} patch(s))")
+        return
+
+    print(f"🤖 {len(paths)} fichier(s), transformations: {', '.join(names)}"
+          f"{' (dry-run)' if args.dry_run else ''}\n")
+
+    # Chaque worker a son propre Profiler ; leurs mesures sont fusionnées ici
+    prof = profile.make_profiler(args.profile)
+    worker_profile = (prof.pstats_path or True) if prof.enabled else None
+
+    started = time.perf_counter()
+    results = []
+    for result in run(paths, names, jobs=args.jobs, dry_run=args.dry_run, profile=worker_profile):
+        results.append(result)
+        if 'error' in result:
+            print(f"  ❌ {result['path']}: {result['error']}")
+        elif result['patches']:
+            backup = f", backup {result['backup'][:12]}" if result.get('backup') else ''
+            print(f"  ✅ {result['path']}: {result['patches']} patch(s) ({result['delta']:+,} octets{backup})")
+    elapsed = time.perf_counter() - started
+
+    print("\n📋 Rapport:")
+    for name, per_key in merge(results).items():
+        for key, items in per_key.items():
+            print(f"\n  {name} / {key}: {len(items)}")
+            for path, value in items:
+                print(f"    - {path}: {value}")
+
+    modified = sum(1 for r in results if r.get('patches'))
+    errors = sum(1 for r in results if 'error' in r)
+    hits = sum(r['memo'][0] for r in results if 'memo' in r)
+    misses = sum(r['memo'][1] for r in results if 'memo' in r)
+    print(f"\n🧠 Mémo handlers: {hits} hit(s), {misses} miss(es)")
+    if prof.enabled:
+        for result in results:
+            if result.get('profile'):
+                prof.merge(result['profile'], prefix=f"{result['path']}:")
+        print()
+        print('\n'.join(prof.report()))
+        for result in results:
+            if result.get('pstats'):
+                print(f"  • pstats: {result['pstats']}")
+
+    print(f"\n✅ {modified} fichier(s) modifié(s), {errors} erreur(s), {elapsed:.2f}s")
+    if modified and not args.dry_run:
+        print("↩️  Annuler : --rollback (journal) ou scripts/codemod-backup.py restore <fichier>")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Découpe Contrats.tsx en un module par contrat (handler + formulaires),
+rangés par profession, et vérifie le résultat (cf. codemod/shard.py).
+
+    python scripts/shard-contrats.py                     # plan + vérification, rien n'est écrit
+    python scripts/shard-contrats.py --write             # écrit les shards et réécrit Contrats.tsx
+    python scripts/run-codemods.py 'src/pages/contrats/**/*.tsx'   # codemods en parallèle par shard
+"""
+
+import argparse
+import json
+import os
+
+from codemod.backup import BackupStore
+from codemod.cache import ParseCache, load_handler_index
+from codemod.lines import NOTAIRE_SELECTOR, load_notaire_contracts
+from codemod.shard import plan, render_module, rewrite_source, verify
+from codemod.validate import ValidationError, check
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path', nargs='?', default='src/pages/Contrats.tsx')
+    parser.add_argument('--out', default='src/pages/contrats',
+                        help="dossier des shards (défaut: src/pages/contrats)")
+    parser.add_argument('--notaires', default=NOTAIRE_SELECTOR,
+                        help=f"fichier de NOTAIRE_CONTRACT_CATEGORIES (défaut: {NOTAIRE_SELECTOR})")
+    parser.add_argument('--write', action='store_true', help="écrire les shards et réécrire le fichier")
+    parser.add_argument('--force', action='store_true', help="écrire même si la vérification échoue")
+    parser.add_argument('--report', help="écrire le rapport de vérification (JSON) dans ce fichier")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    cache = ParseCache()
+    content, index = load_handler_index(args.path, cache)
+    notaires = load_notaire_contracts(args.notaires) if os.path.exists(args.notaires) else set()
+
+    shards, scope = plan(content, index, args.path, args.out, notaires)
+    if not shards:
+        raise SystemExit(f"❌ Aucun handler ni formulaire à extraire de {args.path}")
+    modules = {shard.path: render_module(content, shard, args.path) for shard in shards}
+    edits = rewrite_source(content, shards, args.path)
+    try:
+        check(content, edits, index)
+    except ValidationError as exc:
+        raise SystemExit(f"❌ Rien n'a été écrit : {exc}")
+    new_content = edits.apply(content)
+    report = verify(content, new_content, shards, modules)
+
+    print(f"✂️  {args.path}: {len(shards)} shard(s), {len(scope)} variable(s) au niveau du composant\n")
+    for item in report['shards']:
+        status = '✅' if item['ok'] else '❌'
+        what = ', '.join(filter(None, [item['handler']] + item['forms']))
+        print(f"  {status} {item['path']} ({item['lines']} lignes, {item['variables']} variable(s)) : {what}")
+        for offset, message in item['lexer_errors']:
+            print(f"      offset {offset} : {message}")
+        if item['unresolved']:
+            print(f"      non exportés depuis {args.path} : {', '.join(item['unresolved'])}")
+        if not item['verbatim']:
+            print("      le code déplacé n'est pas recopié à l'identique")
+    source = report['source']
+    print(f"\n📄 {args.path}: {source['lines_before']:,} → {source['lines_after']:,} lignes")
+    for offset, message in source['lexer_errors_after']:
+        print(f"  ❌ offset {offset} : {message}")
+    if source['unused_imports']:
+        print(f"  ⚠️  imports devenus inutiles : {', '.join(source['unused_imports'])}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Rapport: {args.report}")
+
+    if not args.write:
+        print("\n(dry-run : --write pour écrire les shards)")
+        return
+    if not report['ok'] and not args.force:
+        raise SystemExit("\n❌ Vérification en échec : rien n'a été écrit (--force pour passer outre)")
+
+    existing = [path for path in modules if os.path.exists(path)]
+    if existing:
+        raise SystemExit(f"❌ Shards déjà présents, rien n'a été écrit : {', '.join(existing)}")
+    digest = BackupStore().snapshot(args.path, content)
+    for path, module in modules.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(module)
+    edits.write(content, args.path)
+    print(f"\n✅ {len(modules)} shard(s) écrit(s) dans {args.out}, {args.path} réécrit")
+    print(f"💾 Backup: {digest[:12]} (scripts/codemod-backup.py restore {args.path} {digest[:12]})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+"""
+Utilitaires partagés par les scripts Python du repo (racine et scripts/).
+
+Les scripts ont des noms avec tirets (setup-storage.py, apply-migrations.py...) :
+ils ne s'importent pas avec `import`, d'où load_script().
+"""
+
+import importlib.util
+import os
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(filename, directory=ROOT):
+    """Importe un script (nom avec tirets, relatif à directory) sans exécuter son main()"""
+    path = os.path.join(directory, filename)
+    name = os.path.basename(filename).replace('-', '_')[:-3]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,30 @@
+"""
+Tests pytest des outils Python du repo (scripts/codemod et scripts de la racine).
+
+    python -m pytest -q tests
+
+La racine (scriptutil, scripts à tirets) et scripts/ (paquet codemod) sont
+ajoutées à sys.path comme quand les scripts sont lancés depuis la racine.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'scripts')]
+
+from scriptutil import load_script
+
+
+@pytest.fixture(scope='session')
+def migrations():
+    """Module apply-migrations.py"""
+    return load_script('apply-migrations.py')
+
+
+@pytest.fixture(scope='session')
+def diagnostics():
+    """Module run-diagnostics.py"""
+    return load_script('run-diagnostics.py')
@@ -0,0 +1,147 @@
+"""apply-migrations.py : découpage, arêtes du DAG, checksums et reprise autocommit"""
+
+import os
+
+import pytest
+
+
+def migration(migrations, name, sql, order=0):
+    """Migration nommée name (chemin relatif à la racine, comme discover())"""
+    return migrations.Migration(os.path.join(migrations.ROOT, name), sql, order)
+
+
+def test_scan_splits_on_top_level_semicolons_only(migrations):
+    sql = ("-- commentaire ;\n"
+           "CREATE TABLE public.t (id int, note text DEFAULT 'a;b');\n"
+           "CREATE FUNCTION f() RETURNS int LANGUAGE sql AS $body$ SELECT 1; $body$;\n"
+           "/* bloc ; */ ALTER TABLE \"My Table\" ADD COLUMN c int")
+    statements = migrations.scan(sql)
+    assert [sql[start:end] for _, start, end in statements] == [
+        "CREATE TABLE public.t (id int, note text DEFAULT 'a;b');",
+        "CREATE FUNCTION f() RETURNS int LANGUAGE sql AS $body$ SELECT 1; $body$;",
+        "ALTER TABLE \"My Table\" ADD COLUMN c int",
+    ]
+    tokens = [tokens for tokens, _, _ in statements]
+    assert ('body', ' SELECT 1; ') in tokens[1]
+    assert tokens[0][:5] == [('word', 'create'), ('word', 'table'), ('word', 'public'),
+                             ('symbol', '.'), ('word', 't')]
+    assert ('quoted', 'My Table') in tokens[2]
+
+
+def dag(migrations, *sqls):
+    built = migrations.build_dag([migration(migrations, f'{i}.sql', sql, i) for i, sql in enumerate(sqls)])
+    return built, {m.name: sorted(d.name for d in m.deps) for m in built}
+
+
+def test_edges_follow_shared_objects(migrations):
+    _, deps = dag(
+        migrations,
+        "CREATE TABLE public.t (id int);",
+        "CREATE POLICY p ON public.t USING (true);",
+        "CREATE TABLE public.u (id int);",
+        "CREATE VIEW public.v AS SELECT * FROM public.u;",
+    )
+    assert deps == {'0.sql': [], '1.sql': ['0.sql'], '2.sql': [], '3.sql': ['2.sql']}
+
+
+def test_dynamic_sql_is_a_barrier(migrations):
+    built, deps = dag(
+        migrations,
+        "CREATE TABLE public.t (id int);",
+        "DO $$ BEGIN EXECUTE 'CREATE TABLE public.x ()'; END $$;",
+        "CREATE TABLE public.u (id int);",
+    )
+    assert built[1].opaque
+    assert deps == {'0.sql': [], '1.sql': ['0.sql'], '2.sql': ['1.sql']}
+
+
+def test_waves_and_ordering_warnings(migrations):
+    built, _ = dag(
+        migrations,
+        "CREATE VIEW public.v AS SELECT * FROM public.w;",
+        "CREATE TABLE public.w (id int);",
+        "CREATE TABLE public.u (id int);",
+    )
+    # Jamais réordonné : v (0) avant w (1), avec un avertissement
+    assert [[m.name for m in wave] for wave in migrations.waves(built)] == [['0.sql', '2.sql'], ['1.sql']]
+    assert built[0].warnings == [built[1]]
+
+
+def test_transaction_control_is_stripped(migrations):
+    m = migration(migrations, 'a.sql', "BEGIN;\nCREATE TABLE public.t (id int);\nCOMMIT;\n", 0)
+    assert not m.autocommit
+    assert m.executable_sql().strip() == "CREATE TABLE public.t (id int);"
+
+
+def test_select_skips_same_checksum(migrations):
+    same = migration(migrations, 'same.sql', "CREATE TABLE public.a (id int);", 0)
+    changed = migration(migrations, 'changed.sql', "CREATE TABLE public.b (id int);", 1)
+    new = migration(migrations, 'new.sql', "CREATE TABLE public.c (id int);", 2)
+    applied = {'same.sql': (same.checksum, 40), 'changed.sql': ('autre', 7)}
+    todo, done, changed_list = migrations.select([same, changed, new], applied)
+    assert (todo, done, changed_list) == ([new], [same], [changed])
+    assert same.weight == 40
+    todo, _, _ = migrations.select([same, changed, new], applied, reapply_changed=True)
+    assert todo == [changed, new]
+
+
+class LockTimeout(Exception):
+    sqlstate = '55P03'
+
+
+class FakeConnection:
+    """Connexion qui échoue une fois sur l'instruction `fail` et note ce qui s'exécute"""
+
+    def __init__(self, fail):
+        self.fail = fail
+        self.autocommit = False
+        self.executed = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        if self.fail and sql.startswith('CREATE') and self.fail in sql:
+            self.fail = None
+            raise LockTimeout(sql)
+        self.executed.append(sql)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def get(self):
+        return self.conn
+
+
+def test_autocommit_retry_resumes_at_failing_statement(migrations):
+    sql = ("CREATE INDEX CONCURRENTLY a ON public.t (x);\n"
+           "CREATE INDEX CONCURRENTLY b ON public.t (y);\n"
+           "CREATE INDEX CONCURRENTLY c ON public.t (z);\n")
+    m = migration(migrations, 'idx.sql', sql, 0)
+    assert m.autocommit
+    conn = FakeConnection(fail=' b ')
+    _, attempts = migrations.apply_one(FakePool(conn), m, '1s', 3)
+    assert attempts == 2
+    created = [s for s in conn.executed if s.startswith('CREATE')]
+    assert [s.split()[3] for s in created] == ['a', 'b', 'c']
+    assert migrations.RECORD_SQL in conn.executed
+
+
+def test_non_retryable_error_is_raised(migrations):
+    class Broken(FakeConnection):
+        def execute(self, sql, params=None):
+            if sql.startswith('CREATE'):
+                raise ValueError('syntaxe')
+            super().execute(sql, params)
+
+    m = migration(migrations, 'a.sql', "CREATE TABLE public.t (id int);", 0)
+    with pytest.raises(ValueError):
+        migrations.apply_one(FakePool(Broken(None)), m, '1s', 3)
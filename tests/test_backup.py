@@ -0,0 +1,117 @@
+"""Store de backups : deltas, déduplication, références et rétention"""
+
+import os
+import random
+import time
+
+import pytest
+
+from codemod import backup
+from codemod.backup import BackupError, BackupStore, apply_delta, make_delta
+
+
+def lines(rng, n):
+    return [f'ligne {rng.randrange(50)}\n'.encode('utf-8') for _ in range(n)]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_delta_round_trip(seed):
+    rng = random.Random(seed)
+    base = lines(rng, rng.randrange(60))
+    target = list(base)
+    for _ in range(rng.randrange(15)):
+        i = rng.randrange(len(target) + 1)
+        op = rng.randrange(3)
+        if op == 0:
+            target.insert(i, f'nouvelle {rng.random()}\n'.encode('utf-8'))
+        elif op == 1 and i < len(target):
+            del target[i]
+        elif target:
+            j = rng.randrange(len(target))
+            target.insert(i, target[j])
+    base, target = b''.join(base), b''.join(target)
+    if rng.random() < 0.3:
+        target += b'sans fin de ligne'
+    assert apply_delta(base, make_delta(base, target)) == target
+
+
+@pytest.mark.parametrize('base,target', [(b'', b''), (b'', b'a\n'), (b'a\n', b''), (b'a\nb\n', b'a\nb\n')])
+def test_delta_edge_cases(base, target):
+    assert apply_delta(base, make_delta(base, target)) == target
+
+
+def test_small_edit_makes_small_delta():
+    base = b''.join(f'const x{i} = {i};\n'.encode('utf-8') for i in range(1000))
+    target = base.replace(b'const x500 = 500;\n', b'const x500 = 501;\n')
+    assert len(make_delta(base, target)) < 100
+
+
+def test_corrupt_delta():
+    with pytest.raises(BackupError):
+        apply_delta(b'a\n', b'Z')
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BackupStore(str(tmp_path / 'backups'), keep_last=None, keep_days=None)
+
+
+def versions(n):
+    base = b''.join(f'ligne {i}\n'.encode('utf-8') for i in range(200))
+    return [base + f'version {v}\n'.encode('utf-8') for v in range(n)]
+
+
+def test_snapshots_dedup_and_read_back_through_delta_chains(store, monkeypatch):
+    monkeypatch.setattr(backup, 'MAX_CHAIN', 3)
+    contents = versions(8)
+    digests = [store.snapshot('a.tsx', content) for content in contents]
+    assert store.snapshot('a.tsx', contents[-1]) == digests[-1]
+    assert len(store.snapshots('a.tsx')) == 8
+    assert [store.read(d) for d in digests] == contents
+    # Un objet complet au plus tous les MAX_CHAIN deltas
+    assert max(store._chain_length(d) for d in digests) <= 3
+
+
+def test_find_by_index_and_prefix(store, tmp_path):
+    contents = versions(3)
+    digests = [store.snapshot('a.tsx', content) for content in contents]
+    assert store.find('a.tsx')['hash'] == digests[-1]
+    assert store.find('a.tsx', '-3')['hash'] == digests[0]
+    assert store.find('a.tsx', '@1')['hash'] == digests[1]
+    assert store.find('a.tsx', digests[1][:8])['hash'] == digests[1]
+    with pytest.raises(BackupError, match='hors limites'):
+        store.find('a.tsx', '@7')
+    with pytest.raises(BackupError):
+        store.find('b.tsx')
+    dest = tmp_path / 'restauré.tsx'
+    store.restore('a.tsx', '0', str(dest))
+    assert dest.read_bytes() == contents[0]
+
+
+def test_retention_keep_last_collects_objects(tmp_path, monkeypatch):
+    monkeypatch.setattr(backup, 'MAX_CHAIN', 100)
+    store = BackupStore(str(tmp_path / 'backups'), keep_last=2, keep_days=None)
+    contents = versions(5)
+    digests = [store.snapshot('a.tsx', content) for content in contents]
+    assert [e['hash'] for e in store.snapshots('a.tsx')] == digests[-2:]
+    objects = {entry.name for prefix in os.scandir(store._objects) for entry in os.scandir(prefix.path)}
+    assert objects == {d[2:] for d in digests[-2:]}
+    # La base du delta le plus ancien a été supprimée : il est redevenu complet
+    assert [store.read(d) for d in digests[-2:]] == contents[-2:]
+
+
+def test_retention_keep_days_keeps_latest(tmp_path):
+    store = BackupStore(str(tmp_path / 'backups'), keep_last=None, keep_days=1)
+    old, recent = versions(2)
+    store.snapshot('a.tsx', old)
+    manifest = store._load()
+    manifest['a.tsx'][0]['time'] = time.time() - 3 * 86400
+    store._save(manifest)
+    store.snapshot('a.tsx', recent)
+    assert [e['size'] for e in store.snapshots('a.tsx')] == [len(recent)]
+    # Le plus récent est gardé même s'il est vieux
+    manifest = store._load()
+    manifest['a.tsx'][0]['time'] = 0
+    store._save(manifest)
+    store.prune()
+    assert len(store.snapshots('a.tsx')) == 1
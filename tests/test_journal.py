@@ -0,0 +1,76 @@
+"""Journal : --resume (completed) et --rollback à partir des patchs journalisés"""
+
+import pytest
+
+from codemod.journal import Journal, JournalError
+from codemod.splice import EditList
+
+
+def run(journal, path, edits_by_label, commit=True):
+    """Un run de codemod : journalise, écrit le fichier, puis valide"""
+    content = path.read_bytes()
+    edits = EditList()
+    for label, (start, end, text) in edits_by_label.items():
+        edits.replace(start, end, text, label)
+    run_id = journal.begin(content, edits)
+    edits.write(content, str(path))
+    if commit:
+        journal.commit(run_id, str(path))
+    return run_id
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'Contrats.tsx'
+    path.write_bytes(b'const handleA = () => {};\nconst handleB = () => {};\n')
+    return path
+
+
+def test_completed_follows_the_chain_of_runs(tmp_path, source):
+    journal = Journal(str(tmp_path / 'journal.jsonl'))
+    assert journal.completed(source.read_bytes()) == set()
+    run(journal, source, {'handleA': (23, 23, b' ai(); ')})
+    run(journal, source, {'handleB': (49, 49, b' ai(); ')})
+    assert journal.completed(source.read_bytes()) == {'handleA', 'handleB'}
+    # Modifié hors codemod : plus rien n'est sûr
+    source.write_bytes(source.read_bytes() + '// édition\n'.encode('utf-8'))
+    assert journal.completed(source.read_bytes()) is None
+
+
+def test_uncommitted_run_is_ignored(tmp_path, source):
+    journal = Journal(str(tmp_path / 'journal.jsonl'))
+    run(journal, source, {'handleA': (23, 23, b' ai(); ')})
+    before = source.read_bytes()
+    run(journal, source, {'handleB': (49, 49, b' ai(); ')}, commit=False)
+    assert [r['patches'][0]['handler'] for r in journal.runs()] == ['handleA']
+    assert journal.completed(before) == {'handleA'}
+
+
+def test_rollback_restores_previous_content(tmp_path, source):
+    journal = Journal(str(tmp_path / 'journal.jsonl'))
+    original = source.read_bytes()
+    run(journal, source, {'handleA': (6, 13, b'handleAlpha'), 'handleB': (49, 49, b' ai(); ')})
+    after_first = source.read_bytes()
+    run(journal, source, {'handleA': (0, 5, b'let')})
+    journal.rollback(str(source))
+    assert source.read_bytes() == after_first
+    journal.rollback(str(source))
+    assert source.read_bytes() == original
+    with pytest.raises(JournalError, match='aucun run'):
+        journal.rollback(str(source))
+
+
+def test_rollback_refuses_a_modified_file(tmp_path, source):
+    journal = Journal(str(tmp_path / 'journal.jsonl'))
+    run(journal, source, {'handleA': (23, 23, b' ai(); ')})
+    source.write_bytes(b'autre contenu\n')
+    with pytest.raises(JournalError, match='a changé'):
+        journal.rollback(str(source))
+
+
+def test_truncated_last_line_is_ignored(tmp_path, source):
+    journal = Journal(str(tmp_path / 'journal.jsonl'))
+    run(journal, source, {'handleA': (23, 23, b' ai(); ')})
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "begin", "ru')
+    assert journal.completed(source.read_bytes()) == {'handleA'}
@@ -0,0 +1,59 @@
+"""lexer.scan : appariement à travers chaînes, templates, commentaires, regex et JSX"""
+
+from codemod.lexer import scan
+
+
+def pairs(src):
+    """{caractère ouvrant: [(ouvrant, fermant)]} de src"""
+    buf = src.encode('utf-8')
+    result = scan(buf)
+    assert result.errors == []
+    grouped = {}
+    for open_pos, close_pos in sorted(result.pairs.items()):
+        grouped.setdefault(chr(buf[open_pos]), []).append((open_pos, close_pos))
+    return grouped
+
+
+def test_nested_braces():
+    src = 'function f() { if (a) { return {b: [1, 2]}; } }'
+    result = pairs(src)
+    assert (src.index('{'), len(src) - 1) in result['{']
+    assert len(result['{']) == 3
+    assert result['['] == [(src.index('['), src.index(']'))]
+
+
+def test_braces_in_strings_comments_and_regex_are_ignored():
+    src = "const s = '}'; // }\n/* { */ g(/[}]/.test(s), \"{\")"
+    assert pairs(src) == {'(': [(src.index('g(') + 1, len(src) - 1), (src.index('test(') + 4, src.index('s)') + 1)]}
+
+
+def test_template_literal_with_nested_template():
+    src = 'const a = `x ${ {b: `y ${c}`}.b } }`; f(a)'
+    result = scan(src.encode('utf-8'))
+    assert result.errors == []
+    # ${ ... } du template externe, fermé après .b (l'accolade suivante est du texte)
+    open_pos = src.index('${') + 1
+    assert result.pairs[open_pos] == src.index('.b }') + 3
+    assert result.pairs[src.index('f(') + 1] == len(src) - 1
+
+
+def test_jsx_elements_and_attribute_strings():
+    src = ("const x = <div className={a ? '{' : '}'}>"
+           "{items.map(i => (<span key={i}>{i}</span>))}</div>;")
+    result = scan(src.encode('utf-8'))
+    assert result.errors == []
+    names = [(name, src[start:end]) for start, end, name in result.elements]
+    assert (b'span', '<span key={i}>{i}</span>') in names
+    assert names[-1][0] == b'div' and names[-1][1].endswith('</div>')
+
+
+def test_generic_is_not_jsx():
+    src = 'const f = <T,>(x: T) => { return x; };'
+    assert scan(src.encode('utf-8')).elements == []
+
+
+def test_errors():
+    assert [m for _, m in scan(b'f(`${a`)').errors] == [
+        'template literal non terminé', "'(' jamais fermé", "'{' jamais fermé"]
+    assert scan(b'const x = <div>{a}</span>;').errors == [(18, '</span> ferme <div>')]
+    assert scan(b'f(a]').errors[0][1] == "']' ferme '(' ouvert en 1"
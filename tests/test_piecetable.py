@@ -0,0 +1,65 @@
+"""PieceTable : mêmes résultats qu'un bytearray pour des éditions aléatoires"""
+
+import random
+import re
+
+import pytest
+
+from codemod.piecetable import PieceTable
+from codemod.splice import EditList
+
+
+def test_random_edits_match_bytearray():
+    rng = random.Random(42)
+    original = bytes(rng.choice(b'abc{}\n ') for _ in range(2000))
+    table, expected = PieceTable(original), bytearray(original)
+    for _ in range(500):
+        start = rng.randrange(len(expected) + 1)
+        end = min(len(expected), start + rng.randrange(20))
+        data = bytes(rng.choice(b'xyz\n') for _ in range(rng.randrange(10)))
+        op = rng.randrange(3)
+        if op == 0:
+            table.insert(start, data)
+            expected[start:start] = data
+        elif op == 1:
+            table.delete(start, end)
+            del expected[start:end]
+        else:
+            table.replace(start, end, data)
+            expected[start:end] = data
+        assert len(table) == len(expected)
+    assert bytes(table) == bytes(expected)
+    window = rng.randrange(len(expected))
+    assert table[window:window + 100] == bytes(expected[window:window + 100])
+    assert table.find(b'xyz') == expected.find(b'xyz')
+
+
+def test_insert_then_delete_restores_original():
+    table = PieceTable(b'hello world')
+    table.insert(5, b', dear')
+    assert bytes(table) == b'hello, dear world'
+    table.delete(5, 11)
+    assert bytes(table) == b'hello world'
+
+
+def test_apply_matches_editlist():
+    original = b'const a = 1;\nconst b = 2;\n'
+    edits = EditList()
+    edits.replace(6, 7, b'alpha')
+    edits.insert(len(original), b'const c = 3;\n')
+    table = PieceTable(original)
+    table.apply(edits)
+    assert bytes(table) == edits.apply(original)
+
+
+def test_iter_lines_and_finditer():
+    table = PieceTable(b'a\nb')
+    table.insert(3, b'c\nd')
+    assert list(table.iter_lines()) == [(1, 'a'), (2, 'bc'), (3, 'd')]
+    matches = list(table.finditer(re.compile(rb'[bd]'), chunk=2))
+    assert [m[2] for m in matches] == [b'b', b'd']
+
+
+def test_invalid_span():
+    with pytest.raises(ValueError):
+        PieceTable(b'abc').delete(2, 5)
@@ -0,0 +1,46 @@
+"""HandlerRegistry.discover : le source prime sur HANDLERS_CONFIG"""
+
+from codemod.index import HandlerIndex
+from codemod.registry import HandlerRegistry
+
+SOURCE = b'''\
+  const handleBailHabitationSubmit = async () => {
+    const clientInfo = getClientInfo(bailHabitationData.bailleurClientId, clients);
+    const generatedContract = await generateContractWithAI({
+      contractType: "Bail d'habitation",
+    });
+    await supabase.from('contrats').insert({ name: "Autre nom" });
+  };
+
+  const handlePacsSubmit = async () => {
+    await supabase.from('contrats').insert({
+      name: `Pacte civil - ${pacsData.nom}`,
+    });
+  };
+
+  const handleAttestationSubmit = async () => {
+    await supabase.from('contrats').insert({ category: "x" });
+  };
+
+  const handleInconnuSubmit = async () => {};
+'''
+
+
+def test_discover_prefers_source_over_table():
+    registry = HandlerRegistry.discover(SOURCE, HandlerIndex.build(SOURCE))
+    bail = registry.get('handleBailHabitationSubmit')
+    assert (bail.contract_type, bail.has_ai) == ("Bail d'habitation", True)
+    assert bail.client_field == 'bailHabitationData.bailleurClientId'
+    # name: de l'insert, pas 'PACS' de HANDLERS_CONFIG
+    assert registry.get('handlePacsSubmit').contract_type == 'Pacte civil'
+    # Rien dans le source : repli sur HANDLERS_CONFIG
+    assert registry.get('handleAttestationSubmit').contract_type == 'Attestation'
+    assert registry.get('handleInconnuSubmit').contract_type is None
+
+
+def test_contract_types_and_json_round_trip():
+    registry = HandlerRegistry.discover(SOURCE, HandlerIndex.build(SOURCE))
+    assert registry.contract_types(skip=['handlePacsSubmit'], pending_only=True) == {
+        'handleAttestationSubmit': 'Attestation'}
+    restored = HandlerRegistry.from_json(registry.to_json())
+    assert restored.to_json() == registry.to_json()
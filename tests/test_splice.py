@@ -0,0 +1,63 @@
+"""EditList : ordre des patchs, conflits, application et écriture gardée"""
+
+import pytest
+
+from codemod.splice import EditList, PatchConflict
+
+
+def test_apply_uses_original_coordinates():
+    edits = EditList()
+    edits.replace(6, 11, b'monde', 'b')
+    edits.insert(0, b'>> ', 'a')
+    assert edits.apply(b'hello world') == b'>> hello monde'
+    assert edits.delta == 3
+
+
+def test_inserts_at_same_offset_keep_order_and_precede_replacement():
+    edits = EditList()
+    edits.replace(0, 1, b'X', 'remplace')
+    edits.insert(0, b'1', 'premier')
+    edits.insert(0, b'2', 'second')
+    assert [p.label for p in edits.sorted()] == ['premier', 'second', 'remplace']
+    assert edits.apply(b'abc') == b'12Xbc'
+
+
+def test_adjacent_replacements_do_not_conflict():
+    edits = EditList()
+    edits.replace(0, 2, b'AB')
+    edits.replace(2, 4, b'CD')
+    assert edits.apply(b'abcdef') == b'ABCDef'
+
+
+@pytest.mark.parametrize('second', [(1, 3), (0, 4), (2, 2)])
+def test_overlapping_patches_conflict(second):
+    edits = EditList()
+    edits.replace(0, 3, b'x', 'premier')
+    edits.replace(*second, b'y', 'second')
+    with pytest.raises(PatchConflict, match='chevauche'):
+        edits.sorted()
+
+
+def test_invalid_span():
+    with pytest.raises(ValueError):
+        EditList().replace(4, 2, b'')
+
+
+def test_write_replaces_file(tmp_path):
+    path = tmp_path / 'a.tsx'
+    path.write_bytes(b'abc')
+    edits = EditList()
+    edits.insert(3, b'd')
+    assert edits.write(b'abc', str(path)) == 4
+    assert path.read_bytes() == b'abcd'
+    assert not (tmp_path / 'a.tsx.tmp').exists()
+
+
+def test_write_guard_keeps_file_intact(tmp_path):
+    path = tmp_path / 'a.tsx'
+    path.write_bytes(b'abc')
+    edits = EditList()
+    edits.insert(3, b'd')
+    assert edits.write(b'abc', str(path), guard=lambda: False) is None
+    assert path.read_bytes() == b'abc'
+    assert not (tmp_path / 'a.tsx.tmp').exists()
@@ -0,0 +1,45 @@
+"""validate.check : seules les erreurs lexicales ajoutées par les patchs sont signalées"""
+
+import pytest
+
+from codemod.index import HandlerIndex
+from codemod.splice import EditList
+from codemod.validate import ValidationError, check
+
+SOURCE = (b"  const handleA = async () => {\n    if (ok) { go(); }\n  };\n\n"
+          b"  const handleB = async () => {\n    call(\n  };\n")
+
+
+def edits_at(needle, text, label='patch'):
+    edits = EditList()
+    edits.insert(SOURCE.index(needle), text, label)
+    return edits
+
+
+def test_balanced_patch_passes():
+    index = HandlerIndex.build(SOURCE)
+    assert check(SOURCE, edits_at(b'go();', b'ai({ a: [1] }); '), index) > 0
+
+
+def test_new_imbalance_is_reported_with_label():
+    index = HandlerIndex.build(SOURCE)
+    with pytest.raises(ValidationError) as exc:
+        check(SOURCE, edits_at(b'go();', b'ai({ '), index)
+    assert 'patch' in str(exc.value)
+
+
+def test_already_broken_region_only_reports_new_errors():
+    index = HandlerIndex.build(SOURCE)
+    # handleB a déjà une parenthèse jamais fermée : ajouter du code équilibré passe
+    check(SOURCE, edits_at(b'call(', b'log([1]); '), index)
+    # ... mais pas un nouveau déséquilibre d'un autre type
+    with pytest.raises(ValidationError) as exc:
+        check(SOURCE, edits_at(b'call(', b'log([1); '), index)
+    messages = [message for _, _, message in exc.value.errors]
+    assert any(message.startswith("')' ferme '['") for message in messages)
+    # L'erreur qui existait déjà n'est pas reprise
+    assert not any(message.startswith("'}' ferme '('") for message in messages)
+
+
+def test_no_patch():
+    assert check(SOURCE, EditList()) == 0